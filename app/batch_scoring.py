@@ -0,0 +1,138 @@
+# -----------------------------------
+# Chunked Batch Scoring
+# -----------------------------------
+"""
+Scores an uploaded customer CSV chunk by chunk, so memory is bounded by
+chunk_rows rather than by the size of the upload. Scored chunks are
+appended to a spooled temporary file (kept in memory up to
+SPOOL_MAX_BYTES, then moved to disk) that backs the download.
+"""
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from predict import DEFAULT_MODEL
+
+CHUNK_ROWS = 100_000
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+PREVIEW_ROWS = 5
+
+# Rank-formula weights of the first three columns when no model is trained
+FALLBACK_WEIGHTS = [0.4, 0.3, 0.3]
+
+
+def risk_bands(probabilities):
+    """High above 0.6, Medium above 0.3, Low otherwise (including NaN)."""
+    p = np.asarray(probabilities, dtype=np.float64)
+    return np.select([p > 0.6, p > 0.3], ["High", "Medium"], default="Low")
+
+
+class PercentileRanker:
+    """
+    rank(pct=True) of the first columns of a file, computed chunk by chunk
+    against sorted copies of each column collected in a first pass. Only
+    those columns are held in memory, as float64.
+    """
+
+    def __init__(self, sorted_columns):
+        self.sorted_columns = sorted_columns
+
+    @classmethod
+    def from_csv(cls, source, n_columns, chunk_rows=CHUNK_ROWS):
+        parts = [[] for _ in range(n_columns)]
+        for chunk in pd.read_csv(source, usecols=range(n_columns), chunksize=chunk_rows):
+            for i in range(n_columns):
+                parts[i].append(chunk.iloc[:, i].to_numpy(dtype=np.float64))
+
+        sorted_columns = []
+        for column in parts:
+            values = np.concatenate(column) if column else np.empty(0)
+            sorted_columns.append(np.sort(values[~np.isnan(values)]))
+        return cls(sorted_columns)
+
+    def rank_pct(self, i, values):
+        """Average rank of values among column i, divided by its non-null count."""
+        column = self.sorted_columns[i]
+        values = np.asarray(values, dtype=np.float64)
+        left = np.searchsorted(column, values, side="left")
+        right = np.searchsorted(column, values, side="right")
+        pct = (left + right + 1) / 2 / max(len(column), 1)
+        pct[np.isnan(values)] = np.nan
+        return pct
+
+    def score(self, chunk):
+        score = sum(
+            self.rank_pct(i, chunk.iloc[:, i]) * weight
+            for i, weight in enumerate(FALLBACK_WEIGHTS)
+        )
+        return np.clip(score, 0, 1)
+
+
+class BatchResult:
+    """Scored CSV in a spooled temporary file, with a preview of the first rows."""
+
+    def __init__(self):
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        self.rows = 0
+        self.preview = None
+        self._lock = threading.Lock()
+
+    def append(self, chunk):
+        self.file.write(chunk.to_csv(index=False, header=self.preview is None).encode("utf-8"))
+        if self.preview is None:
+            self.preview = chunk.head(PREVIEW_ROWS)
+        self.rows += len(chunk)
+
+    def csv_bytes(self):
+        # Shared between sessions, so reads must not interleave their seeks
+        with self._lock:
+            self.file.seek(0)
+            return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+
+def _source_size(source):
+    position = source.tell()
+    size = source.seek(0, 2)
+    source.seek(position)
+    return size
+
+
+def score_csv(source, scorer=None, model=DEFAULT_MODEL, chunk_rows=CHUNK_ROWS, progress=None):
+    """
+    Score a customer CSV from a seekable binary file object.
+
+    With a ChurnScorer the rows are scored by model; without one the rank
+    formula over the first three columns is used, as on a deployment with
+    no trained models. progress, if given, is called with the fraction of
+    the file read so far.
+    """
+    size = max(_source_size(source), 1)
+
+    ranker = None
+    if scorer is None:
+        source.seek(0)
+        ranker = PercentileRanker.from_csv(source, len(FALLBACK_WEIGHTS), chunk_rows)
+
+    result = BatchResult()
+    source.seek(0)
+    for chunk in pd.read_csv(source, chunksize=chunk_rows):
+        if scorer is not None:
+            probabilities = scorer.predict_proba(chunk, model)
+        else:
+            probabilities = ranker.score(chunk)
+
+        chunk["Churn_Probability"] = probabilities
+        chunk["Churn_Risk"] = risk_bands(probabilities)
+        result.append(chunk)
+
+        if progress is not None:
+            progress(min(source.tell() / size, 1.0))
+
+    if result.preview is None:
+        raise ValueError("Uploaded file contains no rows")
+    return result
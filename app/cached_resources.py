@@ -0,0 +1,84 @@
+# -----------------------------------
+# Streamlit Caches
+# -----------------------------------
+"""
+Cached loaders for app/streamlit_app.py, so a rerun (page switch or
+widget change) repeats no file I/O or scoring it has already done:
+
+    models          st.cache_resource, one shared copy per model version
+    images          st.cache_data, keyed by path and modification time
+    batch results   st.cache_resource, keyed by SHA-256 of the upload and
+                    the model version
+"""
+import hashlib
+from pathlib import Path
+
+import streamlit as st
+
+from batch_scoring import score_csv
+from fast_predict import FastScorer
+from predict import MODEL_FILES, MODELS_DIR, ChurnScorer, is_model_available
+
+IMAGE_PATTERNS = ["*.png", "*.jpg"]
+
+
+def models_version():
+    """Modification times of the model files; changes whenever they are retrained."""
+    if not is_model_available():
+        return None
+    return tuple(
+        (MODELS_DIR / filename).stat().st_mtime_ns
+        for filename in ["scaler.pkl", *MODEL_FILES.values()]
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_models(version):
+    """Batch and single-row scorers, shared by every session."""
+    scorer = ChurnScorer()
+    return scorer, FastScorer(scorer)
+
+
+def get_models():
+    return load_models(models_version())
+
+
+@st.cache_data(show_spinner=False)
+def _image_paths(directory, version):
+    directory = Path(directory)
+    return [str(p) for pattern in IMAGE_PATTERNS for p in directory.glob(pattern)]
+
+
+def image_paths(directory):
+    directory = Path(directory)
+    if not directory.exists():
+        return None
+    # Adding or removing files changes the directory's mtime
+    return _image_paths(str(directory), directory.stat().st_mtime_ns)
+
+
+@st.cache_data(show_spinner=False)
+def _image_bytes(path, version):
+    return Path(path).read_bytes()
+
+
+def image_bytes(path):
+    return _image_bytes(path, Path(path).stat().st_mtime_ns)
+
+
+def upload_digest(uploaded):
+    # getbuffer() hashes the upload in place instead of copying it
+    return hashlib.sha256(uploaded.getbuffer()).hexdigest()
+
+
+# Arguments prefixed with _ are not hashed by Streamlit; the digest is the key
+@st.cache_resource(show_spinner=False, max_entries=4)
+def batch_results(digest, version, _uploaded, _progress=None):
+    """
+    Scored upload for one file content and model version, spooled to a
+    temporary file. Held as a resource: the result is shared, not copied,
+    between reruns and sessions.
+    """
+    _uploaded.seek(0)
+    scorer = load_models(version)[0] if version is not None else None
+    return score_csv(_uploaded, scorer, progress=_progress)
@@ -0,0 +1,197 @@
+# -----------------------------------
+# CustomerID Point Lookups
+# -----------------------------------
+"""
+Persistent CustomerID index over the feature matrix and its churn scores.
+
+The index lives next to the matrix in data/processed/feature_matrix/index:
+
+    sorted_ids.npy   CustomerIDs in ascending order
+    positions.npy    matrix row of each sorted id
+    scores.npy       churn probability per matrix row and model (float32)
+    index.json       models, and the matrix/model files the index was built from
+
+Lookups are a binary search over the memory-mapped sorted ids. The index
+is rebuilt whenever the feature matrix or the trained models change.
+
+Build or refresh from the repository root:
+    python app/customer_index.py
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from predict import FEATURE_MATRIX_DIR, MODEL_FILES, MODELS_DIR, ChurnScorer, load_feature_matrix
+
+INDEX_VERSION = 1
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def source_state(matrix_dir=FEATURE_MATRIX_DIR, models_dir=MODELS_DIR):
+    """Size and mtime of every file the index is built from."""
+    matrix_dir, models_dir = Path(matrix_dir), Path(models_dir)
+    state = {
+        "version": INDEX_VERSION,
+        "matrix": {
+            name: _file_state(matrix_dir / name)
+            for name in ["features.npy", "customer_ids.npy", "schema.json"]
+        },
+        "models": {}
+    }
+    model_files = ["scaler.pkl", *MODEL_FILES.values()]
+    if all((models_dir / filename).exists() for filename in model_files):
+        state["models"] = {
+            filename: _file_state(models_dir / filename) for filename in model_files
+        }
+    return state
+
+
+class CustomerIndex:
+    def __init__(self, matrix_dir=FEATURE_MATRIX_DIR, models_dir=MODELS_DIR):
+        self.matrix_dir = Path(matrix_dir)
+        self.models_dir = Path(models_dir)
+        self.index_dir = self.matrix_dir / "index"
+        self.load()
+
+    def load(self):
+        self.customer_ids, self.X, self.columns = load_feature_matrix(self.matrix_dir)
+        self.state = source_state(self.matrix_dir, self.models_dir)
+
+        if self._stored_state() == self.state:
+            self.sorted_ids = np.load(self.index_dir / "sorted_ids.npy", mmap_mode="r")
+            self.positions = np.load(self.index_dir / "positions.npy", mmap_mode="r")
+            with open(self.index_dir / "index.json") as f:
+                self.models = json.load(f)["models"]
+            self.scores = (
+                np.load(self.index_dir / "scores.npy", mmap_mode="r") if self.models else None
+            )
+        else:
+            self.build()
+        return self
+
+    def _stored_state(self):
+        try:
+            with open(self.index_dir / "index.json") as f:
+                return json.load(f)["state"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def build(self):
+        """Sort the ids, score every customer and persist the index."""
+        ids = np.asarray(self.customer_ids)
+        self.positions = np.argsort(ids, kind="stable")
+        self.sorted_ids = ids[self.positions]
+
+        self.models, self.scores = [], None
+        if self.state["models"]:
+            # Loaded fresh: the cached scorer may hold models from before a retrain
+            scorer = ChurnScorer(self.models_dir)
+            self.models = list(MODEL_FILES)
+            self.scores = np.column_stack([
+                scorer.score_feature_matrix(self.matrix_dir, model)["ChurnProbability"].to_numpy()
+                for model in self.models
+            ]).astype(np.float32)
+
+        try:
+            self.index_dir.mkdir(exist_ok=True)
+            np.save(self.index_dir / "sorted_ids.npy", self.sorted_ids)
+            np.save(self.index_dir / "positions.npy", self.positions)
+            if self.scores is not None:
+                np.save(self.index_dir / "scores.npy", self.scores)
+            # Written last: a complete index.json marks the other files valid
+            with open(self.index_dir / "index.json", "w") as f:
+                json.dump({"state": self.state, "models": self.models}, f, indent=4)
+        except OSError:
+            # Read-only deployments keep the index in memory only
+            pass
+        return self
+
+    def is_stale(self):
+        try:
+            return source_state(self.matrix_dir, self.models_dir) != self.state
+        except OSError:
+            return True
+
+    def __len__(self):
+        return len(self.sorted_ids)
+
+    def position(self, customer_id):
+        """Matrix row of customer_id, or None if the customer is unknown."""
+        i = int(np.searchsorted(self.sorted_ids, customer_id))
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == customer_id:
+            return int(self.positions[i])
+        return None
+
+    def lookup(self, customer_id):
+        """Features and stored churn scores of one customer, or None."""
+        row = self.position(customer_id)
+        if row is None:
+            return None
+
+        return {
+            "CustomerID": int(customer_id),
+            "features": dict(zip(self.columns, self.X[row].astype(float).tolist())),
+            "churn_probability": (
+                dict(zip(self.models, self.scores[row].astype(float).tolist()))
+                if self.scores is not None else {}
+            )
+        }
+
+
+def is_index_available(matrix_dir=FEATURE_MATRIX_DIR):
+    return (Path(matrix_dir) / "schema.json").exists()
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_customer_index():
+    """
+    Shared index, replaced when features are regenerated or models
+    retrained. A new index is built off to the side and swapped in under a
+    lock, so concurrent readers keep a consistent (if older) index.
+    """
+    global _shared_index
+
+    index = _shared_index
+    if index is not None and not index.is_stale():
+        return index
+
+    with _shared_index_lock:
+        # Another thread may have replaced it while this one waited
+        index = _shared_index
+        if index is None or index.is_stale():
+            index = CustomerIndex()
+            _shared_index = index
+    return index
+
+
+def lookup_customer(customer_id):
+    return get_customer_index().lookup(customer_id)
+
+
+if __name__ == "__main__":
+    import time
+
+    index = CustomerIndex()
+
+    sample = np.asarray(index.sorted_ids[:: max(1, len(index) // 1000)])
+    start = time.perf_counter()
+    for customer_id in sample:
+        index.lookup(customer_id)
+    elapsed = (time.perf_counter() - start) / len(sample)
+
+    print("\nCUSTOMER INDEX BUILT")
+    print("=" * 50)
+    print(f"Customers: {len(index):,}")
+    print(f"Scored models: {', '.join(index.models) or 'none'}")
+    print(f"Mean lookup: {elapsed * 1e6:.1f} µs")
+    print("=" * 50)
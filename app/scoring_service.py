@@ -0,0 +1,260 @@
+# -----------------------------------
+# HTTP Churn Scoring Service
+# -----------------------------------
+"""
+Standalone HTTP API over app/predict.py.
+
+    GET  /health          model and batching configuration
+    POST /predict         one customer: {"features": {...}, "model": "..."}
+    POST /predict/batch   many customers: {"customers": [{...}, ...], "model": "..."}
+    GET  /customers/<id>  stored features and churn scores of a known customer
+
+Concurrent /predict requests are coalesced into micro-batches (up to
+max_batch_size rows, waiting at most max_wait_ms after the first one) and
+scored with a single vectorized model call.
+
+Run from the repository root:
+    python app/scoring_service.py --port 8000 --max-batch-size 64 --max-wait-ms 2
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from customer_index import get_customer_index, is_index_available
+from predict import DEFAULT_MODEL, MODEL_FILES, get_scorer
+
+
+class NotFoundError(Exception):
+    pass
+
+
+def _check_payload(payload):
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+
+
+class MicroBatcher:
+    """
+    Collects single-row requests for one model and scores them together.
+    Rows are validated before submit; if a batch still fails, its rows are
+    rescored one by one so only the failing request gets the error.
+    """
+
+    def __init__(self, scorer, model, max_batch_size=64, max_wait_ms=2.0):
+        self.scorer = scorer
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows, futures = zip(*batch)
+            try:
+                probabilities = self.scorer.score_array(np.vstack(rows), self.model)
+            except Exception:
+                for row, future in zip(rows, futures):
+                    self._score_one(row, future)
+                continue
+
+            for future, probability in zip(futures, probabilities):
+                future.set_result(float(probability))
+
+    def _score_one(self, row, future):
+        try:
+            future.set_result(float(self.scorer.score_array(row, self.model)[0]))
+        except Exception as e:
+            future.set_exception(e)
+
+
+class ScoringService:
+    def __init__(self, max_batch_size=64, max_wait_ms=2.0, threshold=0.5):
+        self.scorer = get_scorer()
+        self.threshold = threshold
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batchers = {
+            model: MicroBatcher(self.scorer, model, max_batch_size, max_wait_ms)
+            for model in MODEL_FILES
+        }
+
+    def _row(self, features):
+        if not isinstance(features, dict):
+            raise ValueError("features must be an object of feature name to value")
+
+        row = np.empty((1, len(self.scorer.feature_names)), dtype=np.float64)
+        for i, name in enumerate(self.scorer.feature_names):
+            if name not in features:
+                raise ValueError(f"Missing feature column: {name}")
+            try:
+                row[0, i] = float(features[name])
+            except (TypeError, ValueError):
+                raise ValueError(f"Feature {name} must be a number")
+
+        # json.loads accepts NaN and Infinity; the models would score them silently
+        if not np.isfinite(row).all():
+            raise ValueError("Feature values must be finite numbers")
+        return row
+
+    def health(self):
+        return {
+            "status": "ok",
+            "models": list(MODEL_FILES),
+            "features": self.scorer.feature_names,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms
+        }
+
+    def predict(self, payload):
+        _check_payload(payload)
+        model = payload.get("model", DEFAULT_MODEL)
+        if model not in self.batchers:
+            raise ValueError(f"Unknown model: {model}")
+
+        probability = self.batchers[model].submit(self._row(payload["features"])).result()
+        return {
+            "model": model,
+            "churn_probability": probability,
+            "churn": int(probability >= self.threshold)
+        }
+
+    def customer(self, customer_id):
+        if not is_index_available():
+            raise NotFoundError("Customer index not available; generate features first")
+        try:
+            customer_id = int(customer_id)
+        except ValueError:
+            raise ValueError(f"Invalid CustomerID: {customer_id}")
+
+        record = get_customer_index().lookup(customer_id)
+        if record is None:
+            raise NotFoundError(f"Unknown CustomerID: {customer_id}")
+        return record
+
+    def predict_batch(self, payload):
+        _check_payload(payload)
+        model = payload.get("model", DEFAULT_MODEL)
+        probabilities = self.scorer.predict_proba(payload["customers"], model)
+        return {
+            "model": model,
+            "churn_probability": probabilities.tolist(),
+            "churn": (probabilities >= self.threshold).astype(int).tolist()
+        }
+
+
+def make_handler(service):
+    routes = {
+        ("GET", "/health"): lambda payload: service.health(),
+        ("POST", "/predict"): service.predict,
+        ("POST", "/predict/batch"): service.predict_batch
+    }
+    # Routes whose last path segment is an argument
+    prefix_routes = {
+        ("GET", "/customers/"): service.customer
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self, method):
+            route = routes.get((method, self.path))
+            if route is not None:
+                return route
+
+            prefix, _, argument = self.path.rpartition("/")
+            route = prefix_routes.get((method, prefix + "/"))
+            if route is not None and argument:
+                return lambda payload: route(argument)
+            return None
+
+        def _handle(self, method):
+            route = self._route(method)
+            if route is None:
+                return self._send(404, {"error": f"Unknown endpoint {self.path}"})
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length)) if length else {}
+                self._send(200, route(payload))
+            except NotFoundError as e:
+                self._send(404, {"error": str(e)})
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+            except Exception:
+                # Answer instead of dropping the connection; details go to the log
+                logging.exception("Error handling %s %s", method, self.path)
+                self._send(500, {"error": "Internal server error"})
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under concurrent load
+    request_queue_size = 256
+
+
+def serve(host="127.0.0.1", port=8000, max_batch_size=64, max_wait_ms=2.0):
+    service = ScoringService(max_batch_size, max_wait_ms)
+    server = ScoringHTTPServer((host, port), make_handler(service))
+    print(f"Scoring service listening on http://{host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve churn predictions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.max_batch_size, args.max_wait_ms)
@@ -1,7 +1,14 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from cached_resources import (
+    batch_results, get_models, image_bytes, image_paths, models_version, upload_digest
+)
+from customer_index import get_customer_index, is_index_available
+from predict import DEFAULT_MODEL, is_model_available
+
 # -------------------------------------------------
 # Page Config
 # -------------------------------------------------
@@ -81,25 +88,56 @@ if selected == "Home":
 elif selected == "Single Customer":
     st.markdown("## 👤 Single Customer Churn Prediction")
 
+    # Known customers: prefill the inputs from the CustomerID index
+    known = {"Recency": 30, "Frequency": 5, "Monetary": 500.0, "AvgOrderValue": 100.0, "ActiveMonths": 3}
+    if is_index_available():
+        customer_id = st.text_input("CustomerID (optional, loads a known customer)")
+        if customer_id.strip():
+            try:
+                record = get_customer_index().lookup(int(customer_id))
+            except ValueError:
+                record = None
+            if record is None:
+                st.warning(f"CustomerID {customer_id} not found")
+            else:
+                known = record["features"]
+                stored = record["churn_probability"].get(DEFAULT_MODEL)
+                if stored is not None:
+                    st.metric("Stored churn score", f"{stored:.2%}")
+
     col1, col2 = st.columns(2)
 
     with col1:
-        recency = st.number_input("Recency (days since last purchase)", min_value=0, value=30)
-        frequency = st.number_input("Frequency (total purchases)", min_value=0, value=5)
-        monetary = st.number_input("Monetary Value (total spend)", min_value=0.0, value=500.0)
+        recency = st.number_input("Recency (days since last purchase)", min_value=0, value=int(known["Recency"]))
+        frequency = st.number_input("Frequency (total purchases)", min_value=0, value=int(known["Frequency"]))
+        monetary = st.number_input("Monetary Value (total spend)", min_value=0.0, value=round(float(known["Monetary"]), 2))
 
     with col2:
-        avg_order = st.number_input("Average Order Value", min_value=0.0, value=100.0)
-        recent_purchases = st.number_input("Purchases in last 90 days", min_value=0, value=2)
+        avg_order = st.number_input("Average Order Value", min_value=0.0, value=round(float(known["AvgOrderValue"]), 2))
+        if is_model_available():
+            active_months = st.number_input("Active months", min_value=1, value=int(known["ActiveMonths"]))
+        else:
+            recent_purchases = st.number_input("Purchases in last 90 days", min_value=0, value=2)
 
     if st.button("Predict Churn Risk"):
-        score = (
-            (recency / 90) * 0.4 +
-            (1 / (frequency + 1)) * 0.2 +
-            (1 / (recent_purchases + 1)) * 0.2 +
-            (1 / (avg_order + 1)) * 0.2
-        )
-        churn_prob = min(max(score, 0), 1)
+        if is_model_available():
+            _, fast_scorer = get_models()
+            churn_prob = fast_scorer.predict_proba_one({
+                "Recency": recency,
+                "Frequency": frequency,
+                "Monetary": monetary,
+                "AvgOrderValue": avg_order,
+                "ActiveMonths": active_months,
+                "LogMonetary": np.log1p(monetary)
+            })
+        else:
+            score = (
+                (recency / 90) * 0.4 +
+                (1 / (frequency + 1)) * 0.2 +
+                (1 / (recent_purchases + 1)) * 0.2 +
+                (1 / (avg_order + 1)) * 0.2
+            )
+            churn_prob = min(max(score, 0), 1)
 
         st.subheader("📊 Prediction Result")
         st.metric("Churn Probability", f"{churn_prob:.2%}")
@@ -121,25 +159,18 @@ elif selected == "Batch Prediction":
 
     if uploaded:
         try:
-            df = pd.read_csv(uploaded)
-
-            df["Churn_Probability"] = (
-                df.iloc[:, 0].rank(pct=True) * 0.4 +
-                df.iloc[:, 1].rank(pct=True) * 0.3 +
-                df.iloc[:, 2].rank(pct=True) * 0.3
-            ).clip(0, 1)
-
-            df["Churn_Risk"] = df["Churn_Probability"].apply(
-                lambda x: "High" if x > 0.6 else "Medium" if x > 0.3 else "Low"
-            )
+            # Scored in chunks, once per file content and model version
+            bar = st.progress(0.0, text="Scoring customers...")
+            result = batch_results(upload_digest(uploaded), models_version(), uploaded, bar.progress)
+            bar.empty()
 
-            st.success("Batch prediction completed successfully")
-            st.dataframe(df.head())
+            st.success(f"Batch prediction completed successfully ({result.rows:,} customers)")
+            st.dataframe(result.preview)
 
-            csv = df.to_csv(index=False).encode("utf-8")
+            # Read from the spooled file only when the download is clicked
             st.download_button(
                 "⬇️ Download Results",
-                data=csv,
+                data=result.csv_bytes,
                 file_name="churn_predictions.csv",
                 mime="text/csv"
             )
@@ -153,14 +184,13 @@ elif selected == "Batch Prediction":
 elif selected == "EDA Visualizations":
     st.markdown("## 📊 Exploratory Data Analysis")
 
-    vis_path = Path("visualizations")
-    if vis_path.exists():
-        images = list(vis_path.glob("*.png")) + list(vis_path.glob("*.jpg"))
+    images = image_paths("visualizations")
+    if images is not None:
         if images:
             cols = st.columns(2)
             for i, img in enumerate(images):
                 with cols[i % 2]:
-                    st.image(img, caption=img.name, use_container_width=True)
+                    st.image(image_bytes(img), caption=Path(img).name, use_container_width=True)
         else:
             st.info("No visualization images available.")
     else:
@@ -0,0 +1,110 @@
+"""
+Streaming data profile (src/data_profiler.py) versus exact pandas
+statistics: wall time, peak RSS, and the error of each sketch.
+
+Usage (from the repository root):
+    python benchmarks/data_profile_benchmark.py [path/to/online_retail.csv | --rows 1M]
+        [--workers 1] [--no-exact]
+
+--no-exact skips loading the whole file for the exact comparison, for
+files larger than memory.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_profiler import PROFILE_QUANTILES, DataProfiler  # noqa: E402
+from profiling import format_mb, peak_rss_bytes  # noqa: E402
+from storage import RAW_DTYPES  # noqa: E402
+from synthetic_data import SyntheticRetailGenerator, parse_rows  # noqa: E402
+
+WORK_DIR = os.path.join(os.path.dirname(__file__), ".work")
+
+
+def _key(series, value):
+    return pd.Timestamp(value) if pd.api.types.is_datetime64_any_dtype(series.dtype) else value
+
+
+def exact_errors(path, profile):
+    df = pd.read_csv(path, encoding="latin1", dtype=RAW_DTYPES, parse_dates=["InvoiceDate"])
+
+    print(f"\n{'column':<14}{'nulls ok':>10}{'distinct err':>14}{'max rank err':>14}{'top ok':>8}{'listed':>8}")
+    for name, column in profile["column_profiles"].items():
+        series = df[name]
+        nulls_ok = column["nulls"] == int(series.isna().sum())
+
+        exact_distinct = series.nunique()
+        distinct_error = abs(column["distinct_estimate"] - exact_distinct) / max(exact_distinct, 1)
+
+        rank_error = ""
+        if column["quantiles"]:
+            values = series.dropna()
+            if column["kind"] == "datetime":
+                values = values.astype("int64")
+            ordered = np.sort(values.to_numpy(dtype=np.float64))
+            errors = []
+            for q in PROFILE_QUANTILES:
+                estimate = column["quantiles"][str(q)]
+                if column["kind"] == "datetime":
+                    estimate = pd.Timestamp(estimate).value
+                # Distance from q to the estimate's range of ranks
+                low = np.searchsorted(ordered, estimate, side="left") / len(ordered)
+                high = np.searchsorted(ordered, estimate, side="right") / len(ordered)
+                errors.append(max(low - q, q - high, 0.0))
+            rank_error = f"{max(errors):.4f}"
+
+        # Every listed value's true count must lie within its bounds
+        exact_counts = series.value_counts()
+        top_ok = all(
+            item["count"] <= exact_counts[_key(series, item["value"])] <= item["max_count"]
+            for item in column["top_values"]
+        )
+
+        print(
+            f"{name:<14}{str(nulls_ok):>10}{distinct_error:>14.4f}{rank_error:>14}"
+            f"{str(top_ok):>8}{len(column['top_values']):>8}"
+        )
+
+
+def run(path, workers, exact):
+    profiler = DataProfiler(path, dtype=RAW_DTYPES, parse_dates=["InvoiceDate"], workers=workers)
+    start = time.perf_counter()
+    profile = profiler.run().to_dict()
+    seconds = time.perf_counter() - start
+
+    size_mb = os.path.getsize(path) / 1024 ** 2
+    print(f"\nDATA PROFILE BENCHMARK ({profile['rows']:,} rows, {size_mb:.0f} MB, {workers} workers)")
+    print("=" * 62)
+    print(f"Streaming profile: {seconds:.2f} s ({size_mb / seconds:.0f} MB/s)")
+    print(f"Peak RSS: {format_mb(peak_rss_bytes(), '.0f')} MB")
+
+    if exact:
+        start = time.perf_counter()
+        exact_errors(path, profile)
+        print(f"\nExact pandas comparison took {time.perf_counter() - start:.2f} s")
+    print("=" * 62)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_path", nargs="?")
+    parser.add_argument("--rows", default="1M", help="synthetic rows when no input file is given")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-exact", action="store_true")
+    args = parser.parse_args()
+
+    path = args.input_path
+    if not path:
+        rows = parse_rows(args.rows)
+        os.makedirs(WORK_DIR, exist_ok=True)
+        path = os.path.join(WORK_DIR, f"raw_{rows}.csv")
+        if not os.path.exists(path):
+            SyntheticRetailGenerator(rows).write_csv(path)
+
+    run(path, args.workers, not args.no_exact)
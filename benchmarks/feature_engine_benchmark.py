@@ -0,0 +1,50 @@
+"""
+Time the vectorized customer feature engine against the original
+groupby/apply implementation. tests/test_feature_engineering.py checks
+that both produce the same table.
+
+Usage (from the repository root):
+    python benchmarks/feature_engine_benchmark.py [path/to/cleaned_transactions]
+"""
+import importlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+features = importlib.import_module("03_feature_engineering")
+
+
+def build(engineer, vectorized):
+    engineer.create_reference_date()
+    if vectorized:
+        engineer.create_customer_features()
+    else:
+        engineer.create_rfm_features().create_additional_features()
+    return engineer.define_churn().finalize_features().customer_df
+
+
+def run(input_path):
+    engineer = features.FeatureEngineer(input_path).load_data()
+
+    timings = {}
+    outputs = {}
+    for name, vectorized in [("original", False), ("vectorized", True)]:
+        start = time.perf_counter()
+        outputs[name] = build(engineer, vectorized)
+        timings[name] = time.perf_counter() - start
+
+    print(f"\nFEATURE ENGINE BENCHMARK ({len(engineer.df):,} rows, "
+          f"{len(outputs['vectorized']):,} customers)")
+    print("=" * 50)
+    for name, seconds in timings.items():
+        print(f"{name:<12}{seconds:>10.3f} s")
+    print(f"Speedup: {timings['original'] / timings['vectorized']:.1f}x")
+    print("=" * 50)
+
+    return timings
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
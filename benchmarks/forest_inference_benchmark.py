@@ -0,0 +1,99 @@
+"""
+Random forest scoring: sklearn's predict_proba versus the flattened
+float32/int32 forest in app/fast_predict.py (FlatForest), per batch size.
+Also checks both give the same probabilities.
+
+FlatForest is the small-batch latency path; ChurnScorer only uses it up
+to FLAT_FOREST_MAX_ROWS rows, and the larger sizes show why.
+
+Uses models/random_forest.pkl when trained; otherwise fits a 200-tree
+forest on synthetic customer features.
+
+Usage (from the repository root):
+    python benchmarks/forest_inference_benchmark.py [--rows 100000] [--threads N]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fast_predict import FlatForest  # noqa: E402
+from predict import FLAT_FOREST_MAX_ROWS, MODELS_DIR, MODEL_FILES  # noqa: E402
+from scoring_throughput_benchmark import synthetic_features  # noqa: E402
+
+BATCH_SIZES = [1, 16, 64, FLAT_FOREST_MAX_ROWS, 1024, 65_536]
+
+
+def load_forest():
+    import joblib
+
+    path = MODELS_DIR / MODEL_FILES["random_forest"]
+    if path.exists():
+        return joblib.load(path), str(path)
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    df = synthetic_features(4_000, seed=1)
+    rng = np.random.default_rng(0)
+    y = (df["Recency"] / 374 + rng.normal(0, 0.3, len(df)) > 0.5).astype(int)
+    forest = RandomForestClassifier(n_estimators=200, random_state=42).fit(df.to_numpy(), y)
+    return forest, "synthetic RandomForestClassifier(n_estimators=200)"
+
+
+def per_call(fn, X, batch_size):
+    batches = [X[start:start + batch_size] for start in range(0, len(X), batch_size)]
+    batches = batches[:max(3, 2_000 // batch_size)]
+    fn(batches[0])  # warm-up
+
+    start = time.perf_counter()
+    for batch in batches:
+        fn(batch)
+    return (time.perf_counter() - start) / len(batches)
+
+
+def run(rows, threads):
+    forest, source = load_forest()
+    flat = FlatForest(forest, n_threads=threads)
+    X = synthetic_features(rows, seed=7).to_numpy(dtype=np.float64)
+
+    def sklearn_proba(batch):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return forest.predict_proba(batch)[:, 1]
+
+    expected = sklearn_proba(X)
+    actual = flat.predict_proba(X)
+    max_error = float(np.abs(actual - expected).max())
+
+    node_count = sum(e.tree_.node_count for e in forest.estimators_)
+    print(f"\nFOREST INFERENCE ({source})")
+    print(f"{len(forest.estimators_)} trees, {node_count:,} nodes, flat arrays {flat.nbytes / 1024 ** 2:.1f} MB, "
+          f"{flat.n_threads} threads")
+    print("=" * 64)
+    print(f"{'batch':>8}{'sklearn ms':>14}{'flat ms':>14}{'speedup':>12}")
+    for batch_size in BATCH_SIZES:
+        if batch_size > rows:
+            continue
+        sklearn_ms = per_call(sklearn_proba, X, batch_size) * 1e3
+        flat_ms = per_call(flat.predict_proba, X, batch_size) * 1e3
+        print(f"{batch_size:>8,}{sklearn_ms:>14.2f}{flat_ms:>14.2f}{sklearn_ms / flat_ms:>11.1f}x")
+    print("=" * 64)
+    print(f"Max |difference| over {rows:,} rows: {max_error:.2e}")
+
+    if max_error > 1e-6:
+        raise AssertionError("FlatForest probabilities differ from sklearn")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=None, help="FlatForest threads (default: all cores)")
+    args = parser.parse_args()
+
+    run(args.rows, args.threads)
@@ -0,0 +1,133 @@
+"""
+Customer features from the raw file: the eager DataCleaner +
+FeatureEngineer chain (whole frame after every step) versus the lazy,
+optimized plan of src/lazy_pipeline.py (pushed-down filters, pruned
+columns, one fused pass per chunk). Each mode runs in a fresh process so
+peak RSS is its own; both customer tables must match.
+
+Usage (from the repository root):
+    python benchmarks/lazy_pipeline_benchmark.py [path/to/online_retail.csv | --rows 1M]
+        [--outlier-method exact] [--explain]
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthetic_data import SyntheticRetailGenerator, parse_rows  # noqa: E402
+
+WORK_DIR = os.path.join(os.path.dirname(__file__), ".work")
+
+
+def eager(path, outlier_method):
+    cleaning = importlib.import_module("02_data_cleaning")
+    features = importlib.import_module("03_feature_engineering")
+
+    cleaner = cleaning.DataCleaner(path, outlier_method=outlier_method)
+    (
+        cleaner.load_data()
+        .apply_row_filters()
+        .remove_outliers()
+        .remove_duplicates()
+        .add_derived_columns()
+        .convert_data_types()
+    )
+
+    engineer = features.FeatureEngineer()
+    engineer.df = cleaner.df
+    (
+        engineer.create_reference_date()
+        .create_customer_features()
+        .define_churn()
+        .finalize_features()
+    )
+    return engineer.customer_df
+
+
+def lazy(path, outlier_method):
+    from lazy_pipeline import lazy_pipeline
+
+    return lazy_pipeline(path, outlier_method=outlier_method).collect()
+
+
+def _measure(mode, path, outlier_method, output_path):
+    from profiling import current_rss_bytes, peak_rss_over
+
+    baseline = current_rss_bytes()
+    start = time.perf_counter()
+    customer_df = {"eager": eager, "lazy": lazy}[mode](path, outlier_method)
+    seconds = time.perf_counter() - start
+
+    pd.to_pickle({
+        "seconds": seconds,
+        "peak": peak_rss_over(baseline),
+        "customers": customer_df
+    }, output_path)
+
+
+def run(path, outlier_method):
+    from profiling import format_mb
+
+    context = multiprocessing.get_context("spawn")
+    size_mb = os.path.getsize(path) / 1024 ** 2
+    print(f"\nLAZY PIPELINE BENCHMARK ({size_mb:.0f} MB CSV, {outlier_method} outlier bounds)")
+    print("=" * 60)
+    print(f"{'mode':<12}{'seconds':>12}{'peak MB over start':>24}")
+
+    results = {}
+    for mode in ["eager", "lazy"]:
+        output_path = os.path.join(WORK_DIR, f"lazy_benchmark_{mode}.pkl")
+        process = context.Process(target=_measure, args=(mode, path, outlier_method, output_path))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"{mode} run failed with exit code {process.exitcode}")
+
+        results[mode] = pd.read_pickle(output_path)
+        os.remove(output_path)
+        print(f"{mode:<12}{results[mode]['seconds']:>12.2f}{format_mb(results[mode]['peak']):>24}")
+    print("=" * 60)
+
+    expected = results["eager"]["customers"].sort_values("CustomerID", ignore_index=True)
+    actual = results["lazy"]["customers"].sort_values("CustomerID", ignore_index=True)
+    if outlier_method == "sketch":
+        # Each run draws its own randomized sketch, so the bounds may differ slightly
+        merged = expected.merge(actual, on="CustomerID", how="outer", suffixes=("", "_lazy"), indicator=True)
+        differ = (merged["_merge"] != "both") | (merged["Recency"] != merged["Recency_lazy"])
+        differ |= ~np.isclose(merged["Monetary"], merged["Monetary_lazy"], rtol=1e-9)
+        print(f"{differ.mean():.3%} of {len(merged):,} customers differ (sketch bounds are approximate).")
+        return
+
+    # Spend is summed per chunk, then across chunks
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+    print(f"Customer tables match ({len(actual):,} customers).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_path", nargs="?")
+    parser.add_argument("--rows", default="1M", help="synthetic rows when no input file is given")
+    parser.add_argument("--outlier-method", default="exact", choices=["exact", "sketch"])
+    parser.add_argument("--explain", action="store_true", help="print the optimized plan first")
+    args = parser.parse_args()
+
+    os.makedirs(WORK_DIR, exist_ok=True)
+    path = args.input_path
+    if not path:
+        rows = parse_rows(args.rows)
+        path = os.path.join(WORK_DIR, f"raw_{rows}.csv")
+        if not os.path.exists(path):
+            SyntheticRetailGenerator(rows).write_csv(path)
+
+    if args.explain:
+        from lazy_pipeline import lazy_pipeline
+        print(lazy_pipeline(path, outlier_method=args.outlier_method).explain())
+
+    run(path, args.outlier_method)
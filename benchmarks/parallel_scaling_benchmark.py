@@ -0,0 +1,49 @@
+"""
+Measure wall time of the partitioned cleaning + feature pipeline for an
+increasing number of worker processes.
+
+Usage (from the repository root):
+    python benchmarks/parallel_scaling_benchmark.py [path/to/online_retail.csv] [--format parquet]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from parallel_pipeline import ParallelPipeline  # noqa: E402
+
+
+def run(input_path, worker_counts=(1, 2, 4, 8, 16), storage_format="parquet"):
+    results = []
+    for workers in worker_counts:
+        pipeline = ParallelPipeline(input_path, workers=workers, storage_format=storage_format)
+
+        start = time.perf_counter()
+        pipeline.run_pipeline()
+        results.append((workers, time.perf_counter() - start, pipeline.timings))
+
+    baseline = results[0][1]
+    print(f"\nPARALLEL SCALING BENCHMARK ({os.cpu_count()} CPUs available)")
+    print("=" * 72)
+    print(f"{'workers':>8}{'total (s)':>12}{'speedup':>10}{'map':>10}{'bounds':>10}{'reduce':>10}{'write':>10}")
+    for workers, seconds, timings in results:
+        print(
+            f"{workers:>8}{seconds:>12.2f}{baseline / seconds:>9.2f}x"
+            f"{timings['map']:>10.2f}{timings['bounds']:>10.2f}"
+            f"{timings['reduce']:>10.2f}{timings['write']:>10.2f}"
+        )
+    print("=" * 72)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_path", nargs="?", default="data/raw/online_retail.csv")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--format", default="parquet", choices=["csv", "parquet", "feather"])
+    args = parser.parse_args()
+
+    run(args.input_path, args.workers, args.format)
@@ -0,0 +1,191 @@
+"""
+End-to-end pipeline benchmark on synthetic Online Retail data.
+
+For each dataset size, generates (once, then reuses) a synthetic raw CSV
+and times cleaning, feature engineering, training and batch scoring.
+Every run is appended to a JSON-lines results file tagged with the git
+commit, and compared against the most recent earlier run with the same
+configuration.
+
+Usage (from the repository root):
+    python benchmarks/pipeline_benchmark.py --rows 1M 10M [--streaming] [--format parquet]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+from predict import MODEL_FILES, ChurnScorer  # noqa: E402
+from profiling import peak_rss_bytes  # noqa: E402
+from synthetic_data import SyntheticRetailGenerator, parse_rows  # noqa: E402
+
+cleaning = importlib.import_module("02_data_cleaning")
+features = importlib.import_module("03_feature_engineering")
+training = importlib.import_module("04_model_training")
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+        dirty = subprocess.check_output(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def dataset(work_dir, rows, seed):
+    path = os.path.join(work_dir, "datasets", f"online_retail_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {rows:,} synthetic rows -> {path}")
+        SyntheticRetailGenerator(rows, seed=seed).write_csv(path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def timed(results, stage, rows, fn):
+    start = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - start
+    peak = peak_rss_bytes()
+    results[stage] = {
+        "seconds": round(seconds, 3),
+        "rows": int(rows),
+        "rows_per_second": round(rows / seconds, 1),
+        # High-water mark of the whole benchmark process so far
+        "process_peak_rss_mb": None if peak is None else round(peak / 1024 ** 2, 1)
+    }
+    print(f"{stage:<10}{seconds:>10.2f}s{rows / seconds:>16,.0f} rows/s")
+    return value
+
+
+def run_once(raw_path, run_dir, config):
+    """Run every stage inside run_dir, which receives data/ and models/."""
+    os.makedirs(run_dir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(run_dir)
+    os.makedirs("data/processed", exist_ok=True)
+    stages = {}
+
+    try:
+        raw_rows = config["rows"]
+        cleaner = cleaning.DataCleaner(raw_path, storage_format=config["format"])
+        if config["streaming"]:
+            timed(stages, "cleaning", raw_rows, cleaner.run_streaming_pipeline)
+        else:
+            timed(stages, "cleaning", raw_rows, cleaner.run_pipeline)
+
+        engineer = features.FeatureEngineer(storage_format=config["format"])
+        customer_df = timed(
+            stages, "features", cleaner.cleaning_stats["rows_after_cleaning"], engineer.run_pipeline
+        )
+
+        # A fresh cache each run, so the search is measured rather than replayed
+        trainer = training.ModelTrainer(
+            n_iter=config["n_iter"], cv=config["cv"],
+            cache_dir=os.path.join("models", f"cache-{time.time_ns()}")
+        )
+        timed(stages, "training", len(customer_df), trainer.run_pipeline)
+
+        scorer = ChurnScorer(models_dir="models")
+        timed(
+            stages, "scoring", len(customer_df) * len(MODEL_FILES),
+            lambda: [scorer.predict_proba(customer_df, model) for model in MODEL_FILES]
+        )
+    finally:
+        os.chdir(cwd)
+
+    return stages
+
+
+def previous_result(results_path, config):
+    if not os.path.exists(results_path):
+        return None
+
+    previous = None
+    with open(results_path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["config"] == config:
+                previous = entry
+    return previous
+
+
+def report(entry, previous):
+    print(f"\nPIPELINE BENCHMARK ({entry['config']['rows']:,} rows, commit {entry['commit']})")
+    print("=" * 60)
+    print(f"{'stage':<12}{'seconds':>10}{'rows/s':>16}{'vs ' + (previous or {}).get('commit', '-'):>22}")
+    for stage, result in entry["stages"].items():
+        change = ""
+        if previous and stage in previous["stages"]:
+            before = previous["stages"][stage]["seconds"]
+            change = f"{(result['seconds'] - before) / before * 100:+.1f}%"
+        print(f"{stage:<12}{result['seconds']:>10.2f}{result['rows_per_second']:>16,.0f}{change:>22}")
+    print("=" * 60)
+
+
+def run(row_counts, work_dir, results_path, streaming, storage_format, n_iter, cv, seed):
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+    commit = git_commit()
+
+    for rows in row_counts:
+        config = {
+            "rows": rows,
+            "seed": seed,
+            "streaming": streaming,
+            "format": storage_format,
+            "n_iter": n_iter,
+            "cv": cv
+        }
+        raw_path = os.path.abspath(dataset(work_dir, rows, seed))
+        previous = previous_result(results_path, config)
+
+        entry = {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "config": config,
+            "environment": {
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "cpus": os.cpu_count()
+            },
+            "stages": run_once(raw_path, os.path.join(work_dir, f"run_{rows}"), config)
+        }
+
+        with open(results_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        report(entry, previous)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", nargs="+", default=["1M"], help="dataset sizes, e.g. 1M 10M 100M")
+    parser.add_argument("--work-dir", default=os.path.join(ROOT, "benchmarks", ".work"))
+    parser.add_argument("--results", default=os.path.join(ROOT, "benchmarks", "results", "pipeline.jsonl"))
+    parser.add_argument("--streaming", action="store_true", help="use chunked cleaning (needed for 100M)")
+    parser.add_argument("--format", default="parquet", choices=["csv", "parquet", "feather"])
+    parser.add_argument("--n-iter", type=int, default=3)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    run(
+        [parse_rows(rows) for rows in args.rows],
+        os.path.abspath(args.work_dir),
+        os.path.abspath(args.results),
+        args.streaming, args.format, args.n_iter, args.cv, args.seed
+    )
@@ -0,0 +1,104 @@
+"""
+Load-test the HTTP scoring service with concurrent single-customer
+requests, with micro-batching disabled (max batch size 1) and enabled.
+
+Usage (from the repository root, after training):
+    python benchmarks/scoring_service_load_test.py [--clients 32] [--requests 200]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from scoring_throughput_benchmark import synthetic_features  # noqa: E402
+
+SERVICE = os.path.join(os.path.dirname(__file__), "..", "app", "scoring_service.py")
+
+
+def start_service(port, max_batch_size, max_wait_ms):
+    process = subprocess.Popen([
+        sys.executable, SERVICE,
+        "--port", str(port),
+        "--max-batch-size", str(max_batch_size),
+        "--max-wait-ms", str(max_wait_ms)
+    ], stdout=subprocess.DEVNULL)
+
+    for _ in range(300):
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError("Scoring service did not start")
+
+
+def client(port, rows, model):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    latencies = []
+    for row in rows:
+        body = json.dumps({"features": row, "model": model})
+        start = time.perf_counter()
+        conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise RuntimeError(f"Request failed with status {response.status}")
+    conn.close()
+    return latencies
+
+
+def load_test(port, clients, requests, model):
+    rows = synthetic_features(clients * requests).to_dict("records")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = pool.map(
+            client,
+            [port] * clients,
+            [rows[i::clients] for i in range(clients)],
+            [model] * clients
+        )
+        latencies = np.concatenate([np.asarray(r) for r in results]) * 1000
+    seconds = time.perf_counter() - start
+    return len(latencies) / seconds, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def run(clients, requests, model, port, max_batch_size, max_wait_ms):
+    print(f"\nSCORING SERVICE LOAD TEST ({clients} clients x {requests} requests, {model})")
+    print("=" * 64)
+    print(f"{'mode':<24}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+
+    for mode, batch_size in [("no batching", 1), (f"batching (max {max_batch_size})", max_batch_size)]:
+        process = start_service(port, batch_size, max_wait_ms)
+        try:
+            throughput, p50, p99 = load_test(port, clients, requests, model)
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{mode:<24}{throughput:>10.0f}{p50:>12.2f}{p99:>12.2f}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--model", default="random_forest")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    run(args.clients, args.requests, args.model, args.port, args.max_batch_size, args.max_wait_ms)
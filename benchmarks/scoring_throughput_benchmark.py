@@ -0,0 +1,62 @@
+"""
+Measure batch scoring throughput of app/predict.py for both models.
+
+Usage (from the repository root, after training):
+    python benchmarks/scoring_throughput_benchmark.py [--rows 2000000] [--batch-size 65536]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from predict import MODEL_FILES, ChurnScorer  # noqa: E402
+
+
+def synthetic_features(rows, seed=42):
+    """Customer feature rows with roughly the ranges of customer_features.csv."""
+    rng = np.random.default_rng(seed)
+    frequency = rng.geometric(0.2, rows)
+    monetary = np.round(rng.lognormal(6.5, 1.2, rows), 2)
+    return pd.DataFrame({
+        "Recency": rng.integers(1, 374, rows),
+        "Frequency": frequency,
+        "Monetary": monetary,
+        "AvgOrderValue": monetary / frequency,
+        "ActiveMonths": np.minimum(frequency, rng.integers(1, 14, rows)),
+        "LogMonetary": np.log1p(monetary)
+    })
+
+
+def run(rows, batch_size):
+    scorer = ChurnScorer(batch_size=batch_size)
+    df = synthetic_features(rows)
+
+    print(f"\nSCORING THROUGHPUT ({rows:,} rows, batch size {batch_size:,})")
+    print("=" * 60)
+    results = {}
+    for model in MODEL_FILES:
+        scorer.predict_proba(df.head(batch_size), model)  # warm-up
+
+        start = time.perf_counter()
+        scorer.predict_proba(df, model)
+        seconds = time.perf_counter() - start
+
+        results[model] = rows / seconds * 60
+        print(f"{model:<22}{seconds:>8.2f} s{results[model]:>16,.0f} rows/min")
+    print("=" * 60)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=65_536)
+    args = parser.parse_args()
+
+    run(args.rows, args.batch_size)
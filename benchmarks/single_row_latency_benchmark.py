@@ -0,0 +1,59 @@
+"""
+Per-prediction latency of single-customer scoring: sklearn through
+ChurnScorer versus the compiled fast path in app/fast_predict.py.
+
+Usage (from the repository root, after training):
+    python benchmarks/single_row_latency_benchmark.py [--iterations 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fast_predict import FastScorer  # noqa: E402
+from predict import MODEL_FILES, ChurnScorer  # noqa: E402
+from scoring_throughput_benchmark import synthetic_features  # noqa: E402
+
+
+def latencies(fn, rows):
+    fn(rows[0])  # warm-up
+    samples = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        fn(row)
+        samples[i] = time.perf_counter() - start
+    return samples * 1e6
+
+
+def run(iterations):
+    scorer = ChurnScorer()
+    fast = FastScorer(scorer)
+    rows = synthetic_features(iterations).to_dict("records")
+
+    print(f"\nSINGLE-ROW LATENCY ({iterations:,} predictions, microseconds)")
+    print("=" * 64)
+    print(f"{'model':<22}{'path':<10}{'p50':>10}{'p99':>10}{'mean':>10}")
+    for model in MODEL_FILES:
+        for path, fn in [
+            ("sklearn", lambda row: scorer.predict_proba(row, model)),
+            ("fast", lambda row: fast.predict_proba_one(row, model))
+        ]:
+            samples = latencies(fn, rows)
+            print(
+                f"{model:<22}{path:<10}{np.percentile(samples, 50):>10.1f}"
+                f"{np.percentile(samples, 99):>10.1f}{samples.mean():>10.1f}"
+            )
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    run(args.iterations)
@@ -0,0 +1,150 @@
+"""
+Cold start of a scoring process: time to first prediction when the
+models are unpickled with joblib (importing sklearn) versus loaded from
+the model artifact (manifest + memory-mapped forest arrays, numpy only).
+Every run is a fresh interpreter; the OS file cache is warm after the
+first, as for a restarted or autoscaled worker. The first prediction goes
+through ChurnScorer.score_array, as in the scoring service; the report
+lists which of pandas, sklearn and joblib each loader ended up importing.
+
+Uses the trained models in models/ when present; --synthetic trains a
+200-tree forest on synthetic features into benchmarks/.work instead.
+
+Usage (from the repository root):
+    python benchmarks/startup_benchmark.py [--synthetic] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+WORK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".work")
+
+# Runs in a fresh interpreter; argv: app dir, models dir, use_artifact (0/1)
+CHILD = """
+import time
+start = time.perf_counter()
+import json, os, sys
+import numpy as np
+sys.path.insert(0, sys.argv[1])
+from predict import ChurnScorer
+imported = time.perf_counter()
+
+scorer = ChurnScorer(sys.argv[2], use_artifact=sys.argv[3] == "1")
+loaded = time.perf_counter()
+
+# The scoring service's path: a float row in training column order
+probability = float(scorer.score_array(np.ones((1, len(scorer.feature_names))))[0])
+done = time.perf_counter()
+
+# Not ru_maxrss: it survives exec and would include the parent's peak
+with open("/proc/self/statm") as f:
+    rss_mb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+print(json.dumps({
+    "import": imported - start,
+    "load": loaded - imported,
+    "first_prediction": done - loaded,
+    "total": done - start,
+    "rss_mb": rss_mb,
+    "modules": sorted(m for m in ("pandas", "sklearn", "joblib") if m in sys.modules),
+    "artifact": scorer.artifact is not None,
+    "probability": probability
+}))
+"""
+
+
+def train_synthetic(models_dir):
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    from model_artifact import save_model_artifact, source_fingerprints
+    from scoring_throughput_benchmark import synthetic_features
+
+    X = synthetic_features(4_000, seed=1)
+    rng = np.random.default_rng(0)
+    y = (X["Recency"] / 374 + rng.normal(0, 0.3, len(X)) > 0.5).astype(int)
+
+    scaler = StandardScaler().fit(X)
+    models = {
+        "scaler": scaler,
+        "logistic_regression": LogisticRegression(max_iter=1000).fit(scaler.transform(X), y),
+        "random_forest": RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1).fit(X, y)
+    }
+    os.makedirs(models_dir, exist_ok=True)
+    for name, model in models.items():
+        joblib.dump(model, os.path.join(models_dir, f"{name}.pkl"))
+
+    save_model_artifact(
+        scaler, models["logistic_regression"], models["random_forest"], list(X.columns),
+        os.path.join(models_dir, "artifact"), sources=source_fingerprints(models_dir)
+    )
+
+
+def cold_start(models_dir, use_artifact):
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, os.path.join(ROOT, "app"), models_dir, "1" if use_artifact else "0"],
+        check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - started
+    return result
+
+
+def run(models_dir, runs):
+    if not os.path.exists(os.path.join(models_dir, "artifact", "manifest.json")):
+        from model_artifact import export_model_artifact
+        export_model_artifact(models_dir)
+
+    print(f"\nSTARTUP BENCHMARK ({models_dir}, median of {runs} fresh processes)")
+    print("=" * 88)
+    print(f"{'loader':<10}{'import s':>10}{'load s':>10}{'1st pred s':>12}{'to 1st pred s':>15}"
+          f"{'process s':>11}{'RSS MB':>10}  imported")
+
+    probabilities = {}
+    for loader, use_artifact in [("joblib", False), ("artifact", True)]:
+        cold_start(models_dir, use_artifact)  # warm the file cache
+        results = [cold_start(models_dir, use_artifact) for _ in range(runs)]
+        if use_artifact and not results[0]["artifact"]:
+            raise RuntimeError("The artifact was not used; is it stale?")
+
+        median = {
+            key: float(np.median([r[key] for r in results]))
+            for key in results[0] if key not in ("artifact", "modules")
+        }
+        probabilities[loader] = median["probability"]
+        print(f"{loader:<10}{median['import']:>10.3f}{median['load']:>10.3f}{median['first_prediction']:>12.3f}"
+              f"{median['total']:>15.3f}{median['process']:>11.3f}{median['rss_mb']:>10.0f}"
+              f"  {', '.join(results[0]['modules']) or '-'}")
+    print("=" * 88)
+
+    difference = abs(probabilities["joblib"] - probabilities["artifact"])
+    print(f"First prediction: {probabilities['artifact']:.6f} (|difference| {difference:.1e})")
+    if difference > 1e-6:
+        raise AssertionError("Artifact and pickle predictions differ")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic 200-tree forest")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    models_dir = os.path.join(ROOT, "models")
+    if args.synthetic:
+        models_dir = os.path.join(WORK_DIR, "startup_models")
+        if not os.path.exists(os.path.join(models_dir, "random_forest.pkl")):
+            train_synthetic(models_dir)
+
+    run(os.path.abspath(models_dir), args.runs)
@@ -0,0 +1,58 @@
+"""
+Compare disk size and load time of the cleaned transactions stored as CSV,
+Parquet and Feather.
+
+Usage (from the repository root):
+    python benchmarks/storage_benchmark.py [path/to/cleaned_transactions.csv]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from storage import load_frame, save_frame  # noqa: E402
+
+FEATURE_COLUMNS = ["CustomerID", "InvoiceNo", "InvoiceDate", "TotalPrice"]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(csv_path):
+    df = load_frame(csv_path, parse_dates=["InvoiceDate"])
+    df["StockCode"] = df["StockCode"].astype("category")
+    df["Country"] = df["Country"].astype("category")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ["csv", "parquet", "feather"]:
+            path = os.path.join(tmp, f"cleaned_transactions.{fmt}")
+            save_frame(df, path)
+
+            parse_dates = ["InvoiceDate"] if fmt == "csv" else None
+            full = timed(lambda: load_frame(path, parse_dates=parse_dates))
+            projected = timed(lambda: load_frame(
+                path, columns=FEATURE_COLUMNS, parse_dates=parse_dates
+            ))
+            results.append((fmt, os.path.getsize(path) / 1e6, full, projected))
+
+    print(f"\nSTORAGE BENCHMARK ({len(df):,} rows)")
+    print("=" * 60)
+    print(f"{'format':<10}{'size (MB)':>12}{'full load (s)':>16}{'feature cols (s)':>20}")
+    for fmt, size, full, projected in results:
+        print(f"{fmt:<10}{size:>12.2f}{full:>16.3f}{projected:>20.3f}")
+    print("=" * 60)
+
+    return results
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else "data/processed/cleaned_transactions.csv")
@@ -0,0 +1,111 @@
+"""
+Rerun latency of each page of the Streamlit app, measured headless with
+streamlit.testing.AppTest, plus cold versus cached batch scoring of an
+uploaded file (AppTest cannot drive the file uploader).
+
+Usage (from the repository root, after training):
+    python benchmarks/streamlit_rerun_benchmark.py [--reruns 20] [--rows 50000]
+
+For before/after numbers, point --script at another version of the app
+placed in app/ (so its imports resolve), e.g.
+    git show HEAD~1:app/streamlit_app.py > app/streamlit_app_before.py
+    python benchmarks/streamlit_rerun_benchmark.py --script app/streamlit_app_before.py
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from scoring_throughput_benchmark import synthetic_features  # noqa: E402
+
+PAGES = [
+    "Home",
+    "Single Customer",
+    "Batch Prediction",
+    "EDA Visualizations",
+    "Model Overview",
+    "Documentation"
+]
+
+
+def rerun_latencies(script, page, reruns):
+    """First render of page, then the median of reruns (a button click on Single Customer)."""
+    at = AppTest.from_file(script, default_timeout=60).run()
+    start = time.perf_counter()
+    at.radio[0].set_value(page).run()
+    first = time.perf_counter() - start
+
+    samples = np.empty(reruns)
+    for i in range(reruns):
+        start = time.perf_counter()
+        if page == "Single Customer":
+            at.button[0].click().run()
+        else:
+            at.run()
+        samples[i] = time.perf_counter() - start
+
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return first * 1e3, np.median(samples) * 1e3
+
+
+def batch_latencies(rows, reruns):
+    """Uncached chunked scoring versus a cache hit on the same upload."""
+    from batch_scoring import score_csv
+    from cached_resources import batch_results, get_models, models_version, upload_digest
+
+    uploaded = io.BytesIO(synthetic_features(rows).to_csv(index=False).encode("utf-8"))
+    scorer = get_models()[0] if models_version() is not None else None
+
+    def uncached():
+        uploaded.seek(0)
+        score_csv(uploaded, scorer)
+
+    def cached():
+        batch_results(upload_digest(uploaded), models_version(), uploaded)
+
+    results = {}
+    for name, fn in [("uncached", uncached), ("cached", cached)]:
+        fn()  # warm-up; fills the cache for the cached path
+        samples = np.empty(reruns)
+        for i in range(reruns):
+            start = time.perf_counter()
+            fn()
+            samples[i] = time.perf_counter() - start
+        results[name] = np.median(samples) * 1e3
+    return results
+
+
+def run(script, reruns, rows):
+    print(f"\nSTREAMLIT RERUN LATENCY ({script}, median of {reruns} reruns, ms)")
+    print("=" * 56)
+    print(f"{'page':<24}{'first render':>16}{'rerun':>16}")
+    for page in PAGES:
+        first, rerun = rerun_latencies(script, page, reruns)
+        print(f"{page:<24}{first:>16.1f}{rerun:>16.1f}")
+    print("=" * 56)
+
+    batch = batch_latencies(rows, reruns)
+    print(f"\nBATCH UPLOAD RERUN ({rows:,} rows, ms)")
+    print("=" * 56)
+    print(f"{'uncached chunked scoring':<40}{batch['uncached']:>16.1f}")
+    print(f"{'cached (content hash hit)':<40}{batch['cached']:>16.1f}")
+    print("=" * 56)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--script", default="app/streamlit_app.py")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    run(args.script, args.reruns, args.rows)
@@ -2,6 +2,10 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from data_profiler import DataProfiler
+from memory_layout import compact_frame, memory_comparison
+from storage import RAW_DTYPES
+
 def download_dataset():
     """
     Dataset is downloaded manually (Kaggle fallback).
@@ -38,7 +42,7 @@ def load_raw_data():
 
 def generate_data_profile(df):
     """
-    Generate basic data profile and save to text file.
+    Generate basic data profile of a loaded DataFrame and save to text file.
     """
     profile_path = "data/raw/data_profile.txt"
 
@@ -55,18 +59,93 @@ def generate_data_profile(df):
         f.write("Memory Usage:\n")
         f.write(str(df.memory_usage(deep=True)) + "\n\n")
 
+        # Savings from categories and downcast integers (memory_layout.py)
+        comparison = memory_comparison(df, compact_frame(df))
+        total = comparison.loc["Total"]
+        f.write("Compact Memory Layout:\n")
+        f.write(comparison.to_string() + "\n")
+        f.write(
+            f"Footprint: {total['bytes'] / 1024 ** 2:.1f} MB -> "
+            f"{total['compact_bytes'] / 1024 ** 2:.1f} MB ({total['ratio']}x smaller)\n\n"
+        )
+
         f.write("Preview (First 5 Rows):\n")
         f.write(str(df.head()) + "\n")
 
     print("Data profile saved to data/raw/data_profile.txt")
 
 
+def generate_streaming_profile(dataset_path="data/raw/online_retail.csv", chunksize=200_000, workers=None):
+    """
+    Profile the raw dataset in one streaming pass (data_profiler.py),
+    without loading it, and save it as data/raw/data_profile.json plus a
+    readable data_profile.txt. Large files are profiled in parallel byte
+    ranges (workers=None uses every core).
+    """
+    profiler = DataProfiler(
+        dataset_path,
+        chunksize=chunksize,
+        dtype=RAW_DTYPES,
+        parse_dates=["InvoiceDate"],
+        workers=workers
+    ).run()
+    profile = profiler.to_dict()
+    profiler.save_json("data/raw/data_profile.json")
+
+    profile_path = "data/raw/data_profile.txt"
+
+    with open(profile_path, "w", encoding="utf-8") as f:
+        f.write("ONLINE RETAIL DATA PROFILE\n")
+        f.write("=" * 40 + "\n\n")
+
+        f.write(f"Rows: {profile['rows']}\n")
+        f.write(f"Columns: {profile['columns']}\n\n")
+
+        summary = pd.DataFrame({
+            name: {
+                "kind": column["kind"],
+                "nulls": column["nulls"],
+                "distinct (approx)": column["distinct_estimate"],
+                "min": column["min"],
+                "median (approx)": (column["quantiles"] or {}).get("0.5"),
+                "max": column["max"]
+            }
+            for name, column in profile["column_profiles"].items()
+        }).T
+        f.write("Column Statistics:\n")
+        f.write(summary.to_string() + "\n\n")
+
+        f.write("Most Frequent Values:\n")
+        for name, column in profile["column_profiles"].items():
+            top = ", ".join(f"{item['value']} ({item['count']})" for item in column["top_values"][:5])
+            f.write(f"{name}: {top or '(no dominant values)'}\n")
+        f.write("\n")
+
+        # Deep memory is measured on the sample and scaled to the full row count
+        sample = profiler.sample
+        comparison = memory_comparison(sample, compact_frame(sample))
+        total = comparison.loc["Total"]
+        scale = profile["rows"] / max(len(sample), 1)
+        f.write(f"Compact Memory Layout (first {len(sample)} rows):\n")
+        f.write(comparison.to_string() + "\n")
+        f.write(
+            f"Estimated footprint: {total['bytes'] * scale / 1024 ** 2:.1f} MB -> "
+            f"{total['compact_bytes'] * scale / 1024 ** 2:.1f} MB ({total['ratio']}x smaller)\n\n"
+        )
+
+        f.write("Preview (First 5 Rows):\n")
+        f.write(str(sample.head()) + "\n")
+
+    print("Data profile saved to data/raw/data_profile.txt and data/raw/data_profile.json")
+    return profile
+
+
 if __name__ == "__main__":
     download_dataset()
-    df = load_raw_data()
-    generate_data_profile(df)
+    profile = generate_streaming_profile()
 
     print("\nDATA ACQUISITION SUMMARY")
     print("=" * 40)
-    print(f"Dataset Shape: {df.shape}")
-    print(f"Columns: {list(df.columns)}")
+    print(f"Dataset Shape: ({profile['rows']}, {profile['columns']})")
+    print(f"Columns: {list(profile['column_profiles'])}")
+    print(f"Profiled in {profile['seconds']:.1f}s")
@@ -5,6 +5,12 @@ import json
 import logging
 import os
 
+from dedup import StreamingDeduplicator, drop_duplicate_rows
+from memory_layout import compact_frame
+from profiling import StepProfiler
+from quantile_sketch import SKETCH_SEED, KLLSketch, load_sketches, save_sketches
+from storage import RAW_DTYPES, FrameWriter, save_frame, with_format
+
 # Setup logging
 os.makedirs("logs", exist_ok=True)
 logging.basicConfig(
@@ -13,13 +19,94 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Row-local filters in pipeline order: (step name, predicate of rows to keep)
+ROW_FILTERS = [
+    ("remove_missing_customer_ids", lambda df: df["CustomerID"].notna()),
+    ("handle_cancelled_invoices",
+     lambda df: ~df["InvoiceNo"].str.startswith("C", na=False)),
+    ("handle_negative_quantities", lambda df: df["Quantity"] > 0),
+    ("handle_zero_prices", lambda df: df["UnitPrice"] > 0),
+    ("handle_missing_descriptions", lambda df: df["Description"].notna()),
+]
+
+
+def row_filter_mask(df, rows_removed):
+    """
+    Evaluate every ROW_FILTERS predicate over df in one pass and return the
+    combined keep mask. Each dropped row is counted in rows_removed against
+    the first step that rejects it, matching the chained filters.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    kept = len(df)
+
+    for step, predicate in ROW_FILTERS:
+        keep &= predicate(df).to_numpy(dtype=bool)
+        remaining = int(np.count_nonzero(keep))
+        rows_removed[step] = rows_removed.get(step, 0) + kept - remaining
+        kept = remaining
+
+    return keep
+
+
 class DataCleaner:
     """
     Comprehensive data cleaning pipeline for Online Retail dataset
     """
 
-    def __init__(self, input_path="data/raw/online_retail.csv"):
+    def __init__(
+        self,
+        input_path="data/raw/online_retail.csv",
+        chunksize=100_000,
+        iqr_threshold=1.5,
+        outlier_method="exact",
+        sketch_error=0.01,
+        sketch_seed=SKETCH_SEED,
+        sketch_path="data/processed/outlier_sketches.json",
+        storage_format="csv",
+        fused_filters=True,
+        compact=False,
+        dedup_method="exact"
+    ):
+        """
+        outlier_method selects how remove_outliers finds Q1/Q3:
+        "exact" uses Series.quantile, "sketch" builds a mergeable KLL sketch
+        with relative rank error sketch_error, and "stored" reuses the
+        sketches loaded by load_outlier_sketches(). Sketches compact with
+        the fixed sketch_seed, so repeated runs clean identically.
+
+        storage_format ("csv", "parquet" or "feather") sets the format of
+        the cleaned output handed to feature engineering.
+
+        fused_filters applies the row-level filters as one combined mask
+        (apply_row_filters) instead of one filtered copy per step.
+
+        compact stores the cleaned frame in the compact layout of
+        memory_layout.compact_frame (categories, downcast integers, int8
+        calendar fields). It applies to run_pipeline only; streaming
+        chunks keep the default layout so every chunk shares one schema.
+
+        dedup_method selects how remove_duplicates finds repeated rows:
+        "exact" uses drop_duplicates, "hash" compares 128-bit row digests
+        (dedup.py) and verifies every drop against the row it repeats.
+        Streaming mode always deduplicates by digest.
+        """
+        if outlier_method not in ("exact", "sketch", "stored"):
+            raise ValueError(f"Unknown outlier_method: {outlier_method}")
+        if dedup_method not in ("exact", "hash"):
+            raise ValueError(f"Unknown dedup_method: {dedup_method}")
+
         self.input_path = input_path
+        self.chunksize = chunksize
+        self.iqr_threshold = iqr_threshold
+        self.outlier_method = outlier_method
+        self.sketch_error = sketch_error
+        self.sketch_seed = sketch_seed
+        self.sketch_path = sketch_path
+        self.outlier_sketches = {}
+        self.storage_format = storage_format
+        self.fused_filters = fused_filters
+        self.compact = compact
+        self.dedup_method = dedup_method
         self.df = None
         self.cleaning_stats = {
             "original_rows": 0,
@@ -36,6 +123,7 @@ class DataCleaner:
         self.df = pd.read_csv(
             self.input_path,
             encoding="latin1",
+            dtype=RAW_DTYPES,
             parse_dates=["InvoiceDate"]
         )
 
@@ -110,67 +198,135 @@ class DataCleaner:
         })
         return self
 
-    def remove_outliers(self):
-        logging.info("Removing outliers using IQR")
-
-        initial_rows = len(self.df)
+    def apply_row_filters(self):
+        """
+        Same result and steps_applied entries as the five chained row
+        filters, but with a single take of the frame at the end.
+        """
+        logging.info("Applying row filters as a single mask")
+        rows_removed = {}
+
+        keep = row_filter_mask(self.df, rows_removed)
+        self.df = self.df[keep]
+
+        for step, _ in ROW_FILTERS:
+            logging.info(f"{step}: {rows_removed[step]} rows removed")
+            self.cleaning_stats["steps_applied"].append({
+                "step": step,
+                "rows_removed": rows_removed[step]
+            })
+        return self
 
-        # Quantity IQR
-        Q1_qty = self.df["Quantity"].quantile(0.25)
-        Q3_qty = self.df["Quantity"].quantile(0.75)
-        IQR_qty = Q3_qty - Q1_qty
+    def _iqr_bounds(self, q1, q3):
+        iqr = q3 - q1
+        return q1 - self.iqr_threshold * iqr, q3 + self.iqr_threshold * iqr
+
+    def _new_sketch(self, column):
+        stored = self.outlier_sketches.get(column)
+        if stored is not None:
+            return KLLSketch(k=stored.k, seed=self.sketch_seed)
+        return KLLSketch.from_error(self.sketch_error, seed=self.sketch_seed)
+
+    def _sketch_bounds(self, column, sketch=None):
+        """
+        Fold a freshly built sketch into the stored one for this column (if
+        any) and return the IQR bounds it implies.
+        """
+        stored = self.outlier_sketches.get(column)
+        if sketch is not None:
+            stored = sketch if stored is None else stored.merge(sketch)
+            self.outlier_sketches[column] = stored
+
+        if stored is None:
+            raise ValueError(
+                f"No stored sketch for {column}; call load_outlier_sketches() first"
+            )
+        return self._iqr_bounds(stored.quantile(0.25), stored.quantile(0.75))
+
+    def _column_bounds(self, column):
+        if self.outlier_method == "exact":
+            return self._iqr_bounds(
+                self.df[column].quantile(0.25), self.df[column].quantile(0.75)
+            )
+        if self.outlier_method == "sketch":
+            sketch = self._new_sketch(column).update(self.df[column].to_numpy())
+            return self._sketch_bounds(column, sketch)
+        return self._sketch_bounds(column)
+
+    def load_outlier_sketches(self, path=None):
+        """
+        Load quantile sketches persisted by an earlier run. With
+        outlier_method="stored" their bounds are reused as-is; with "sketch"
+        the current data is merged into them.
+        """
+        path = path or self.sketch_path
+        if os.path.exists(path):
+            self.outlier_sketches = load_sketches(path)
+            logging.info(f"Loaded outlier sketches from {path}")
+        return self
 
-        lower_qty = Q1_qty - 1.5 * IQR_qty
-        upper_qty = Q3_qty + 1.5 * IQR_qty
+    def _record_outliers(self, rows_removed, bounds):
+        step = {
+            "step": "remove_outliers",
+            "rows_removed": rows_removed,
+            "method": "IQR",
+            "threshold": self.iqr_threshold,
+            "quantiles": self.outlier_method,
+            "bounds": {column: list(map(float, b)) for column, b in bounds.items()}
+        }
+        if self.outlier_method != "exact":
+            step["sketch_error"] = max(
+                sketch.error_bound for sketch in self.outlier_sketches.values()
+            )
+        self.cleaning_stats["steps_applied"].append(step)
 
-        self.df = self.df[
-            (self.df["Quantity"] >= lower_qty) &
-            (self.df["Quantity"] <= upper_qty)
-        ]
+    def remove_outliers(self):
+        logging.info(f"Removing outliers using IQR ({self.outlier_method} quantiles)")
 
-        # Price IQR
-        Q1_price = self.df["UnitPrice"].quantile(0.25)
-        Q3_price = self.df["UnitPrice"].quantile(0.75)
-        IQR_price = Q3_price - Q1_price
+        initial_rows = len(self.df)
+        bounds = {}
 
-        lower_price = Q1_price - 1.5 * IQR_price
-        upper_price = Q3_price + 1.5 * IQR_price
+        # Quantity IQR, then Price IQR on the remaining rows
+        for column in ["Quantity", "UnitPrice"]:
+            lower, upper = bounds[column] = self._column_bounds(column)
 
-        self.df = self.df[
-            (self.df["UnitPrice"] >= lower_price) &
-            (self.df["UnitPrice"] <= upper_price)
-        ]
+            self.df = self.df[
+                (self.df[column] >= lower) &
+                (self.df[column] <= upper)
+            ]
 
         rows_removed = initial_rows - len(self.df)
-        self.cleaning_stats["steps_applied"].append({
-            "step": "remove_outliers",
-            "rows_removed": rows_removed,
-            "method": "IQR",
-            "threshold": 1.5
-        })
+        self._record_outliers(rows_removed, bounds)
         return self
 
     def remove_duplicates(self):
         logging.info("Removing duplicate rows")
         initial_rows = len(self.df)
+        step = {"step": "remove_duplicates"}
 
-        self.df = self.df.drop_duplicates()
+        if self.dedup_method == "hash":
+            self.df, dedup_stats = drop_duplicate_rows(self.df)
+            step.update(dedup_stats)
+        else:
+            self.df = self.df.drop_duplicates()
 
-        rows_removed = initial_rows - len(self.df)
-        self.cleaning_stats["steps_applied"].append({
-            "step": "remove_duplicates",
-            "rows_removed": rows_removed
-        })
+        step["rows_removed"] = initial_rows - len(self.df)
+        self.cleaning_stats["steps_applied"].append(step)
         return self
 
+    @staticmethod
+    def _derive_columns(df):
+        df["TotalPrice"] = df["Quantity"] * df["UnitPrice"]
+        df["Year"] = df["InvoiceDate"].dt.year
+        df["Month"] = df["InvoiceDate"].dt.month
+        df["DayOfWeek"] = df["InvoiceDate"].dt.dayofweek
+        df["Hour"] = df["InvoiceDate"].dt.hour
+        return df
+
     def add_derived_columns(self):
         logging.info("Adding derived columns")
 
-        self.df["TotalPrice"] = self.df["Quantity"] * self.df["UnitPrice"]
-        self.df["Year"] = self.df["InvoiceDate"].dt.year
-        self.df["Month"] = self.df["InvoiceDate"].dt.month
-        self.df["DayOfWeek"] = self.df["InvoiceDate"].dt.dayofweek
-        self.df["Hour"] = self.df["InvoiceDate"].dt.hour
+        self.df = self._derive_columns(self.df)
 
         self.cleaning_stats["steps_applied"].append({
             "step": "add_derived_columns",
@@ -186,28 +342,56 @@ class DataCleaner:
         self.df["CustomerID"] = self.df["CustomerID"].astype(int)
         self.df["StockCode"] = self.df["StockCode"].astype("category")
         self.df["Country"] = self.df["Country"].astype("category")
+        step = {"step": "convert_data_types"}
 
-        self.cleaning_stats["steps_applied"].append({
-            "step": "convert_data_types"
-        })
+        if self.compact:
+            memory_before = self.df.memory_usage(deep=True).sum()
+            self.df = compact_frame(self.df)
+            memory_after = self.df.memory_usage(deep=True).sum()
+
+            step.update({
+                "layout": "compact",
+                "memory_before_mb": round(memory_before / 1024 ** 2, 2),
+                "memory_after_mb": round(memory_after / 1024 ** 2, 2),
+                "compression_ratio": round(memory_before / memory_after, 2)
+            })
+
+        self.cleaning_stats["steps_applied"].append(step)
         return self
 
-    def save_cleaned_data(self, output_path="data/processed/cleaned_transactions.csv"):
+    def _output_path(self, output_path):
+        return output_path or with_format(
+            "data/processed/cleaned_transactions", self.storage_format
+        )
+
+    def save_cleaned_data(self, output_path=None):
         os.makedirs("data/processed", exist_ok=True)
 
-        self.df.to_csv(output_path, index=False)
+        output_path = self._output_path(output_path)
+        save_frame(self.df, output_path)
+        self.cleaning_stats["output_path"] = output_path
+
+        self.cleaning_stats["missing_values_after"] = self.df.isnull().sum().to_dict()
+        return self._save_statistics(len(self.df))
 
-        self.cleaning_stats["rows_after_cleaning"] = len(self.df)
+    def _save_statistics(self, rows_after_cleaning):
+        self.cleaning_stats["rows_after_cleaning"] = rows_after_cleaning
         self.cleaning_stats["rows_removed"] = (
-            self.cleaning_stats["original_rows"] - len(self.df)
+            self.cleaning_stats["original_rows"] - rows_after_cleaning
         )
         self.cleaning_stats["retention_rate"] = round(
-            (len(self.df) / self.cleaning_stats["original_rows"]) * 100, 2
+            (rows_after_cleaning / self.cleaning_stats["original_rows"]) * 100, 2
         )
-        self.cleaning_stats["missing_values_after"] = self.df.isnull().sum().to_dict()
 
-        with open("data/processed/cleaning_statistics.json", "w") as f:
-            json.dump(self.cleaning_stats, f, indent=4)
+        self._write_statistics()
+
+        if self.outlier_sketches:
+            save_sketches(
+                self.outlier_sketches,
+                self.sketch_path,
+                iqr_threshold=self.iqr_threshold,
+                seed=self.sketch_seed
+            )
 
         print("\nDATA CLEANING SUMMARY")
         print("=" * 50)
@@ -219,29 +403,262 @@ class DataCleaner:
 
         return self
 
-    def run_pipeline(self):
+    def _write_statistics(self):
+        with open("data/processed/cleaning_statistics.json", "w") as f:
+            json.dump(self.cleaning_stats, f, indent=4)
+
+    def run_pipeline(self, trace_path=None, profile=False, deep_memory=False):
+        """
+        Run every cleaning step. With profile, per-step time, throughput,
+        frame memory and RSS are recorded under "profile" in
+        cleaning_statistics.json; trace_path also writes them as a Chrome
+        trace and deep_memory measures string contents (both imply profile).
+        """
         print("Starting data cleaning pipeline...")
+        profiler = None
+        if profile or trace_path or deep_memory:
+            profiler = StepProfiler(lambda: self.df, deep=deep_memory)
+
+        chain = (profiler.wrap(self) if profiler else self).load_data()
+
+        if self.fused_filters:
+            chain = chain.apply_row_filters()
+        else:
+            chain = (
+                chain.remove_missing_customer_ids()
+                .handle_cancelled_invoices()
+                .handle_negative_quantities()
+                .handle_zero_prices()
+                .handle_missing_descriptions()
+            )
 
         (
-            self.load_data()
-            .remove_missing_customer_ids()
-            .handle_cancelled_invoices()
-            .handle_negative_quantities()
-            .handle_zero_prices()
-            .handle_missing_descriptions()
-            .remove_outliers()
+            chain.remove_outliers()
             .remove_duplicates()
             .add_derived_columns()
             .convert_data_types()
             .save_cleaned_data()
         )
 
+        if profiler is not None:
+            self.cleaning_stats["profile"] = profiler.summary()
+            self._write_statistics()
+        if trace_path:
+            profiler.write_chrome_trace(trace_path, "data_cleaning")
+
         print("Data cleaning pipeline completed successfully!")
         return self.df
 
+    # ======================
+    # Streaming mode
+    # ======================
+    def _read_chunks(self):
+        return pd.read_csv(
+            self.input_path,
+            encoding="latin1",
+            dtype=RAW_DTYPES,
+            parse_dates=["InvoiceDate"],
+            chunksize=self.chunksize
+        )
+
+    @staticmethod
+    def _filter_chunk(chunk, rows_removed):
+        """
+        Apply the row-local cleaning filters to one chunk, in pipeline order,
+        adding the rows each step drops to rows_removed.
+        """
+        return chunk[row_filter_mask(chunk, rows_removed)]
+
+    def _raw_chunks(self, missing_before):
+        for chunk in self._read_chunks():
+            self.cleaning_stats["original_rows"] += len(chunk)
+            _add_counts(missing_before, chunk.isnull().sum())
+            yield chunk
+
+    def _spool_chunks(self, spool_path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(spool_path).iter_batches(batch_size=self.chunksize):
+            yield batch.to_pandas()
+
+    @staticmethod
+    def _within(chunk, column, bounds):
+        lower, upper = bounds
+        return chunk[(chunk[column] >= lower) & (chunk[column] <= upper)]
+
+    def _write_chunks(self, chunks, output_path, missing_after, deduplicator=None):
+        with FrameWriter(output_path) as writer:
+            for i, chunk in enumerate(chunks):
+                if deduplicator is not None:
+                    chunk = deduplicator.deduplicate(chunk)
+                chunk = self._derive_columns(chunk.copy())
+                chunk["CustomerID"] = chunk["CustomerID"].astype(int)
+                _add_counts(missing_after, chunk.isnull().sum())
+
+                writer.write(chunk)
+                logging.info(f"Chunk {i}: wrote {len(chunk)} rows")
+
+        return writer.rows_written
+
+    def _stream_outliers(self, chunks, output_path, missing_after, outliers_removed, deduplicator=None):
+        """
+        Apply IQR outlier removal to a stream of row-filtered chunks.
+
+        With stored sketches the bounds are known up front and a single pass
+        suffices. Otherwise the chunks are spooled to disk while the Quantity
+        sketch is built, the spool is re-read once to build the UnitPrice
+        sketch on rows within the Quantity bounds, and a final pass over the
+        spool applies both bounds, matching the order of remove_outliers.
+        """
+        def counted(chunks, column, bounds):
+            for chunk in chunks:
+                kept = self._within(chunk, column, bounds)
+                outliers_removed[0] += len(chunk) - len(kept)
+                yield kept
+
+        if self.outlier_method == "stored":
+            bounds = {
+                column: self._sketch_bounds(column)
+                for column in ["Quantity", "UnitPrice"]
+            }
+            chunks = counted(chunks, "Quantity", bounds["Quantity"])
+            chunks = counted(chunks, "UnitPrice", bounds["UnitPrice"])
+            return self._write_chunks(chunks, output_path, missing_after, deduplicator), bounds
+
+        spool_path = output_path + ".spool.parquet"
+        bounds = {}
+        try:
+            sketch = self._new_sketch("Quantity")
+            with FrameWriter(spool_path) as spool:
+                for chunk in chunks:
+                    sketch.update(chunk["Quantity"].to_numpy())
+                    spool.write(chunk)
+            bounds["Quantity"] = self._sketch_bounds("Quantity", sketch)
+
+            sketch = self._new_sketch("UnitPrice")
+            for chunk in self._spool_chunks(spool_path):
+                sketch.update(self._within(chunk, "Quantity", bounds["Quantity"])["UnitPrice"].to_numpy())
+            bounds["UnitPrice"] = self._sketch_bounds("UnitPrice", sketch)
+
+            chunks = counted(self._spool_chunks(spool_path), "Quantity", bounds["Quantity"])
+            chunks = counted(chunks, "UnitPrice", bounds["UnitPrice"])
+            rows_written = self._write_chunks(chunks, output_path, missing_after, deduplicator)
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+        return rows_written, bounds
+
+    def run_streaming_pipeline(self, output_path=None, remove_outliers=True, remove_duplicates=True):
+        """
+        Clean the raw file chunk by chunk and append each cleaned chunk to
+        output_path, so peak memory is bounded by chunksize rather than by
+        the size of the raw file.
+
+        Outliers are removed with quantile sketches ("exact" falls back to
+        "sketch" here). Duplicates are removed by 128-bit row digest against
+        a seen-set that spills to disk, keeping first occurrences in file
+        order as drop_duplicates does.
+        """
+        print("Starting streaming data cleaning pipeline...")
+        logging.info(f"Streaming raw dataset in chunks of {self.chunksize} rows")
+        os.makedirs("data/processed", exist_ok=True)
+        output_path = self._output_path(output_path)
+
+        if remove_outliers and self.outlier_method == "exact":
+            logging.info("Exact quantiles need the full columns; using sketches instead")
+            self.outlier_method = "sketch"
+
+        row_steps = [step for step, _ in ROW_FILTERS]
+        rows_removed = dict.fromkeys(row_steps, 0)
+        missing_before = {}
+        missing_after = {}
+
+        chunks = (
+            self._filter_chunk(chunk, rows_removed)
+            for chunk in self._raw_chunks(missing_before)
+        )
+
+        deduplicator = StreamingDeduplicator() if remove_duplicates else None
+        try:
+            if remove_outliers:
+                outliers_removed = [0]
+                rows_written, bounds = self._stream_outliers(
+                    chunks, output_path, missing_after, outliers_removed, deduplicator
+                )
+            else:
+                rows_written = self._write_chunks(chunks, output_path, missing_after, deduplicator)
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+
+        self.cleaning_stats["missing_values_before"] = missing_before
+        self.cleaning_stats["missing_values_after"] = missing_after
+        self.cleaning_stats["steps_applied"] = [
+            {"step": step, "rows_removed": rows_removed[step]} for step in row_steps
+        ]
+        if remove_outliers:
+            self._record_outliers(outliers_removed[0], bounds)
+        if remove_duplicates:
+            self.cleaning_stats["steps_applied"].append({
+                "step": "remove_duplicates",
+                **deduplicator.stats()
+            })
+        self.cleaning_stats["steps_applied"] += [
+            {
+                "step": "add_derived_columns",
+                "columns_added": [
+                    "TotalPrice", "Year", "Month", "DayOfWeek", "Hour"
+                ]
+            },
+            {"step": "convert_data_types"}
+        ]
+        self.cleaning_stats["output_path"] = output_path
+        self.cleaning_stats["mode"] = "streaming"
+        self.cleaning_stats["chunksize"] = self.chunksize
+
+        self._save_statistics(rows_written)
+
+        print("Streaming data cleaning pipeline completed successfully!")
+        return output_path
+
+
+def _add_counts(totals, counts):
+    for column, count in counts.items():
+        totals[column] = totals.get(column, 0) + int(count)
 
 if __name__ == "__main__":
-    cleaner = DataCleaner("data/raw/online_retail.csv")
-    cleaned_df = cleaner.run_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean the raw Online Retail dataset")
+    parser.add_argument("--streaming", action="store_true", help="process the raw file in chunks")
+    parser.add_argument("--reuse-sketches", action="store_true", help="reuse stored IQR sketches")
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "feather"])
+    parser.add_argument("--profile", action="store_true", help="record per-step time and memory")
+    parser.add_argument("--deep-memory", action="store_true", help="profile memory including string contents")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of the pipeline steps")
+    parser.add_argument("--chained-filters", action="store_true", help="filter with one copy per step")
+    parser.add_argument("--compact", action="store_true", help="keep the cleaned frame in the compact layout")
+    parser.add_argument("--dedup", default="exact", choices=["exact", "hash"], help="duplicate detection method")
+    args = parser.parse_args()
+
+    cleaner = DataCleaner(
+        "data/raw/online_retail.csv",
+        storage_format=args.format,
+        fused_filters=not args.chained_filters,
+        compact=args.compact,
+        dedup_method=args.dedup
+    )
+
+    if args.reuse_sketches:
+        cleaner.outlier_method = "stored"
+        cleaner.load_outlier_sketches()
+
+    if args.streaming:
+        cleaner.run_streaming_pipeline()
+    else:
+        cleaned_df = cleaner.run_pipeline(
+            trace_path=args.trace, profile=args.profile, deep_memory=args.deep_memory
+        )
 
-    print(f"\nFinal cleaned dataset shape: {cleaned_df.shape}")
+        print(f"\nFinal cleaned dataset shape: {cleaned_df.shape}")
@@ -4,20 +4,92 @@ import json
 import os
 from datetime import timedelta
 
+from feature_matrix import FEATURE_MATRIX_DIR, save_feature_matrix
+from feature_store import CustomerFeatureStore
+from profiling import StepProfiler
+from snapshots import SnapshotBuilder
+from storage import load_frame, save_frame, with_format
+
+# Transaction columns the customer features are built from
+TRANSACTION_COLUMNS = ["CustomerID", "InvoiceNo", "InvoiceDate", "TotalPrice"]
+
+# Column order of customer_features
+CUSTOMER_COLUMNS = [
+    "CustomerID", "Recency", "Frequency", "Monetary",
+    "AvgOrderValue", "ActiveMonths", "Churn", "LogMonetary"
+]
+
+
+def cleaned_data_path(stats_path="data/processed/cleaning_statistics.json"):
+    """Path of the latest cleaned output, as recorded by DataCleaner."""
+    if os.path.exists(stats_path):
+        with open(stats_path) as f:
+            output_path = json.load(f).get("output_path")
+        if output_path and os.path.exists(output_path):
+            return output_path
+    return "data/processed/cleaned_transactions.csv"
+
+def aggregate_customers(df):
+    """
+    Per-customer LastPurchase, Frequency, Monetary and ActiveMonths from
+    cleaned transactions, in a single native groupby.
+    """
+    # Calendar month as an integer key, computed on the raw datetime64 array
+    month_key = df["InvoiceDate"].to_numpy().astype("datetime64[M]").astype(np.int64)
+
+    return (
+        df.assign(MonthKey=month_key)
+        .groupby("CustomerID")
+        .agg(
+            LastPurchase=("InvoiceDate", "max"),
+            Frequency=("InvoiceNo", "nunique"),
+            Monetary=("TotalPrice", "sum"),
+            ActiveMonths=("MonthKey", "nunique")
+        )
+    )
+
+
+def customer_features(aggregates, reference_date):
+    """
+    Customer feature table (without Churn and LogMonetary, which
+    define_churn and finalize_features add) from aggregate_customers output.
+    """
+    snapshot_date = reference_date + timedelta(days=1)
+    customer_df = aggregates.copy()
+
+    customer_df["Recency"] = (snapshot_date - customer_df["LastPurchase"]).dt.days
+    # Mean of per-invoice totals == total spend / number of invoices
+    customer_df["AvgOrderValue"] = customer_df["Monetary"] / customer_df["Frequency"]
+
+    return customer_df.reset_index()[
+        [c for c in CUSTOMER_COLUMNS if c not in ("Churn", "LogMonetary")]
+    ]
+
+
+def finalize_customer_features(customer_df):
+    """Add LogMonetary and put the columns in CUSTOMER_COLUMNS order."""
+    customer_df["LogMonetary"] = np.log1p(customer_df["Monetary"])
+    return customer_df[CUSTOMER_COLUMNS]
+
+
 class FeatureEngineer:
     """
     Feature engineering and churn labeling for customer-level prediction
     """
 
-    def __init__(self, input_path="data/processed/cleaned_transactions.csv"):
-        self.input_path = input_path
+    def __init__(self, input_path=None, storage_format="csv", churn_threshold_days=90):
+        self.input_path = input_path or cleaned_data_path()
+        self.storage_format = storage_format
+        self.churn_threshold_days = churn_threshold_days
         self.df = None
         self.customer_df = None
+        self.snapshot_df = None
         self.feature_metadata = {}
 
     def load_data(self):
-        self.df = pd.read_csv(
+        self.df = load_frame(
             self.input_path,
+            columns=TRANSACTION_COLUMNS,
             parse_dates=["InvoiceDate"]
         )
         return self
@@ -26,6 +98,18 @@ class FeatureEngineer:
         self.reference_date = self.df["InvoiceDate"].max()
         return self
 
+    def create_customer_features(self):
+        """
+        Build Recency, Frequency, Monetary, AvgOrderValue and ActiveMonths
+        in one native groupby, with no per-customer Python callbacks.
+        Equivalent to create_rfm_features followed by
+        create_additional_features.
+        """
+        self.customer_df = customer_features(
+            aggregate_customers(self.df), self.reference_date
+        )
+        return self
+
     def create_rfm_features(self):
         snapshot_date = self.reference_date + timedelta(days=1)
 
@@ -65,21 +149,26 @@ class FeatureEngineer:
         )
         return self
 
-    def define_churn(self, churn_threshold_days=90):
+    def define_churn(self, churn_threshold_days=None):
+        if churn_threshold_days is not None:
+            self.churn_threshold_days = churn_threshold_days
+
         self.customer_df["Churn"] = (
-            self.customer_df["Recency"] > churn_threshold_days
+            self.customer_df["Recency"] > self.churn_threshold_days
         ).astype(int)
         return self
 
     def finalize_features(self):
-        self.customer_df["LogMonetary"] = np.log1p(self.customer_df["Monetary"])
+        self.customer_df = finalize_customer_features(self.customer_df)
         return self
 
     def save_outputs(self):
         os.makedirs("data/processed", exist_ok=True)
 
-        output_path = "data/processed/customer_features.csv"
-        self.customer_df.to_csv(output_path, index=False)
+        output_path = with_format("data/processed/customer_features", self.storage_format)
+        save_frame(self.customer_df, output_path)
+        # float32 matrix that training and scoring can memory-map
+        save_feature_matrix(self.customer_df, FEATURE_MATRIX_DIR, source_path=output_path)
 
         churn_rate = round(self.customer_df["Churn"].mean() * 100, 2)
 
@@ -95,12 +184,13 @@ class FeatureEngineer:
                 "ActiveMonths": "Number of active months",
                 "Churn": "Target variable (1 = churned, 0 = active)"
             },
-            "churn_definition": "Customer inactive for more than 90 days",
-            "reference_date": str(self.reference_date.date())
+            "churn_definition": f"Customer inactive for more than {self.churn_threshold_days} days",
+            "reference_date": str(self.reference_date.date()),
+            "features_path": output_path,
+            "feature_matrix_path": FEATURE_MATRIX_DIR
         }
 
-        with open("data/processed/feature_metadata.json", "w") as f:
-            json.dump(self.feature_metadata, f, indent=4)
+        self._write_metadata()
 
         print("\nFEATURE ENGINEERING SUMMARY")
         print("=" * 50)
@@ -110,22 +200,188 @@ class FeatureEngineer:
 
         return self
 
-    def run_pipeline(self):
+    def _write_metadata(self):
+        with open("data/processed/feature_metadata.json", "w") as f:
+            json.dump(self.feature_metadata, f, indent=4)
+
+    def run_pipeline(self, trace_path=None, profile=False, deep_memory=False):
+        """
+        Build the feature table. With profile, per-step profiling is
+        recorded under "profile" in feature_metadata.json; trace_path and
+        deep_memory work as in DataCleaner.run_pipeline.
+        """
+        profiler = None
+        if profile or trace_path or deep_memory:
+            profiler = StepProfiler(
+                lambda: self.customer_df if self.customer_df is not None else self.df,
+                deep=deep_memory
+            )
+
         (
-            self.load_data()
+            (profiler.wrap(self) if profiler else self).load_data()
             .create_reference_date()
-            .create_rfm_features()
-            .create_additional_features()
+            .create_customer_features()
             .define_churn()
             .finalize_features()
             .save_outputs()
         )
 
+        if profiler is not None:
+            self.feature_metadata["profile"] = profiler.summary()
+            self._write_metadata()
+        if trace_path:
+            profiler.write_chrome_trace(trace_path, "feature_engineering")
+
+        return self.customer_df
+
+    def run_incremental_pipeline(self, store_dir="data/feature_store"):
+        """
+        Fold the transactions at input_path (only the new ones) into the
+        on-disk feature store, then rebuild Recency and Churn for every
+        customer against the updated reference date.
+        """
+        # Whole rows, so the store's digests tell apart distinct lines that
+        # agree on the transaction columns
+        store = CustomerFeatureStore(store_dir).load()
+        store.update(load_frame(self.input_path, parse_dates=["InvoiceDate"])).save()
+
+        self.reference_date = store.reference_date
+        self.customer_df = store.features()
+
+        (
+            self.define_churn()
+            .finalize_features()
+            .save_outputs()
+        )
+
+        return self.customer_df
+
+    def create_snapshots(self, cutoffs=None, freq="MS"):
+        """
+        Point-in-time training rows: features as of each cutoff and Churn
+        from the churn_threshold_days after it. Without explicit cutoffs,
+        one per freq period with a fully observed label window.
+        """
+        builder = SnapshotBuilder(self.df)
+        if cutoffs is None:
+            cutoffs = builder.cutoffs(self.churn_threshold_days, freq)
+
+        self.snapshot_df = builder.build(cutoffs, self.churn_threshold_days)
+        return self
+
+    def save_snapshots(self):
+        os.makedirs("data/processed", exist_ok=True)
+
+        output_path = with_format("data/processed/training_snapshots", self.storage_format)
+        save_frame(self.snapshot_df, output_path)
+
+        per_cutoff = self.snapshot_df.groupby("SnapshotDate")["Churn"].agg(["size", "mean"])
+        snapshot_metadata = {
+            "total_rows": int(len(self.snapshot_df)),
+            "label_window_days": self.churn_threshold_days,
+            "churn_definition": (
+                f"No purchase in the {self.churn_threshold_days} days after the snapshot date"
+            ),
+            "snapshots": {
+                str(date.date()): {
+                    "customers": int(row["size"]),
+                    "churn_rate_percentage": round(row["mean"] * 100, 2)
+                }
+                for date, row in per_cutoff.iterrows()
+            },
+            "snapshots_path": output_path
+        }
+        with open("data/processed/snapshot_metadata.json", "w") as f:
+            json.dump(snapshot_metadata, f, indent=4)
+
+        print("\nTRAINING SNAPSHOTS SUMMARY")
+        print("=" * 50)
+        print(f"Snapshots: {len(per_cutoff)}")
+        print(f"Total rows: {len(self.snapshot_df)}")
+        if len(self.snapshot_df):
+            print(f"Churn rate: {round(self.snapshot_df['Churn'].mean() * 100, 2)}%")
+        print("=" * 50)
+
+        return self
+
+    def run_snapshot_pipeline(self, cutoffs=None, freq="MS"):
+        (
+            self.load_data()
+            .create_snapshots(cutoffs, freq)
+            .save_snapshots()
+        )
+        return self.snapshot_df
+
+    def run_lazy_pipeline(self, raw_path="data/raw/online_retail.csv", outlier_method="exact"):
+        """
+        Build the feature table straight from the raw file with the lazy,
+        optimized plan of lazy_pipeline (cleaning and features in one
+        streaming pass), without writing cleaned transactions.
+        """
+        # Imported here: lazy_pipeline itself imports this module
+        from lazy_pipeline import lazy_pipeline
+
+        plan = lazy_pipeline(
+            raw_path,
+            outlier_method=outlier_method,
+            churn_threshold_days=self.churn_threshold_days
+        )
+        self.customer_df = plan.collect()
+        self.reference_date = plan.reference_date
+
+        self.save_outputs()
+        self.feature_metadata["lazy_pipeline"] = {
+            "plan": plan.explain().splitlines(),
+            **plan.stats
+        }
+        self._write_metadata()
+
         return self.customer_df
 
 
 if __name__ == "__main__":
-    engineer = FeatureEngineer()
-    customer_features = engineer.run_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build customer-level churn features")
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "feather"])
+    parser.add_argument(
+        "--incremental",
+        metavar="NEW_TRANSACTIONS",
+        help="fold a file of new cleaned transactions into the feature store"
+    )
+    parser.add_argument("--profile", action="store_true", help="record per-step time and memory")
+    parser.add_argument("--deep-memory", action="store_true", help="profile memory including string contents")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of the pipeline steps")
+    parser.add_argument(
+        "--snapshots",
+        action="store_true",
+        help="build point-in-time training snapshots instead of the single feature table"
+    )
+    parser.add_argument("--cutoffs", help="comma-separated snapshot dates (default: one per --snapshot-freq)")
+    parser.add_argument("--snapshot-freq", default="MS", help="pandas frequency of default cutoffs")
+    parser.add_argument(
+        "--lazy",
+        metavar="RAW_PATH",
+        nargs="?",
+        const="data/raw/online_retail.csv",
+        help="clean and aggregate the raw file in one optimized streaming pass"
+    )
+    args = parser.parse_args()
+
+    if args.lazy:
+        engineer = FeatureEngineer(storage_format=args.format)
+        customer_features = engineer.run_lazy_pipeline(args.lazy)
+    elif args.snapshots:
+        engineer = FeatureEngineer(storage_format=args.format)
+        cutoffs = args.cutoffs.split(",") if args.cutoffs else None
+        customer_features = engineer.run_snapshot_pipeline(cutoffs, args.snapshot_freq)
+    elif args.incremental:
+        engineer = FeatureEngineer(args.incremental, storage_format=args.format)
+        customer_features = engineer.run_incremental_pipeline()
+    else:
+        engineer = FeatureEngineer(storage_format=args.format)
+        customer_features = engineer.run_pipeline(
+            trace_path=args.trace, profile=args.profile, deep_memory=args.deep_memory
+        )
 
     print("\nFinal feature dataset shape:", customer_features.shape)
@@ -1,99 +1,386 @@
 import pandas as pd
 import numpy as np
+import hashlib
 import json
 import os
+import time
 import joblib
+from concurrent.futures import ProcessPoolExecutor
 
-from sklearn.model_selection import train_test_split
+from scipy.stats import loguniform
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 
-# ======================
-# Load data
-# ======================
-df = pd.read_csv("data/processed/customer_features.csv")
+from artifact_format import file_sha256
+from feature_matrix import FeatureMatrix
+from model_artifact import save_model_artifact, source_fingerprints
+from storage import load_frame
 
-X = df.drop(columns=["Churn"])
-y = df["Churn"]
+# Hyperparameter search spaces per model family
+SEARCH_SPACES = {
+    "logistic_regression": {
+        "C": loguniform(1e-3, 1e2),
+        "class_weight": [None, "balanced"]
+    },
+    "random_forest": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 8, 16, 32],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", "log2", None]
+    }
+}
 
-if "CustomerID" in X.columns:
-    X = X.drop(columns=["CustomerID"])
 
-X = X.select_dtypes(include=[np.number])
+def build_model(family, params, n_jobs=1):
+    if family == "logistic_regression":
+        return LogisticRegression(max_iter=1000, random_state=42, **params)
+    return RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params)
 
-# ======================
-# Train-test split
-# ======================
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y,
-    test_size=0.25,
-    random_state=42,
-    stratify=y
-)
 
 # ======================
-# Scaling
+# Search workers
 # ======================
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+_worker_state = {}
 
-os.makedirs("models", exist_ok=True)
 
-# ======================
-# Logistic Regression
-# ======================
-lr = LogisticRegression(max_iter=1000, random_state=42)
-lr.fit(X_train_scaled, y_train)
+def _init_worker(X, y, folds, fold_scalers):
+    _worker_state.update(X=X, y=y, folds=folds, fold_scalers=fold_scalers)
 
-lr_preds = lr.predict(X_test_scaled)
-lr_probs = lr.predict_proba(X_test_scaled)[:, 1]
 
-# ======================
-# Random Forest
-# ======================
-rf = RandomForestClassifier(
-    n_estimators=200,
-    random_state=42,
-    n_jobs=-1
-)
-rf.fit(X_train, y_train)
+def _init_matrix_worker(matrix_dir, train_rows, y, folds, fold_scalers):
+    # Each worker maps the shared feature matrix instead of unpickling a copy
+    X = FeatureMatrix(matrix_dir).X[train_rows]
+    _init_worker(X, y, folds, fold_scalers)
 
-rf_preds = rf.predict(X_test)
-rf_probs = rf.predict_proba(X_test)[:, 1]
 
-# ======================
-# Metrics (NO nested dict issues)
-# ======================
-metrics = {}
-
-metrics["logistic_regression"] = {
-    "accuracy": float(accuracy_score(y_test, lr_preds)),
-    "precision": float(precision_score(y_test, lr_preds)),
-    "recall": float(recall_score(y_test, lr_preds)),
-    "f1_score": float(f1_score(y_test, lr_preds)),
-    "roc_auc": float(roc_auc_score(y_test, lr_probs))
-}
+def _score_candidate(family, params, fold):
+    X, y = _worker_state["X"], _worker_state["y"]
+    train_idx, val_idx = _worker_state["folds"][fold]
+    X_train, X_val = X[train_idx], X[val_idx]
 
-metrics["random_forest"] = {
-    "accuracy": float(accuracy_score(y_test, rf_preds)),
-    "precision": float(precision_score(y_test, rf_preds)),
-    "recall": float(recall_score(y_test, rf_preds)),
-    "f1_score": float(f1_score(y_test, rf_preds)),
-    "roc_auc": float(roc_auc_score(y_test, rf_probs))
-}
+    if family == "logistic_regression":
+        scaler = _worker_state["fold_scalers"][fold]
+        X_train, X_val = scaler.transform(X_train), scaler.transform(X_val)
 
-# ======================
-# Save outputs
-# ======================
-joblib.dump(lr, "models/logistic_regression.pkl")
-joblib.dump(rf, "models/random_forest.pkl")
-joblib.dump(scaler, "models/scaler.pkl")
+    model = build_model(family, params).fit(X_train, y[train_idx])
+    return roc_auc_score(y[val_idx], model.predict_proba(X_val)[:, 1])
+
+
+class ModelTrainer:
+    """
+    Churn model training with a parallel randomized hyperparameter search.
+
+    CV fold splits, fitted scalers and candidate scores are cached under
+    models/cache/<hash of the feature file>, so repeated searches on
+    unchanged data only evaluate candidates not seen before.
+    """
+
+    def __init__(
+        self,
+        features_path=None,
+        n_iter=10,
+        cv=5,
+        workers=None,
+        cache_dir="models/cache",
+        output_dir="models",
+        feature_matrix_dir=None,
+        compress=0
+    ):
+        """
+        Features come from features_path, or from the memory-mapped
+        float32 matrix written by FeatureEngineer when it holds the same
+        data: by default the matrix recorded in feature_metadata.json is
+        used only if its schema records the current contents of
+        features_path. Pass feature_matrix_dir to use a given matrix, or
+        False to always read features_path.
+
+        compress is the joblib compression level (0-9) of the model
+        pickles: smaller files, slower loads. Scoring processes load the
+        uncompressed model artifact written next to them either way.
+        """
+        self.features_path = features_path or self._default_features_path()
+        if feature_matrix_dir is None:
+            feature_matrix_dir = self._default_feature_matrix_dir(self.features_path)
+        self.feature_matrix_dir = feature_matrix_dir or None
+        self.n_iter = n_iter
+        self.cv = cv
+        self.workers = workers or os.cpu_count()
+        self.cache_root = cache_dir
+        self.output_dir = output_dir
+        self.compress = compress
+        self.models = {}
+        self.search_results = {}
+        self.metrics = {}
+
+    @staticmethod
+    def _default_features_path():
+        features_path = "data/processed/customer_features.csv"
+        if os.path.exists("data/processed/feature_metadata.json"):
+            with open("data/processed/feature_metadata.json") as f:
+                features_path = json.load(f).get("features_path", features_path)
+        return features_path
+
+    @staticmethod
+    def _default_feature_matrix_dir(features_path):
+        if os.path.exists("data/processed/feature_metadata.json"):
+            with open("data/processed/feature_metadata.json") as f:
+                matrix_dir = json.load(f).get("feature_matrix_path")
+            # A matrix of another feature table would silently train on other data
+            if (
+                matrix_dir and FeatureMatrix.exists(matrix_dir)
+                and FeatureMatrix(matrix_dir).built_from(features_path)
+            ):
+                return matrix_dir
+        return None
+
+    def _load_matrix(self):
+        matrix = FeatureMatrix(self.feature_matrix_dir)
+        self.X = matrix.frame()
+        self.y = pd.Series(matrix.labels, name="Churn")
+
+        digest = hashlib.sha256()
+        for name in ["features.npy", "labels.npy", "schema.json"]:
+            digest.update(file_sha256(os.path.join(self.feature_matrix_dir, name)).encode())
+        self.data_hash = digest.hexdigest()
+        self.cache_dir = os.path.join(self.cache_root, self.data_hash[:16])
+        return self
+
+    def load_data(self):
+        if self.feature_matrix_dir:
+            return self._load_matrix()
+
+        df = load_frame(self.features_path)
+
+        X = df.drop(columns=["Churn"])
+        y = df["Churn"]
+
+        if "CustomerID" in X.columns:
+            X = X.drop(columns=["CustomerID"])
+
+        self.X = X.select_dtypes(include=[np.number])
+        self.y = y
+        self.data_hash = file_sha256(self.features_path)
+        self.cache_dir = os.path.join(self.cache_root, self.data_hash[:16])
+        return self
+
+    def split_data(self):
+        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
+            self.X, self.y,
+            test_size=0.25,
+            random_state=42,
+            stratify=self.y
+        )
+        return self
+
+    def _cached(self, name, build):
+        path = os.path.join(self.cache_dir, name)
+        if os.path.exists(path):
+            self.cache_hits.append(name)
+            return joblib.load(path)
+
+        value = build()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        joblib.dump(value, path)
+        return value
+
+    def prepare_cv(self):
+        self.cache_hits = []
+        X_train = self.X_train.to_numpy(dtype=np.float64)
+        y_train = self.y_train.to_numpy()
+
+        self.folds = self._cached(
+            f"folds-cv{self.cv}.joblib",
+            lambda: list(
+                StratifiedKFold(self.cv, shuffle=True, random_state=42).split(X_train, y_train)
+            )
+        )
+        scalers = self._cached(
+            f"scalers-cv{self.cv}.joblib",
+            lambda: {
+                "train": StandardScaler().fit(self.X_train),
+                "folds": [StandardScaler().fit(X_train[train_idx]) for train_idx, _ in self.folds]
+            }
+        )
+        self.scaler = scalers["train"]
+        self.fold_scalers = scalers["folds"]
+        return self
+
+    def _load_scores(self):
+        """Cached candidate scores and the search seconds spent computing them."""
+        path = os.path.join(self.cache_dir, f"search-cv{self.cv}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                cached = json.load(f)
+            return cached["scores"], cached["search_seconds"]
+        return {}, 0.0
+
+    def _save_scores(self, scores, search_seconds):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, f"search-cv{self.cv}.json"), "w") as f:
+            json.dump({"scores": scores, "search_seconds": search_seconds}, f, indent=4)
+
+    def search(self):
+        """
+        Evaluate every (candidate, fold) pair across a process pool.
+        search_seconds is the wall-clock time spent computing all scores,
+        including cached ones from earlier runs; run_seconds is this run's.
+        """
+        start = time.perf_counter()
+        scores, cached_seconds = self._load_scores()
+
+        candidates = {
+            family: list(ParameterSampler(space, self.n_iter, random_state=42))
+            for family, space in SEARCH_SPACES.items()
+        }
+        pending = [
+            (family, params)
+            for family, family_candidates in candidates.items()
+            for params in family_candidates
+            if _candidate_key(family, params) not in scores
+        ]
+
+        if self.feature_matrix_dir:
+            initializer, initargs = _init_matrix_worker, (
+                self.feature_matrix_dir, self.X_train.index.to_numpy()
+            )
+        else:
+            initializer, initargs = _init_worker, (self.X_train.to_numpy(dtype=np.float64),)
+
+        if pending:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=initializer,
+                initargs=initargs + (self.y_train.to_numpy(), self.folds, self.fold_scalers)
+            ) as pool:
+                futures = {
+                    (family, _candidate_key(family, params), fold): pool.submit(
+                        _score_candidate, family, params, fold
+                    )
+                    for family, params in pending
+                    for fold in range(self.cv)
+                }
+                for family, params in pending:
+                    key = _candidate_key(family, params)
+                    scores[key] = float(np.mean([
+                        futures[(family, key, fold)].result() for fold in range(self.cv)
+                    ]))
+            cached_seconds += time.perf_counter() - start
+            self._save_scores(scores, cached_seconds)
+
+        for family, family_candidates in candidates.items():
+            best = max(family_candidates, key=lambda p: scores[_candidate_key(family, p)])
+            self.search_results[family] = {
+                "best_params": _jsonable(best),
+                "cv_roc_auc": scores[_candidate_key(family, best)],
+                "candidates_evaluated": len(family_candidates)
+            }
+
+        self.search_seconds = cached_seconds
+        self.run_seconds = time.perf_counter() - start
+        self.candidates_computed = len(pending)
+        return self
+
+    def fit_best(self):
+        X_train_scaled = self.scaler.transform(self.X_train)
+        X_test_scaled = self.scaler.transform(self.X_test)
+
+        for family, result in self.search_results.items():
+            model = build_model(family, result["best_params"], n_jobs=-1)
+
+            if family == "logistic_regression":
+                model.fit(X_train_scaled, self.y_train)
+                probs = model.predict_proba(X_test_scaled)[:, 1]
+            else:
+                model.fit(self.X_train, self.y_train)
+                probs = model.predict_proba(self.X_test)[:, 1]
+
+            preds = (probs >= 0.5).astype(int)
+            self.models[family] = model
+            self.metrics[family] = {
+                "accuracy": float(accuracy_score(self.y_test, preds)),
+                "precision": float(precision_score(self.y_test, preds)),
+                "recall": float(recall_score(self.y_test, preds)),
+                "f1_score": float(f1_score(self.y_test, preds)),
+                "roc_auc": float(roc_auc_score(self.y_test, probs)),
+                **result,
+                "search_wall_clock_seconds": round(self.search_seconds, 3),
+                "search_cache_hit": self.candidates_computed == 0
+            }
+        return self
+
+    def save_outputs(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        for name, value in [
+            ("logistic_regression", self.models["logistic_regression"]),
+            ("random_forest", self.models["random_forest"]),
+            ("scaler", self.scaler)
+        ]:
+            joblib.dump(value, os.path.join(self.output_dir, f"{name}.pkl"), compress=self.compress)
+
+        # Loads without sklearn, with the forest arrays memory-mapped
+        artifact_dir = os.path.join(self.output_dir, "artifact")
+        manifest = save_model_artifact(
+            self.scaler,
+            self.models["logistic_regression"],
+            self.models["random_forest"],
+            list(self.X.columns),
+            artifact_dir,
+            sources=source_fingerprints(self.output_dir)
+        )
+
+        with open(os.path.join(self.output_dir, "model_metrics.json"), "w") as f:
+            json.dump(self.metrics, f, indent=4)
+
+        print("\nMODEL TRAINING COMPLETE")
+        print(f"Search: {self.candidates_computed} candidates computed, "
+              f"cached: {', '.join(self.cache_hits) or 'none'}, "
+              f"{self.run_seconds:.1f}s on {self.workers} workers")
+        print(f"Model artifact: {artifact_dir} (checksum {manifest['checksum'][:12]})")
+        print(json.dumps(self.metrics, indent=4))
+        return self
+
+    def run_pipeline(self):
+        (
+            self.load_data()
+            .split_data()
+            .prepare_cv()
+            .search()
+            .fit_best()
+            .save_outputs()
+        )
+        return self.metrics
+
+
+def _jsonable(params):
+    return {
+        k: v.item() if isinstance(v, np.generic) else v
+        for k, v in params.items()
+    }
+
+
+def _candidate_key(family, params):
+    return family + ":" + json.dumps(_jsonable(params), sort_keys=True)
+
+
+if __name__ == "__main__":
+    import argparse
 
-with open("models/model_metrics.json", "w") as f:
-    json.dump(metrics, f, indent=4)
+    parser = argparse.ArgumentParser(description="Train churn models with hyperparameter search")
+    parser.add_argument("--n-iter", type=int, default=10, help="candidates per model family")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-matrix", action="store_true", help="read the feature table instead of the matrix")
+    parser.add_argument("--compress", type=int, default=0, choices=range(10), help="joblib compression level of the pickles")
+    args = parser.parse_args()
 
-print("\nMODEL TRAINING COMPLETE")
-print(json.dumps(metrics, indent=4))
+    ModelTrainer(
+        n_iter=args.n_iter,
+        cv=args.cv,
+        workers=args.workers,
+        feature_matrix_dir=False if args.no_matrix else None,
+        compress=args.compress
+    ).run_pipeline()
@@ -0,0 +1,117 @@
+"""
+The model artifact format, shared by training (model_artifact.py), which
+writes artifacts, and the scoring app (app/predict.py, app/fast_predict.py),
+which reads them. Needs nothing beyond numpy, so the app can import it
+without the training stack.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+ARTIFACT_DIR_NAME = "artifact"
+ARTIFACT_FORMAT_VERSION = 2
+
+# Random forest node arrays and their dtypes
+FOREST_ARRAYS = {
+    "feature": np.int32,
+    "threshold": np.float32,
+    "children": np.int32,
+    "value": np.float32,
+    "roots": np.int32
+}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    """SHA-256, size and mtime of a file, as the manifest records them."""
+    stat = os.stat(path)
+    return {
+        "sha256": file_sha256(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def file_matches(path, fingerprint, full=False):
+    """
+    Whether the file at path is the one fingerprint describes. A file with
+    the recorded size and mtime is taken as unchanged without reading it;
+    only a changed mtime (e.g. after a copy), or full=True, costs a
+    SHA-256 over the file.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size != fingerprint["size"]:
+        return False
+    if not full and stat.st_mtime_ns == fingerprint["mtime_ns"]:
+        return True
+    return file_sha256(path) == fingerprint["sha256"]
+
+
+def manifest_checksum(manifest):
+    """SHA-256 of a manifest without its checksum (covers every file fingerprint)."""
+    content = {key: value for key, value in manifest.items() if key != "checksum"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _round_down_float32(values):
+    """
+    Largest float32 <= each float64 value. For a float32 input x,
+    x <= t exactly when x <= _round_down_float32(t), so float32 thresholds
+    reproduce sklearn's float32-input, float64-threshold comparisons.
+    """
+    rounded = values.astype(np.float32)
+    over = rounded.astype(np.float64) > values
+    rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+    return rounded
+
+
+def flatten_forest(forest):
+    """
+    Node arrays (FOREST_ARRAYS) of a fitted RandomForestClassifier, every
+    tree concatenated: int32 features and children, float32 thresholds and
+    positive-class leaf fractions, and each tree's root node. children
+    holds both children of node n at 2n and 2n + 1; leaves point to
+    themselves.
+    """
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        # children[2 * node + went_right]
+        children.append(np.column_stack([
+            np.where(is_leaf, nodes, tree.children_left),
+            np.where(is_leaf, nodes, tree.children_right)
+        ]).ravel() + offset)
+
+        counts = tree.value[:, 0, :]
+        values.append(counts[:, -1] / counts.sum(axis=1))
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": _round_down_float32(np.concatenate(thresholds).astype(np.float64)),
+        "children": np.concatenate(children),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots)
+    }
+    return {name: np.ascontiguousarray(arrays[name], dtype=dtype) for name, dtype in FOREST_ARRAYS.items()}
@@ -0,0 +1,369 @@
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from quantile_sketch import KLLSketch
+from storage import csv_byte_ranges
+
+PROFILE_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+PROFILE_VERSION = 1
+
+
+def _leading_zeros(words):
+    """Leading zero bits of each uint64, via exact float64 exponents of its halves."""
+    hi = (words >> np.uint64(32)).astype(np.float64)
+    lo = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp(x) = m * 2**e with 0.5 <= m < 1, so e is the bit length (0 for x = 0)
+    hi_bits = np.frexp(hi)[1]
+    lo_bits = np.frexp(lo)[1]
+    return np.where(hi > 0, 32 - hi_bits, 64 - lo_bits)
+
+
+class HyperLogLog:
+    """
+    Approximate distinct count in 2**p one-byte registers, with a standard
+    error of 1.04 / sqrt(2**p) (0.8% at the default p=14, 16 KB).
+    Sketches of separate chunks merge by taking register maxima.
+    """
+
+    def __init__(self, p=14):
+        if not 4 <= p <= 18:
+            raise ValueError("p must be between 4 and 18")
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    @property
+    def error_bound(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return self
+
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes << np.uint64(self.p)
+        rank = np.minimum(_leading_zeros(rest), 64 - self.p) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def update(self, values):
+        if len(values):
+            self.update_hashes(hash_pandas_object(pd.Series(values), index=False).to_numpy())
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge sketches with p={self.p} and p={other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small cardinalities: linear counting is more accurate
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class FrequentItems:
+    """
+    Misra-Gries summary with a fixed number of counters. Every value seen
+    more than n / (capacity + 1) times is kept, and each kept count is at
+    most `error` below the true count.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.error = 0
+        self.n = 0
+
+    def update(self, values):
+        return self.update_counts(pd.Series(values).value_counts())
+
+    def update_counts(self, counts):
+        """Merge exact per-value counts of a chunk into the summary."""
+        self.n += int(counts.sum())
+
+        combined = self.counts.add(counts, fill_value=0)
+        if len(combined) > self.capacity:
+            threshold = combined.nlargest(self.capacity + 1).iloc[-1]
+            combined = combined[combined > threshold] - threshold
+            self.error += int(threshold)
+        self.counts = combined.astype(np.int64)
+        return self
+
+    def merge(self, other):
+        self.update_counts(other.counts)
+        self.n += other.n - int(other.counts.sum())
+        self.error += other.error
+        return self
+
+    def top(self, k):
+        """
+        Up to k most frequent values, with count bounds [count, max_count].
+        Only values whose lower bound exceeds `error` are listed: those are
+        certainly more frequent than anything the summary dropped.
+        """
+        counts = self.counts[self.counts > self.error].nlargest(k)
+        return [
+            {"value": _json_value(value), "count": int(count), "max_count": int(count + self.error)}
+            for value, count in counts.items()
+        ]
+
+
+def _json_value(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ColumnProfile:
+    """Running statistics of one column: nulls, distinct count, min/max, quantiles, top values."""
+
+    def __init__(self, name, kind, hll_precision=14, kll_k=200, top_capacity=256):
+        self.name = name
+        self.kind = kind
+        self.count = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.distinct = HyperLogLog(hll_precision)
+        self.frequent = FrequentItems(top_capacity)
+        self.quantiles = KLLSketch(kll_k) if kind in ("numeric", "datetime") else None
+
+    @staticmethod
+    def kind_of(series):
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return "datetime"
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            return "numeric"
+        return "text"
+
+    def update(self, series):
+        if self.kind == "numeric" and not pd.api.types.is_numeric_dtype(series.dtype):
+            # A chunk where the column failed to parse as numbers
+            series = pd.to_numeric(series, errors="coerce")
+
+        # One hash-table pass; distinct values, top values and min/max
+        # are then computed over the (much smaller) set of unique values
+        counts = series.value_counts()
+        self.count += len(series)
+        self.nulls += len(series) - int(counts.sum())
+        if not len(counts):
+            return self
+
+        uniques = counts.index
+        self.distinct.update(uniques)
+        self.frequent.update_counts(counts)
+
+        low, high = uniques.min(), uniques.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+        if self.kind == "numeric":
+            self.quantiles.update(series.to_numpy(dtype=np.float64, na_value=np.nan))
+        elif self.kind == "datetime":
+            values = series.to_numpy(dtype="datetime64[ns]")
+            self.quantiles.update(values[~np.isnat(values)].astype(np.int64))
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.nulls += other.nulls
+        for bound, pick in [("min", min), ("max", max)]:
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        if self.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+        return self
+
+    def _quantile_values(self):
+        if self.quantiles is None or self.quantiles.n == 0:
+            return None
+        result = {}
+        for q in PROFILE_QUANTILES:
+            value = self.quantiles.quantile(q)
+            result[str(q)] = (
+                pd.Timestamp(int(value)).isoformat() if self.kind == "datetime" else value
+            )
+        return result
+
+    def to_dict(self, top_k=10):
+        return {
+            "kind": self.kind,
+            "count": int(self.count),
+            "nulls": int(self.nulls),
+            "null_percentage": round(self.nulls / self.count * 100, 4) if self.count else 0.0,
+            "distinct_estimate": self.distinct.estimate(),
+            "min": _json_value(self.min),
+            "max": _json_value(self.max),
+            "quantiles": self._quantile_values(),
+            "top_values": self.frequent.top(top_k),
+            "top_values_max_error": int(self.frequent.error)
+        }
+
+
+def _profile_reader(reader, kinds, settings):
+    columns = {
+        name: ColumnProfile(
+            name,
+            kind,
+            hll_precision=settings["hll_precision"],
+            kll_k=settings["kll_k"],
+            top_capacity=settings["top_capacity"]
+        )
+        for name, kind in kinds.items()
+    }
+    rows = 0
+    for chunk in reader:
+        for name, column in columns.items():
+            column.update(chunk[name])
+        rows += len(chunk)
+    return columns, rows
+
+
+def _read_csv(source, settings, **kwargs):
+    return pd.read_csv(
+        source,
+        encoding=settings["encoding"],
+        dtype=settings["dtype"],
+        parse_dates=settings["parse_dates"],
+        chunksize=settings["chunksize"],
+        **kwargs
+    )
+
+
+def _profile_range(path, start, end, kinds, settings):
+    """Profile one newline-aligned byte range of the file (a worker task)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    reader = _read_csv(io.BytesIO(data), settings, names=list(kinds), header=None)
+    return _profile_reader(reader, kinds, settings)
+
+
+class DataProfiler:
+    """
+    Per-column profile of a CSV file in one streaming pass. Memory is
+    bounded by chunksize plus fixed-size sketches per column:
+
+        nulls           exact
+        distinct        HyperLogLog (relative error ~1.04 / sqrt(2**hll_precision))
+        min / max       exact
+        quantiles       KLL sketch (numeric and datetime columns)
+        top values      Misra-Gries (counts at most `error` below the truth)
+
+    All of these merge, so with workers > 1 the file is split into
+    byte ranges profiled in parallel and the results are combined.
+    The first sample_rows rows are read as a sample for previews and
+    memory estimates.
+    """
+
+    def __init__(
+        self,
+        path,
+        chunksize=200_000,
+        dtype=None,
+        parse_dates=None,
+        encoding="latin1",
+        hll_precision=14,
+        kll_k=200,
+        top_k=10,
+        sample_rows=100_000,
+        workers=1,
+        range_bytes=64 * 1024 * 1024
+    ):
+        self.path = path
+        self.top_k = top_k
+        self.sample_rows = sample_rows
+        self.workers = workers or os.cpu_count()
+        self.range_bytes = range_bytes
+        self.settings = {
+            "chunksize": chunksize,
+            "dtype": dtype,
+            "parse_dates": parse_dates,
+            "encoding": encoding,
+            "hll_precision": hll_precision,
+            "kll_k": kll_k,
+            "top_capacity": max(256, 4 * top_k)
+        }
+        self.columns = None
+        self.sample = None
+        self.rows = 0
+        self.seconds = None
+
+    def run(self):
+        start = time.perf_counter()
+        settings = self.settings
+
+        # Column kinds come from the sample, so every range agrees on them
+        self.sample = pd.read_csv(
+            self.path,
+            encoding=settings["encoding"],
+            dtype=settings["dtype"],
+            parse_dates=settings["parse_dates"],
+            nrows=self.sample_rows
+        )
+        kinds = {name: ColumnProfile.kind_of(self.sample[name]) for name in self.sample.columns}
+
+        _, ranges = csv_byte_ranges(self.path, self.range_bytes)
+        if self.workers == 1 or len(ranges) < 2:
+            self.columns, self.rows = _profile_reader(_read_csv(self.path, settings), kinds, settings)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = pool.map(
+                    _profile_range,
+                    *zip(*[(self.path, s, e, kinds, settings) for s, e in ranges])
+                )
+                self.columns, self.rows = None, 0
+                for columns, rows in results:
+                    if self.columns is None:
+                        self.columns = columns
+                    else:
+                        for name, column in columns.items():
+                            self.columns[name].merge(column)
+                    self.rows += rows
+
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def to_dict(self):
+        columns = self.columns or {}
+        return {
+            "version": PROFILE_VERSION,
+            "path": self.path,
+            "rows": int(self.rows),
+            "columns": len(columns),
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "sketches": {
+                "distinct_relative_error": round(float(HyperLogLog(self.settings["hll_precision"]).error_bound), 6),
+                "quantile_rank_error": round(float(KLLSketch(self.settings["kll_k"]).error_bound), 6),
+                "quantiles": PROFILE_QUANTILES
+            },
+            "column_profiles": {
+                name: column.to_dict(self.top_k) for name, column in columns.items()
+            }
+        }
+
+    def save_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4, default=str)
+        return path
@@ -0,0 +1,251 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+# Two independent 16-byte keys give each row a 128-bit digest
+HASH_KEYS = ("churn-dedup-key1", "churn-dedup-key2")
+
+
+def _normalized(df):
+    """
+    Cast numeric columns to one width per kind so a value hashes the same
+    in every chunk, and fold -0.0 into 0.0, which drop_duplicates treats
+    as equal.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            columns[column] = series
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            columns[column] = series.astype(np.int64)
+        elif pd.api.types.is_float_dtype(series.dtype):
+            columns[column] = series.astype(np.float64) + 0.0
+        else:
+            columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def row_digests(df):
+    """128-bit digest of every row as two uint64 arrays (hi, lo)."""
+    df = _normalized(df)
+    return tuple(
+        hash_pandas_object(df, index=False, hash_key=key).to_numpy()
+        for key in HASH_KEYS
+    )
+
+
+def collision_bound(rows):
+    """Upper bound on the probability that any two of rows distinct rows share a digest."""
+    return rows * (rows - 1) / 2 / 2 ** 128
+
+
+def _first_occurrence(hi, lo):
+    """Boolean mask of rows whose digest has not appeared earlier in the arrays."""
+    return ~pd.DataFrame({"hi": hi, "lo": lo}).duplicated(keep="first").to_numpy()
+
+
+def _sorted_run(hi, lo):
+    order = np.lexsort((lo, hi))
+    return np.vstack([hi[order], lo[order]])
+
+
+class DigestSet:
+    """
+    Set of 128-bit row digests that can outgrow memory.
+
+    Digests are split into partitions by their top bits. Each partition is
+    a small LSM tree: added digests form sorted runs, runs are merged once
+    a partition holds more than max_runs, and when more than
+    max_memory_digests digests are held in memory every partition is
+    merged and spilled to a memory-mapped .npy file under spill_dir.
+    """
+
+    def __init__(self, partitions=16, max_memory_digests=20_000_000, max_runs=8, spill_dir=None):
+        if partitions & (partitions - 1):
+            raise ValueError("partitions must be a power of two")
+
+        self.partition_bits = partitions.bit_length() - 1
+        self.max_memory_digests = max_memory_digests
+        self.max_runs = max_runs
+        self.spill_dir = spill_dir
+        self._owns_spill_dir = False
+        self.memory_runs = [[] for _ in range(partitions)]
+        self.disk_runs = [[] for _ in range(partitions)]
+        self.memory_digests = 0
+        self.size = 0
+        self.spills = 0
+
+    def __len__(self):
+        return self.size
+
+    def _partitions(self, hi):
+        if not self.partition_bits:
+            return np.zeros(len(hi), dtype=np.int64)
+        return (hi >> np.uint64(64 - self.partition_bits)).astype(np.int64)
+
+    @staticmethod
+    def _run_contains(run, hi, lo):
+        run_hi, run_lo = run[0], run[1]
+        left = np.searchsorted(run_hi, hi, side="left")
+        right = np.searchsorted(run_hi, hi, side="right")
+        found = np.zeros(len(hi), dtype=bool)
+
+        single = right - left == 1
+        found[single] = run_lo[left[single]] == lo[single]
+        # Shared upper halves are rare; resolve them one by one
+        for i in np.flatnonzero(right - left > 1):
+            found[i] = bool((run_lo[left[i]:right[i]] == lo[i]).any())
+
+        return found
+
+    def contains(self, hi, lo):
+        found = np.zeros(len(hi), dtype=bool)
+        partitions = self._partitions(hi)
+
+        for p in np.unique(partitions):
+            rows = np.flatnonzero(partitions == p)
+            for run in self.memory_runs[p] + self.disk_runs[p]:
+                missing = rows[~found[rows]]
+                if not len(missing):
+                    break
+                found[missing] = self._run_contains(run, hi[missing], lo[missing])
+
+        return found
+
+    def add(self, hi, lo):
+        """Add digests not already in the set."""
+        partitions = self._partitions(hi)
+
+        for p in np.unique(partitions):
+            rows = partitions == p
+            self.memory_runs[p].append(_sorted_run(hi[rows], lo[rows]))
+            if len(self.memory_runs[p]) > self.max_runs:
+                self.memory_runs[p] = [self._merge(self.memory_runs[p])]
+
+        self.memory_digests += len(hi)
+        self.size += len(hi)
+        if self.memory_digests > self.max_memory_digests:
+            self.spill()
+
+    @staticmethod
+    def _merge(runs):
+        merged = np.hstack(runs)
+        return _sorted_run(merged[0], merged[1])
+
+    def spill(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="dedup-")
+            self._owns_spill_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        for p, runs in enumerate(self.memory_runs):
+            if not runs:
+                continue
+
+            disk_runs = self.disk_runs[p]
+            if len(disk_runs) >= self.max_runs:
+                runs = disk_runs + runs
+                disk_runs.clear()
+
+            path = os.path.join(self.spill_dir, f"partition-{p:04d}-{self.spills:06d}.npy")
+            np.save(path, self._merge(runs))
+            disk_runs.append(np.load(path, mmap_mode="r"))
+            self.memory_runs[p] = []
+
+        self.memory_digests = 0
+        self.spills += 1
+
+    def close(self):
+        self.memory_runs = [[] for _ in self.memory_runs]
+        self.disk_runs = [[] for _ in self.disk_runs]
+        if self._owns_spill_dir and self.spill_dir and os.path.exists(self.spill_dir):
+            shutil.rmtree(self.spill_dir)
+
+
+class StreamingDeduplicator:
+    """
+    Drops rows seen earlier in a stream of chunks, keeping first
+    occurrences in stream order, like drop_duplicates over the
+    concatenated chunks.
+
+    Rows are compared by 128-bit digest only; the chance that two distinct
+    rows collide is reported by collision_bound(rows_seen).
+    """
+
+    def __init__(self, digest_set=None):
+        self.seen = DigestSet() if digest_set is None else digest_set
+        self.rows_seen = 0
+        self.duplicates_removed = 0
+
+    def keep_mask(self, chunk):
+        hi, lo = row_digests(chunk)
+        keep = _first_occurrence(hi, lo)
+        keep[keep] = ~self.seen.contains(hi[keep], lo[keep])
+
+        self.seen.add(hi[keep], lo[keep])
+        self.rows_seen += len(chunk)
+        self.duplicates_removed += len(chunk) - int(keep.sum())
+        return keep
+
+    def deduplicate(self, chunk):
+        return chunk[self.keep_mask(chunk)]
+
+    def stats(self):
+        return {
+            "method": "hash",
+            "digest_bits": 128,
+            "rows_seen": self.rows_seen,
+            "rows_removed": self.duplicates_removed,
+            "spills": self.seen.spills,
+            "collision_probability_bound": collision_bound(self.rows_seen)
+        }
+
+    def close(self):
+        self.seen.close()
+
+
+def _rows_equal(a, b):
+    """Row-wise equality treating NaN as equal to NaN."""
+    equal = np.ones(len(a), dtype=bool)
+    for column in a.columns:
+        x, y = a[column].to_numpy(), b[column].to_numpy()
+        equal &= (x == y) | (pd.isna(x) & pd.isna(y))
+    return equal
+
+
+def drop_duplicate_rows(df, verify=True):
+    """
+    Hash-based drop_duplicates for an in-memory frame.
+
+    With verify=True every dropped row is compared with the first row
+    sharing its digest, so a digest collision can never drop a distinct
+    row: such rows are kept and counted in the returned stats.
+    """
+    hi, lo = row_digests(df)
+    keep = _first_occurrence(hi, lo)
+    collisions = 0
+
+    if verify and not keep.all():
+        dropped = np.flatnonzero(~keep)
+        group = pd.DataFrame({"hi": hi, "lo": lo}).groupby(["hi", "lo"], sort=False).ngroup().to_numpy()
+        # ngroup numbers groups 0..k-1, so this is the first row of each group
+        _, first = np.unique(group, return_index=True)
+
+        same = _rows_equal(df.iloc[dropped], df.iloc[first[group[dropped]]])
+        collisions = int((~same).sum())
+        keep[dropped[~same]] = True
+
+    stats = {
+        "method": "hash",
+        "digest_bits": 128,
+        "verified": verify,
+        "rows_removed": int(len(df) - keep.sum()),
+        "collisions": collisions,
+        "collision_probability_bound": collision_bound(len(df))
+    }
+    return df[keep], stats
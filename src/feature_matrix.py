@@ -0,0 +1,106 @@
+import json
+import os
+
+import numpy as np
+
+from artifact_format import file_sha256
+
+FEATURE_MATRIX_DIR = "data/processed/feature_matrix"
+MATRIX_FORMAT_VERSION = 1
+
+
+def save_feature_matrix(
+    customer_df,
+    directory=FEATURE_MATRIX_DIR,
+    label="Churn",
+    id_column="CustomerID",
+    source_path=None
+):
+    """
+    Write customer features as a binary matrix directory:
+
+    features.npy      C-contiguous float32 (customers x features)
+    customer_ids.npy  int64 CustomerID of every row
+    labels.npy        int8 label column (when present)
+    schema.json       feature column order, dtypes, row count and the
+                      SHA-256 of source_path, the feature table the
+                      matrix was built alongside (when given)
+
+    The .npy files open zero-copy with np.load(..., mmap_mode="r"), so any
+    number of processes can share the same pages.
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = [c for c in customer_df.columns if c not in (id_column, label)]
+
+    np.save(
+        os.path.join(directory, "features.npy"),
+        np.ascontiguousarray(customer_df[columns].to_numpy(dtype=np.float32))
+    )
+    np.save(
+        os.path.join(directory, "customer_ids.npy"),
+        customer_df[id_column].to_numpy(dtype=np.int64)
+    )
+
+    has_label = label in customer_df.columns
+    if has_label:
+        np.save(os.path.join(directory, "labels.npy"), customer_df[label].to_numpy(dtype=np.int8))
+
+    schema = {
+        "version": MATRIX_FORMAT_VERSION,
+        "rows": int(len(customer_df)),
+        "columns": columns,
+        "dtype": "float32",
+        "id_column": id_column,
+        "label": label if has_label else None,
+        "source": None if source_path is None else {
+            "path": source_path,
+            "sha256": file_sha256(source_path)
+        }
+    }
+    with open(os.path.join(directory, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=4)
+
+    return directory
+
+
+class FeatureMatrix:
+    """Read-only, memory-mapped view of a directory written by save_feature_matrix."""
+
+    def __init__(self, directory=FEATURE_MATRIX_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, "schema.json")) as f:
+            self.schema = json.load(f)
+
+        self.columns = self.schema["columns"]
+        self.X = np.load(os.path.join(directory, "features.npy"), mmap_mode="r")
+        self.customer_ids = np.load(os.path.join(directory, "customer_ids.npy"), mmap_mode="r")
+        self.labels = None
+        if self.schema["label"]:
+            self.labels = np.load(os.path.join(directory, "labels.npy"), mmap_mode="r")
+
+        if self.X.shape != (self.schema["rows"], len(self.columns)):
+            raise ValueError(f"Feature matrix in {directory} does not match its schema")
+
+    def __len__(self):
+        return self.schema["rows"]
+
+    @staticmethod
+    def exists(directory=FEATURE_MATRIX_DIR):
+        return os.path.exists(os.path.join(directory, "schema.json"))
+
+    def built_from(self, path):
+        """Whether the matrix was saved from the feature table now at path."""
+        source = self.schema.get("source")
+        return bool(source) and os.path.exists(path) and source["sha256"] == file_sha256(path)
+
+    def columns_for(self, names):
+        """Column positions of names, for selecting features in a given order."""
+        missing = [name for name in names if name not in self.columns]
+        if missing:
+            raise ValueError(f"Feature matrix lacks columns: {', '.join(missing)}")
+        return [self.columns.index(name) for name in names]
+
+    def frame(self):
+        """The features as a DataFrame backed by the mapped array (no copy)."""
+        import pandas as pd
+        return pd.DataFrame(self.X, columns=self.columns, copy=False)
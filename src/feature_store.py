@@ -0,0 +1,297 @@
+import json
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from dedup import row_digests
+
+LOG_COLUMNS = ["CustomerID", "InvoiceNo", "RowHi", "RowLo"]
+
+
+class CustomerFeatureStore:
+    """
+    Running per-customer aggregates kept on disk, so new cleaned
+    transactions can be folded in without re-reading the full history.
+
+    Layout of store_dir:
+        customers-N.parquet one row per customer: LastPurchase, InvoiceCount,
+                            TotalSpend and the active-month bitmap, stored as
+                            uint64 words MonthBits_0, MonthBits_1, ...
+        rows/               append-only log of every folded-in row as
+                            CustomerID, InvoiceNo and its 128-bit digest
+                            (RowHi, RowLo), one part file per update, each
+                            sorted by CustomerID
+        store.json          base month of the bitmap, the reference date,
+                            the committed part count and customers file
+
+    Only rows whose digest is new to the log are folded in, so replaying
+    a batch changes nothing while the remaining lines of an invoice split
+    across batches still count; an invoice adds to InvoiceCount only the
+    first time its (CustomerID, InvoiceNo) pair is seen. Digests cover
+    every column of a row, so all batches must carry the same columns.
+    save() writes the pending log parts and the customer table before
+    replacing store.json, which is the commit point: files it does not
+    reference are ignored.
+    """
+
+    def __init__(self, store_dir="data/feature_store"):
+        self.store_dir = store_dir
+        self.customers = None
+        self.base_month = None
+        self.reference_date = None
+        self.parts = 0
+        self.generation = 0
+        self._pending = []
+
+    def _customers_path(self, generation):
+        return os.path.join(self.store_dir, f"customers-{generation:05d}.parquet")
+
+    def _part_path(self, part):
+        return os.path.join(self._log_dir, f"part-{part:05d}.parquet")
+
+    @property
+    def _log_dir(self):
+        return os.path.join(self.store_dir, "rows")
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.store_dir, "store.json")
+
+    def load(self):
+        if not os.path.exists(self._meta_path):
+            self.customers = pd.DataFrame(
+                {
+                    "LastPurchase": pd.Series(dtype="datetime64[ns]"),
+                    "InvoiceCount": pd.Series(dtype=np.int64),
+                    "TotalSpend": pd.Series(dtype=np.float64)
+                },
+                index=pd.Index([], dtype=np.int64, name="CustomerID")
+            )
+            return self
+
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        self.base_month = meta["base_month"]
+        self.reference_date = pd.Timestamp(meta["reference_date"])
+        self.parts = meta["parts"]
+        self.generation = meta["generation"]
+        self.customers = pd.read_parquet(
+            self._customers_path(self.generation)
+        ).set_index("CustomerID")
+        return self
+
+    def _month_words(self):
+        return [c for c in self.customers.columns if c.startswith("MonthBits_")]
+
+    def _logged_rows(self, customer_ids):
+        """Log entries (LOG_COLUMNS) already in the store for these customers."""
+        logged = [
+            rows[rows["CustomerID"].isin(customer_ids)]
+            for rows in self._pending
+        ]
+
+        if self.parts:
+            import pyarrow.dataset as ds
+
+            # Only committed parts: a part left by an interrupted save is not
+            # part of the state. Part files are sorted by CustomerID, so
+            # row-group statistics let pyarrow skip everything outside the
+            # delta's customers
+            table = ds.dataset(
+                [self._part_path(part) for part in range(self.parts)], format="parquet"
+            ).to_table(
+                columns=LOG_COLUMNS,
+                filter=ds.field("CustomerID").isin(customer_ids)
+            )
+            logged.append(table.to_pandas())
+
+        if not logged:
+            return pd.DataFrame({
+                "CustomerID": pd.Series(dtype=np.int64),
+                "InvoiceNo": pd.Series(dtype=object),
+                "RowHi": pd.Series(dtype=np.uint64),
+                "RowLo": pd.Series(dtype=np.uint64)
+            })
+        return pd.concat(logged, ignore_index=True)
+
+    def update(self, transactions):
+        """
+        Fold a batch of cleaned transactions (at least CustomerID,
+        InvoiceNo, InvoiceDate and TotalPrice) into the aggregates. Rows
+        already in the log are skipped. Cost is proportional to the batch
+        plus the customer table, not to the full history.
+        """
+        if len(transactions) == 0:
+            return self
+
+        transactions = transactions.assign(InvoiceNo=transactions["InvoiceNo"].astype(str))
+
+        # Keep only rows not already folded in by an earlier batch; sorting
+        # the columns keeps digests independent of the caller's column order
+        hi, lo = row_digests(transactions[sorted(transactions.columns)])
+        digests = pd.MultiIndex.from_arrays([hi, lo])
+        logged = self._logged_rows(transactions["CustomerID"].unique())
+        new = ~digests.duplicated() & ~digests.isin(
+            pd.MultiIndex.from_frame(logged[["RowHi", "RowLo"]])
+        )
+        transactions = transactions[new]
+        if len(transactions) == 0:
+            return self
+
+        log = pd.DataFrame({
+            "CustomerID": transactions["CustomerID"].to_numpy(np.int64),
+            "InvoiceNo": transactions["InvoiceNo"].to_numpy(),
+            "RowHi": hi[new],
+            "RowLo": lo[new]
+        })
+
+        transactions = transactions.assign(
+            MonthKey=transactions["InvoiceDate"].to_numpy()
+            .astype("datetime64[M]").astype(np.int64)
+        )
+
+        first_month = int(transactions["MonthKey"].min())
+        if self.base_month is None:
+            self.base_month = first_month
+        elif first_month < self.base_month:
+            self._rebase(first_month)
+
+        batch = transactions.groupby("CustomerID").agg(
+            LastPurchase=("InvoiceDate", "max"),
+            TotalSpend=("TotalPrice", "sum")
+        )
+
+        # An invoice counts once, in the batch that first logs one of its rows
+        invoices = log[["CustomerID", "InvoiceNo"]].drop_duplicates()
+        invoices = invoices[~pd.MultiIndex.from_frame(invoices).isin(
+            pd.MultiIndex.from_frame(logged[["CustomerID", "InvoiceNo"]])
+        )]
+        batch["InvoiceCount"] = (
+            invoices.groupby("CustomerID").size().reindex(batch.index, fill_value=0)
+        )
+
+        # Month bitmap: distinct (customer, month) bits summed per word == OR
+        months = transactions[["CustomerID", "MonthKey"]].drop_duplicates()
+        offset = months["MonthKey"].to_numpy() - self.base_month
+        months = months.assign(
+            Word=offset // 64,
+            Bit=np.left_shift(np.uint64(1), (offset % 64).astype(np.uint64))
+        )
+        words = months.groupby(["CustomerID", "Word"])["Bit"].sum().unstack(fill_value=0)
+        for word in words.columns:
+            batch[f"MonthBits_{word}"] = words[word].astype(np.uint64)
+
+        self._merge(batch)
+        self._pending.append(log)
+        self.reference_date = self.customers["LastPurchase"].max()
+        return self
+
+    def _rebase(self, base_month):
+        """Shift every month bitmap so bit 0 is base_month (late-arriving data)."""
+        shift = self.base_month - base_month
+        words_shift, bits_shift = divmod(shift, 64)
+
+        old = self.customers[self._month_words()].to_numpy(np.uint64)
+        new = np.zeros((len(old), old.shape[1] + words_shift + 1), dtype=np.uint64)
+        new[:, words_shift:words_shift + old.shape[1]] = old
+        if bits_shift:
+            carry = np.zeros_like(new)
+            carry[:, 1:] = new[:, :-1] >> np.uint64(64 - bits_shift)
+            new = (new << np.uint64(bits_shift)) | carry
+
+        self.customers = self.customers.drop(columns=self._month_words())
+        for word in range(new.shape[1]):
+            self.customers[f"MonthBits_{word}"] = new[:, word]
+        self.base_month = base_month
+
+    def _merge(self, batch):
+        index = self.customers.index.union(batch.index)
+
+        def aligned(frame, column, fill):
+            if column not in frame:
+                return pd.Series(fill, index=index)
+            return frame[column].reindex(index, fill_value=fill)
+
+        merged = pd.DataFrame(index=index)
+        merged["LastPurchase"] = np.maximum(
+            aligned(self.customers, "LastPurchase", pd.Timestamp.min),
+            aligned(batch, "LastPurchase", pd.Timestamp.min)
+        )
+        merged["InvoiceCount"] = (
+            aligned(self.customers, "InvoiceCount", 0)
+            + aligned(batch, "InvoiceCount", 0)
+        ).astype(np.int64)
+        merged["TotalSpend"] = (
+            aligned(self.customers, "TotalSpend", 0.0)
+            + aligned(batch, "TotalSpend", 0.0)
+        )
+
+        # Bitmap words stay uint64 throughout; a float detour would drop bits
+        words = set(self._month_words()) | {c for c in batch if c.startswith("MonthBits_")}
+        for word in sorted(words, key=lambda c: int(c.split("_")[1])):
+            merged[word] = np.bitwise_or(
+                aligned(self.customers, word, np.uint64(0)).to_numpy(np.uint64),
+                aligned(batch, word, np.uint64(0)).to_numpy(np.uint64)
+            )
+
+        self.customers = merged
+
+    def save(self):
+        """
+        Write the pending log parts and a new customers file, then
+        commit both by replacing store.json. A crash before the replace
+        leaves the previous state intact; its leftovers are overwritten by
+        the next save.
+        """
+        os.makedirs(self._log_dir, exist_ok=True)
+
+        parts = self.parts
+        for log in self._pending:
+            log.sort_values("CustomerID").to_parquet(
+                self._part_path(parts), index=False, compression="zstd", row_group_size=50_000
+            )
+            parts += 1
+
+        previous = self._customers_path(self.generation) if os.path.exists(self._meta_path) else None
+        generation = self.generation + 1
+        self.customers.reset_index().to_parquet(
+            self._customers_path(generation), index=False, compression="zstd"
+        )
+
+        with open(self._meta_path + ".tmp", "w") as f:
+            json.dump({
+                "base_month": self.base_month,
+                "reference_date": str(self.reference_date),
+                "parts": parts,
+                "generation": generation,
+                "customers": int(len(self.customers))
+            }, f, indent=4)
+        os.replace(self._meta_path + ".tmp", self._meta_path)
+
+        self.parts = parts
+        self.generation = generation
+        self._pending = []
+        if previous is not None and os.path.exists(previous):
+            os.remove(previous)
+        return self
+
+    def features(self):
+        """
+        Customer features (without Churn) against the store's current
+        reference date, in the same form as FeatureEngineer builds them.
+        """
+        snapshot_date = self.reference_date + timedelta(days=1)
+        customers = self.customers
+        words = customers[self._month_words()].to_numpy(dtype=np.uint64)
+
+        return pd.DataFrame({
+            "CustomerID": customers.index.to_numpy(),
+            "Recency": (snapshot_date - customers["LastPurchase"]).dt.days.to_numpy(),
+            "Frequency": customers["InvoiceCount"].to_numpy(),
+            "Monetary": customers["TotalSpend"].to_numpy(),
+            "AvgOrderValue": (customers["TotalSpend"] / customers["InvoiceCount"]).to_numpy(),
+            "ActiveMonths": np.bitwise_count(words).sum(axis=1).astype(np.int64),
+            "LogMonetary": np.log1p(customers["TotalSpend"]).to_numpy()
+        })
@@ -0,0 +1,621 @@
+import importlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from dedup import StreamingDeduplicator
+from quantile_sketch import SKETCH_SEED, KLLSketch
+
+cleaning = importlib.import_module("02_data_cleaning")
+features = importlib.import_module("03_feature_engineering")
+
+# Columns each row filter reads
+FILTER_COLUMNS = {
+    "remove_missing_customer_ids": ["CustomerID"],
+    "handle_cancelled_invoices": ["InvoiceNo"],
+    "handle_negative_quantities": ["Quantity"],
+    "handle_zero_prices": ["UnitPrice"],
+    "handle_missing_descriptions": ["Description"],
+}
+
+# Filters that evaluate string operations per row
+TEXT_FILTERS = {"handle_cancelled_invoices"}
+
+# Derived columns of add_derived_columns: (function of the frame, inputs)
+DERIVED_COLUMNS = {
+    "TotalPrice": (lambda df: df["Quantity"] * df["UnitPrice"], ["Quantity", "UnitPrice"]),
+    "Year": (lambda df: df["InvoiceDate"].dt.year, ["InvoiceDate"]),
+    "Month": (lambda df: df["InvoiceDate"].dt.month, ["InvoiceDate"]),
+    "DayOfWeek": (lambda df: df["InvoiceDate"].dt.dayofweek, ["InvoiceDate"]),
+    "Hour": (lambda df: df["InvoiceDate"].dt.hour, ["InvoiceDate"]),
+}
+
+# Partial states are compacted after this many chunks
+MERGE_EVERY = 16
+
+
+# ======================
+# Plan nodes
+# ======================
+class Scan:
+    """CSV reader with pushed-down predicates and a column projection."""
+
+    def __init__(self, path, available):
+        self.path = path
+        self.available = list(available)
+        self.predicates = []
+        self.columns = list(available)
+        self.output = list(available)
+
+    def describe(self):
+        lines = [f"Scan {self.path}"]
+        if self.columns != self.available:
+            lines.append(f"  read columns: {', '.join(self.columns)}")
+        for node in self.predicates:
+            lines.append(f"  pushed filter: {node.describe()}")
+        if self.output != self.columns:
+            lines.append(f"  project after filters: {', '.join(self.output)}")
+        return "\n".join(lines)
+
+
+class Filter:
+    def __init__(self, name, predicate, columns):
+        self.name = name
+        self.predicate = predicate
+        self.columns = columns
+
+    def describe(self):
+        return f"Filter {self.name} ({', '.join(self.columns)})"
+
+
+class RemoveOutliers:
+    """IQR bounds on Quantity, then on UnitPrice among rows within the Quantity bounds."""
+
+    columns = ["Quantity", "UnitPrice"]
+
+    def __init__(self, threshold, method):
+        self.threshold = threshold
+        self.method = method
+        self.bounds = None
+
+    def describe(self):
+        return f"RemoveOutliers IQR x{self.threshold} ({self.method} quantiles) ({', '.join(self.columns)})"
+
+
+class Distinct:
+    def describe(self):
+        return "Distinct (128-bit row digests over all columns)"
+
+
+class Derive:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def inputs(self):
+        return sorted({c for name in self.columns for c in DERIVED_COLUMNS[name][1]})
+
+    def describe(self):
+        return f"Derive {', '.join(self.columns)}"
+
+
+class Project:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def describe(self):
+        return f"Project {', '.join(self.columns)}"
+
+
+class ConvertTypes:
+    def describe(self):
+        return "ConvertTypes"
+
+
+class CustomerAggregate:
+    """Per-customer RFM aggregation, Churn label and LogMonetary."""
+
+    inputs = features.TRANSACTION_COLUMNS
+
+    def __init__(self, churn_threshold_days):
+        self.churn_threshold_days = churn_threshold_days
+
+    def describe(self):
+        return (
+            f"CustomerAggregate by CustomerID ({', '.join(self.inputs)}), "
+            f"Churn: Recency > {self.churn_threshold_days} days"
+        )
+
+
+def _describe(nodes):
+    return "\n".join(node.describe() for node in nodes)
+
+
+# ======================
+# Optimizer
+# ======================
+def _commutes_with_filter(node, columns):
+    """A row filter can move below node without changing the result."""
+    if isinstance(node, Distinct):
+        # Identical rows pass or fail a filter together
+        return True
+    if isinstance(node, Derive):
+        return not set(columns) & set(node.columns)
+    return isinstance(node, ConvertTypes)
+
+
+def _filter_cost(node):
+    """String predicates cost far more per row than numeric or null checks."""
+    return 1 if node.name in TEXT_FILTERS else 0
+
+
+def push_down_predicates(scan, nodes):
+    """
+    Move every filter that commutes with the nodes below it into the scan.
+    Row filters commute with each other, so the cheap ones run first and
+    the costly ones only see the rows that are left.
+    """
+    body = []
+    for node in nodes:
+        if isinstance(node, Filter) and all(_commutes_with_filter(n, node.columns) for n in body):
+            scan.predicates.append(node)
+        else:
+            body.append(node)
+    scan.predicates.sort(key=_filter_cost)
+    return body
+
+
+def prune_columns(scan, nodes, required):
+    """
+    Walk the plan top-down keeping only the columns that something above
+    still needs: unused derived columns are never computed, and after a
+    Distinct (which compares whole rows) a Project drops the rest.
+    """
+    pruned = []
+    for node in reversed(nodes):
+        if isinstance(node, Derive):
+            kept = [c for c in node.columns if c in required]
+            if not kept:
+                continue
+            node.columns = kept
+            required = (required - set(kept)) | set(node.inputs())
+        elif isinstance(node, Distinct):
+            if set(scan.available) - required:
+                pruned.append(Project([c for c in scan.available if c in required]))
+            required = set(scan.available)
+        elif isinstance(node, (Filter, RemoveOutliers)):
+            required = required | set(node.columns)
+        elif isinstance(node, ConvertTypes):
+            # Only CustomerID's integer cast reaches the customer table,
+            # and the aggregate applies it to its output
+            continue
+        pruned.append(node)
+
+    pruned.reverse()
+    scan.output = [c for c in scan.available if c in required]
+    predicate_columns = {c for node in scan.predicates for c in node.columns}
+    scan.columns = [c for c in scan.available if c in required | predicate_columns]
+    return pruned
+
+
+# ======================
+# Physical execution
+# ======================
+class _ChunkPipeline:
+    """Scan, pushed predicates and plan nodes fused into one per-chunk pass."""
+
+    def __init__(self, scan, nodes, dtype, chunksize, encoding="latin1", predicate_masks=None):
+        """
+        The keep mask of the pushed predicates is recorded per chunk as
+        packed bits (predicate_masks); a later pass over the same file and
+        predicates can pass them in instead of evaluating the predicates again.
+        Masks are recorded once: after the first complete pass, later passes
+        reuse them.
+        """
+        self.scan = scan
+        self.nodes = nodes
+        self.dtype = dtype
+        self.chunksize = chunksize
+        self.encoding = encoding
+        self.reuse_masks = predicate_masks is not None
+        self.predicate_masks = predicate_masks if self.reuse_masks else []
+        self.rows_scanned = 0
+
+    def _reader(self):
+        return pd.read_csv(
+            self.scan.path,
+            encoding=self.encoding,
+            usecols=self.scan.columns,
+            dtype={c: t for c, t in self.dtype.items() if c in self.scan.columns},
+            parse_dates=["InvoiceDate"] if "InvoiceDate" in self.scan.columns else None,
+            chunksize=self.chunksize
+        )
+
+    def chunks(self):
+        deduplicator = None
+        if any(isinstance(node, Distinct) for node in self.nodes):
+            deduplicator = StreamingDeduplicator()
+
+        self.rows_scanned = 0
+        if not self.reuse_masks:
+            # Drop the masks of an earlier pass that did not finish
+            self.predicate_masks = []
+
+        try:
+            for i, chunk in enumerate(self._reader()):
+                self.rows_scanned += len(chunk)
+
+                if self.reuse_masks:
+                    keep = np.unpackbits(self.predicate_masks[i], count=len(chunk)).view(bool)
+                else:
+                    keep = self._predicate_mask(chunk)
+                    self.predicate_masks.append(np.packbits(keep))
+                chunk = chunk.loc[keep, self.scan.output]
+
+                for node in self.nodes:
+                    chunk = self._apply(node, chunk, deduplicator)
+                yield chunk
+            self.reuse_masks = True
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+
+    def _predicate_mask(self, chunk):
+        keep = np.ones(len(chunk), dtype=bool)
+        for node in self.scan.predicates:
+            rows = np.flatnonzero(keep)
+            keep[rows] = node.predicate(chunk[node.columns].iloc[rows]).to_numpy(dtype=bool)
+        return keep
+
+    @staticmethod
+    def _apply(node, chunk, deduplicator):
+        if isinstance(node, Filter):
+            return chunk[node.predicate(chunk).to_numpy(dtype=bool)]
+        if isinstance(node, RemoveOutliers):
+            keep = np.ones(len(chunk), dtype=bool)
+            for column in node.columns:
+                lower, upper = node.bounds[column]
+                keep &= ((chunk[column] >= lower) & (chunk[column] <= upper)).to_numpy()
+            return chunk[keep]
+        if isinstance(node, Distinct):
+            return deduplicator.deduplicate(chunk)
+        if isinstance(node, Derive):
+            chunk = chunk.copy()
+            for name in node.columns:
+                chunk[name] = DERIVED_COLUMNS[name][0](chunk)
+            return chunk
+        if isinstance(node, Project):
+            return chunk[node.columns]
+        return chunk
+
+
+class _CustomerPartials:
+    """
+    Per-customer aggregation fused into the chunk stream: each chunk is
+    reduced to partial aggregates, so the cleaned transactions are never
+    materialized as a whole.
+    """
+
+    def __init__(self):
+        self.totals = []
+        self.invoices = []
+        self.months = []
+        self.reference_date = None
+        self.rows = 0
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        if not len(chunk):
+            return
+
+        customer = chunk["CustomerID"].to_numpy()
+        dates = chunk["InvoiceDate"].to_numpy()
+        self.totals.append(
+            pd.DataFrame({"CustomerID": customer, "LastPurchase": dates, "Monetary": chunk["TotalPrice"].to_numpy()})
+            .groupby("CustomerID").agg(LastPurchase=("LastPurchase", "max"), Monetary=("Monetary", "sum"))
+        )
+        self.invoices.append(
+            pd.DataFrame({"CustomerID": customer, "InvoiceNo": chunk["InvoiceNo"].to_numpy()}).drop_duplicates()
+        )
+        self.months.append(
+            pd.DataFrame({
+                "CustomerID": customer,
+                "MonthKey": dates.astype("datetime64[M]").astype(np.int64)
+            }).drop_duplicates()
+        )
+
+        latest = pd.Timestamp(dates.max())
+        self.reference_date = latest if self.reference_date is None else max(self.reference_date, latest)
+
+        if len(self.totals) >= MERGE_EVERY:
+            self._merge()
+
+    def _merge(self):
+        if len(self.totals) > 1:
+            self.totals = [
+                pd.concat(self.totals).groupby(level=0).agg({"LastPurchase": "max", "Monetary": "sum"})
+            ]
+            self.invoices = [pd.concat(self.invoices, ignore_index=True).drop_duplicates()]
+            self.months = [pd.concat(self.months, ignore_index=True).drop_duplicates()]
+
+    def aggregates(self):
+        """Same columns as features.aggregate_customers, indexed by CustomerID."""
+        self._merge()
+        if not self.totals:
+            return None
+
+        aggregates = self.totals[0].copy()
+        aggregates["Frequency"] = self.invoices[0].groupby("CustomerID").size()
+        aggregates["ActiveMonths"] = self.months[0].groupby("CustomerID").size()
+        aggregates.index = aggregates.index.astype(int)
+        return aggregates[["LastPurchase", "Frequency", "Monetary", "ActiveMonths"]]
+
+
+class LazyPipeline:
+    """
+    Lazy counterpart of DataCleaner followed by FeatureEngineer.
+
+    The same method chain records a logical plan instead of transforming a
+    frame; collect() optimizes and runs it:
+
+        predicate pushdown   row filters run inside the CSV reader, per chunk
+        projection pruning   only columns something downstream reads are
+                             parsed; Description and other columns are
+                             dropped once the last filter or Distinct that
+                             needs them has run; unused derived columns are
+                             never computed
+        fusion               filters, outlier bounds, deduplication and the
+                             per-customer groupby run as one pass per chunk
+
+    Only the customer feature table is materialized. Outlier bounds need
+    quantiles of the filtered rows, which a first pass reads from just
+    Quantity and UnitPrice. Duplicates are dropped by 128-bit row digest,
+    as in DataCleaner's streaming mode.
+    """
+
+    def __init__(
+        self,
+        input_path="data/raw/online_retail.csv",
+        chunksize=200_000,
+        iqr_threshold=1.5,
+        outlier_method="exact",
+        sketch_error=0.01,
+        churn_threshold_days=90
+    ):
+        if outlier_method not in ("exact", "sketch"):
+            raise ValueError(f"Unknown outlier_method: {outlier_method}")
+
+        self.input_path = input_path
+        self.chunksize = chunksize
+        self.iqr_threshold = iqr_threshold
+        self.outlier_method = outlier_method
+        self.sketch_error = sketch_error
+        self.churn_threshold_days = churn_threshold_days
+        self.nodes = []
+        self.reference_date = None
+        self.stats = {}
+
+    # ----------------------
+    # Plan building
+    # ----------------------
+    def _add(self, node):
+        if any(isinstance(n, CustomerAggregate) for n in self.nodes):
+            raise ValueError("The customer features are the end of the plan")
+        self.nodes.append(node)
+        return self
+
+    def _filter(self, step):
+        predicate = dict(cleaning.ROW_FILTERS)[step]
+        return self._add(Filter(step, predicate, FILTER_COLUMNS[step]))
+
+    def remove_missing_customer_ids(self):
+        return self._filter("remove_missing_customer_ids")
+
+    def handle_cancelled_invoices(self):
+        return self._filter("handle_cancelled_invoices")
+
+    def handle_negative_quantities(self):
+        return self._filter("handle_negative_quantities")
+
+    def handle_zero_prices(self):
+        return self._filter("handle_zero_prices")
+
+    def handle_missing_descriptions(self):
+        return self._filter("handle_missing_descriptions")
+
+    def apply_row_filters(self):
+        for step, _ in cleaning.ROW_FILTERS:
+            self._filter(step)
+        return self
+
+    def remove_outliers(self):
+        return self._add(RemoveOutliers(self.iqr_threshold, self.outlier_method))
+
+    def remove_duplicates(self):
+        return self._add(Distinct())
+
+    def add_derived_columns(self):
+        return self._add(Derive(list(DERIVED_COLUMNS)))
+
+    def convert_data_types(self):
+        return self._add(ConvertTypes())
+
+    def create_customer_features(self):
+        return self._add(CustomerAggregate(self.churn_threshold_days))
+
+    def create_rfm_features(self):
+        return self.create_customer_features()
+
+    def define_churn(self, churn_threshold_days=None):
+        """Set the Churn threshold of the customer aggregate (already labeled)."""
+        if churn_threshold_days is not None:
+            self.churn_threshold_days = churn_threshold_days
+            for node in self.nodes:
+                if isinstance(node, CustomerAggregate):
+                    node.churn_threshold_days = churn_threshold_days
+        return self
+
+    def finalize_features(self):
+        return self
+
+    # ----------------------
+    # Optimization
+    # ----------------------
+    def optimize(self):
+        """Return (scan, physical nodes, aggregate) for the recorded plan."""
+        aggregate = self.nodes[-1] if self.nodes else None
+        if not isinstance(aggregate, CustomerAggregate):
+            raise ValueError("Plan must end with create_customer_features() or create_rfm_features()")
+
+        nodes = self.nodes[:-1]
+        if not any(isinstance(n, Derive) and "TotalPrice" in n.columns for n in nodes):
+            # The aggregate needs TotalPrice even when the chain omits the step
+            nodes = nodes + [Derive(["TotalPrice"])]
+
+        available = pd.read_csv(self.input_path, encoding="latin1", nrows=0).columns
+        scan = Scan(self.input_path, available)
+        body = push_down_predicates(scan, [_copy(node) for node in nodes])
+        body = prune_columns(scan, body, set(aggregate.inputs))
+        return scan, body, aggregate
+
+    def explain(self):
+        scan, body, aggregate = self.optimize()
+        logical = [Scan(self.input_path, scan.available)] + self.nodes
+
+        return (
+            "LOGICAL PLAN\n" + _describe(logical) +
+            "\n\nOPTIMIZED PLAN (one fused pass per chunk)\n" +
+            _describe([scan] + body + [aggregate])
+        )
+
+    # ----------------------
+    # Execution
+    # ----------------------
+    def _compute_bounds(self, scan, body):
+        """
+        Fill in outlier bounds from a pass over the rows that reach each
+        RemoveOutliers node. Returns the predicate masks of the first pass.
+        """
+        masks = None
+        for i, node in enumerate(body):
+            if not isinstance(node, RemoveOutliers):
+                continue
+
+            prefix = body[:i]
+            pre_scan = _copy(scan)
+            pre_body = prune_columns(pre_scan, [_copy(n) for n in prefix], set(node.columns))
+            pipeline = _ChunkPipeline(pre_scan, pre_body, cleaning.RAW_DTYPES, self.chunksize, predicate_masks=masks)
+
+            node.bounds = {}
+            if node.method == "exact":
+                parts = [chunk[node.columns] for chunk in pipeline.chunks()]
+                values = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=node.columns)
+                for column in node.columns:
+                    node.bounds[column] = self._iqr_bounds(
+                        values[column].quantile(0.25), values[column].quantile(0.75)
+                    )
+                    lower, upper = node.bounds[column]
+                    values = values[(values[column] >= lower) & (values[column] <= upper)]
+            else:
+                # One pass per column: each sketch only counts rows within the earlier bounds
+                for column in node.columns:
+                    sketch = KLLSketch.from_error(self.sketch_error, seed=SKETCH_SEED)
+                    for chunk in pipeline.chunks():
+                        for previous, (lower, upper) in node.bounds.items():
+                            chunk = chunk[(chunk[previous] >= lower) & (chunk[previous] <= upper)]
+                        sketch.update(chunk[column].to_numpy())
+                    node.bounds[column] = self._iqr_bounds(sketch.quantile(0.25), sketch.quantile(0.75))
+
+            masks = pipeline.predicate_masks
+            self.stats["passes"] += 1 if node.method == "exact" else len(node.columns)
+        return masks
+
+    def _iqr_bounds(self, q1, q3):
+        iqr = q3 - q1
+        return q1 - self.iqr_threshold * iqr, q3 + self.iqr_threshold * iqr
+
+    def collect(self):
+        """Optimize and run the plan; return the customer feature table."""
+        start = time.perf_counter()
+        scan, body, aggregate = self.optimize()
+        self.stats = {"passes": 1}
+
+        masks = self._compute_bounds(scan, body)
+
+        pipeline = _ChunkPipeline(scan, body, cleaning.RAW_DTYPES, self.chunksize, predicate_masks=masks)
+        partials = _CustomerPartials()
+        for chunk in pipeline.chunks():
+            partials.update(chunk)
+
+        aggregates = partials.aggregates()
+        if aggregates is None:
+            raise ValueError("No transactions left after cleaning")
+
+        self.reference_date = partials.reference_date
+        customer_df = features.customer_features(aggregates, self.reference_date)
+        customer_df["Churn"] = (customer_df["Recency"] > aggregate.churn_threshold_days).astype(int)
+        customer_df = features.finalize_customer_features(customer_df)
+
+        self.stats.update({
+            "rows_scanned": pipeline.rows_scanned,
+            "rows_after_cleaning": partials.rows,
+            "customers": len(customer_df),
+            "columns_read": scan.columns,
+            "seconds": round(time.perf_counter() - start, 3)
+        })
+        return customer_df
+
+
+def _copy(node):
+    """Shallow copy, so optimizing never mutates the recorded plan."""
+    clone = object.__new__(type(node))
+    clone.__dict__.update(node.__dict__)
+    if isinstance(node, Scan):
+        clone.predicates = list(node.predicates)
+    if isinstance(node, Derive):
+        clone.columns = list(node.columns)
+    return clone
+
+
+def lazy_pipeline(input_path="data/raw/online_retail.csv", **options):
+    """The full cleaning and feature chain of run_pipeline, as a lazy plan."""
+    return (
+        LazyPipeline(input_path, **options)
+        .remove_missing_customer_ids()
+        .handle_cancelled_invoices()
+        .handle_negative_quantities()
+        .handle_zero_prices()
+        .handle_missing_descriptions()
+        .remove_outliers()
+        .remove_duplicates()
+        .add_derived_columns()
+        .convert_data_types()
+        .create_rfm_features()
+        .define_churn()
+        .finalize_features()
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build customer features from the raw file with a lazy, optimized plan")
+    parser.add_argument("input_path", nargs="?", default="data/raw/online_retail.csv")
+    parser.add_argument("--explain", action="store_true", help="print the logical and optimized plans only")
+    parser.add_argument("--outlier-method", default="exact", choices=["exact", "sketch"])
+    args = parser.parse_args()
+
+    plan = lazy_pipeline(args.input_path, outlier_method=args.outlier_method)
+    print(plan.explain())
+
+    if not args.explain:
+        customer_df = plan.collect()
+
+        print("\nLAZY PIPELINE SUMMARY")
+        print("=" * 50)
+        print(f"Rows scanned: {plan.stats['rows_scanned']:,}")
+        print(f"Rows after cleaning: {plan.stats['rows_after_cleaning']:,}")
+        print(f"Customers: {plan.stats['customers']:,}")
+        print(f"Passes over the file: {plan.stats['passes']}")
+        print(f"Time: {plan.stats['seconds']}s")
+        print("=" * 50)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Text columns stored as categories (dictionary-encoded) in the compact layout
+DICTIONARY_COLUMNS = ["InvoiceNo", "StockCode", "Description", "Country"]
+
+# Calendar fields derived from InvoiceDate and the width that holds them
+CALENDAR_DTYPES = {
+    "Year": np.int16,
+    "Month": np.int8,
+    "DayOfWeek": np.int8,
+    "Hour": np.int8
+}
+
+
+def calendar_fields(df):
+    """Year/Month/DayOfWeek/Hour from InvoiceDate, for frames that omit them."""
+    dates = df["InvoiceDate"].dt
+    return pd.DataFrame({
+        "Year": dates.year.astype(CALENDAR_DTYPES["Year"]),
+        "Month": dates.month.astype(CALENDAR_DTYPES["Month"]),
+        "DayOfWeek": dates.dayofweek.astype(CALENDAR_DTYPES["DayOfWeek"]),
+        "Hour": dates.hour.astype(CALENDAR_DTYPES["Hour"])
+    }, index=df.index)
+
+
+def compact_frame(df, lazy_calendar=False):
+    """
+    Return df in a compact in-memory layout:
+
+    - text columns in DICTIONARY_COLUMNS become categories
+    - integer columns are downcast to the smallest width holding their
+      current range (unsigned when never negative)
+    - calendar fields become int8/int16, or are dropped with
+      lazy_calendar=True and rebuilt on demand with calendar_fields()
+
+    Float columns are left at float64: prices and totals are not exactly
+    representable in float32 and would change downstream sums.
+    """
+    compact = {}
+
+    for column in df.columns:
+        series = df[column]
+
+        if column in CALENDAR_DTYPES:
+            if not lazy_calendar:
+                compact[column] = series.astype(CALENDAR_DTYPES[column])
+        elif column in DICTIONARY_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            compact[column] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series.dtype) and len(series):
+            downcast = "unsigned" if series.min() >= 0 else "integer"
+            compact[column] = pd.to_numeric(series, downcast=downcast)
+        else:
+            compact[column] = series
+
+    return pd.DataFrame(compact, index=df.index)
+
+
+def memory_comparison(df, compact):
+    """Per-column deep memory of df and its compact layout, plus the ratio."""
+    before = df.memory_usage(deep=True)
+    after = compact.memory_usage(deep=True).reindex(before.index, fill_value=0)
+
+    report = pd.DataFrame({
+        "dtype": df.dtypes.astype(str).reindex(before.index, fill_value="-"),
+        "compact_dtype": compact.dtypes.astype(str).reindex(before.index, fill_value="(lazy)"),
+        "bytes": before,
+        "compact_bytes": after
+    }, index=before.index)
+    report.loc["Index", "compact_dtype"] = "-"
+    report.loc["Total"] = ["", "", before.sum(), after.sum()]
+    report["ratio"] = (report["bytes"] / report["compact_bytes"].replace(0, np.nan)).round(2)
+    return report
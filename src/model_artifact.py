@@ -0,0 +1,141 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from artifact_format import (
+    ARTIFACT_DIR_NAME,
+    ARTIFACT_FORMAT_VERSION,
+    FOREST_ARRAYS,
+    file_fingerprint,
+    flatten_forest,
+    manifest_checksum
+)
+
+MODEL_ARTIFACT_DIR = os.path.join("models", ARTIFACT_DIR_NAME)
+
+# Pickles an artifact is exported from, by model name
+SOURCE_FILES = {
+    "scaler": "scaler.pkl",
+    "logistic_regression": "logistic_regression.pkl",
+    "random_forest": "random_forest.pkl"
+}
+
+
+def artifact_files(directory=MODEL_ARTIFACT_DIR):
+    """Every file of an artifact directory, manifest last."""
+    return [os.path.join(directory, f"forest_{name}.npy") for name in FOREST_ARRAYS] + [
+        os.path.join(directory, "manifest.json")
+    ]
+
+
+def save_model_artifact(
+    scaler,
+    logistic,
+    forest,
+    feature_names,
+    directory=MODEL_ARTIFACT_DIR,
+    sources=None
+):
+    """
+    Write the trained models as an artifact that loads without sklearn:
+
+    forest_*.npy    node arrays of artifact_format.flatten_forest, opened
+                    with np.load(..., mmap_mode="r")
+    manifest.json   feature order, scaler mean/scale, logistic regression
+                    coefficients, array dtypes/shapes, the SHA-256, size and
+                    mtime of every array and of the pickles it was exported
+                    from (sources), and a checksum over all of it
+
+    The manifest is written last: a complete manifest marks the arrays valid.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    arrays = {}
+    for name, array in flatten_forest(forest).items():
+        path = os.path.join(directory, f"forest_{name}.npy")
+        np.save(path, array)
+        arrays[name] = {
+            "file": os.path.basename(path),
+            "dtype": str(array.dtype),
+            "shape": list(array.shape),
+            **file_fingerprint(path)
+        }
+
+    manifest = {
+        "version": ARTIFACT_FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "feature_names": [str(name) for name in feature_names],
+        "scaler": {
+            "mean": scaler.mean_.tolist(),
+            "scale": scaler.scale_.tolist()
+        },
+        "logistic_regression": {
+            "coef": logistic.coef_[0].tolist(),
+            "intercept": float(logistic.intercept_[0])
+        },
+        "random_forest": {
+            "n_trees": len(forest.estimators_),
+            "n_nodes": int(arrays["feature"]["shape"][0]),
+            "n_features": int(forest.n_features_in_),
+            "arrays": arrays
+        },
+        "sources": sources or {}
+    }
+    manifest["checksum"] = manifest_checksum(manifest)
+
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    return manifest
+
+
+def source_fingerprints(models_dir="models"):
+    """Fingerprint of each pickle an artifact is exported from, keyed by file name."""
+    return {
+        filename: file_fingerprint(os.path.join(models_dir, filename))
+        for filename in SOURCE_FILES.values()
+    }
+
+
+def export_model_artifact(models_dir="models", directory=None):
+    """Build the artifact from already trained pickles in models_dir."""
+    import joblib
+
+    models = {
+        name: joblib.load(os.path.join(models_dir, filename))
+        for name, filename in SOURCE_FILES.items()
+    }
+    feature_names = getattr(models["scaler"], "feature_names_in_", None)
+    if feature_names is None:
+        raise ValueError("The scaler carries no feature names; retrain to export an artifact")
+
+    return save_model_artifact(
+        models["scaler"],
+        models["logistic_regression"],
+        models["random_forest"],
+        list(feature_names),
+        directory or os.path.join(models_dir, ARTIFACT_DIR_NAME),
+        sources=source_fingerprints(models_dir)
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export trained model pickles as a fast-loading artifact")
+    parser.add_argument("--models-dir", default="models")
+    args = parser.parse_args()
+
+    manifest = export_model_artifact(args.models_dir)
+
+    print("\nMODEL ARTIFACT SUMMARY")
+    print("=" * 50)
+    print(f"Directory: {os.path.join(args.models_dir, ARTIFACT_DIR_NAME)}")
+    print(f"Features: {', '.join(manifest['feature_names'])}")
+    print(f"Trees: {manifest['random_forest']['n_trees']}, nodes: {manifest['random_forest']['n_nodes']:,}")
+    print(f"Checksum: {manifest['checksum']}")
+    print("=" * 50)
@@ -0,0 +1,286 @@
+import importlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from quantile_sketch import SKETCH_SEED, KLLSketch
+from storage import FrameWriter, csv_byte_ranges, with_format
+
+cleaning = importlib.import_module("02_data_cleaning")
+features = importlib.import_module("03_feature_engineering")
+
+
+def _partition_files(tmp_dir, partition):
+    return sorted(
+        os.path.join(tmp_dir, name)
+        for name in os.listdir(tmp_dir)
+        if name.endswith(f"-p{partition:03d}.parquet")
+    )
+
+
+def _read_partition(tmp_dir, partition):
+    files = _partition_files(tmp_dir, partition)
+    if not files:
+        return None
+    return pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+
+
+def _within(df, column, bounds):
+    lower, upper = bounds
+    return df[(df[column] >= lower) & (df[column] <= upper)]
+
+
+def _map_range(path, columns, start, end, partitions, tmp_dir, sketch_k, sketch_seed):
+    """
+    Parse one byte range of the raw file, apply the row-local filters and
+    hash-partition the surviving rows by CustomerID.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    chunk = pd.read_csv(
+        io.BytesIO(data),
+        names=columns,
+        header=None,
+        encoding="latin1",
+        dtype=cleaning.RAW_DTYPES,
+        parse_dates=["InvoiceDate"]
+    )
+
+    rows_removed = dict.fromkeys([step for step, _ in cleaning.ROW_FILTERS], 0)
+    missing = chunk.isnull().sum()
+    rows = len(chunk)
+
+    chunk = cleaning.DataCleaner._filter_chunk(chunk, rows_removed)
+    # Seeded per range: reproducible, without every range compacting alike
+    sketch = KLLSketch(k=sketch_k, seed=[sketch_seed, start]).update(chunk["Quantity"].to_numpy())
+
+    buckets = pd.util.hash_array(chunk["CustomerID"].to_numpy()) % partitions
+    for partition, part in chunk.groupby(buckets):
+        part.to_parquet(
+            os.path.join(tmp_dir, f"r{start:014d}-p{partition:03d}.parquet"),
+            index=False
+        )
+
+    return rows, missing, rows_removed, sketch
+
+
+def _sketch_prices(tmp_dir, partition, quantity_bounds, sketch_k, sketch_seed):
+    sketch = KLLSketch(k=sketch_k, seed=[sketch_seed, partition])
+    df = _read_partition(tmp_dir, partition)
+    if df is not None:
+        sketch.update(_within(df, "Quantity", quantity_bounds)["UnitPrice"].to_numpy())
+    return sketch
+
+
+def _reduce_partition(tmp_dir, partition, bounds):
+    """
+    Finish cleaning one partition and aggregate its customers. Identical
+    rows share a CustomerID, so partition-local deduplication is exact.
+    """
+    df = _read_partition(tmp_dir, partition)
+    if df is None:
+        return None
+
+    initial_rows = len(df)
+    df = _within(_within(df, "Quantity", bounds["Quantity"]), "UnitPrice", bounds["UnitPrice"])
+    outliers_removed = initial_rows - len(df)
+
+    initial_rows = len(df)
+    df = df.drop_duplicates()
+    duplicates_removed = initial_rows - len(df)
+
+    df = cleaning.DataCleaner._derive_columns(df.copy())
+    df["CustomerID"] = df["CustomerID"].astype(int)
+
+    cleaned_path = os.path.join(tmp_dir, f"cleaned-{partition:03d}.parquet")
+    df.to_parquet(cleaned_path, index=False)
+
+    return {
+        "cleaned_path": cleaned_path,
+        "rows": len(df),
+        "missing_after": df.isnull().sum(),
+        "outliers_removed": outliers_removed,
+        "duplicates_removed": duplicates_removed,
+        "aggregates": features.aggregate_customers(df)
+    }
+
+
+class ParallelPipeline:
+    """
+    Cleaning and customer feature aggregation over a process pool.
+
+    The raw CSV is split into byte ranges that workers parse and filter
+    independently, shuffling the surviving rows into hash partitions by
+    CustomerID. Cross-partition state is handled by the driver: Quantity
+    and UnitPrice IQR bounds come from merged KLL sketches, the reference
+    date is the maximum over partitions, and deduplication is exact within
+    a partition because identical rows share a CustomerID.
+    """
+
+    def __init__(
+        self,
+        input_path="data/raw/online_retail.csv",
+        workers=None,
+        partitions=None,
+        range_bytes=32 * 1024 * 1024,
+        iqr_threshold=1.5,
+        sketch_error=0.01,
+        storage_format="csv",
+        churn_threshold_days=90,
+        sketch_seed=SKETCH_SEED
+    ):
+        self.input_path = input_path
+        self.workers = workers or os.cpu_count()
+        self.partitions = partitions or self.workers * 2
+        self.range_bytes = range_bytes
+        self.iqr_threshold = iqr_threshold
+        self.sketch_k = KLLSketch.k_for_error(sketch_error)
+        self.sketch_seed = sketch_seed
+        self.storage_format = storage_format
+        self.churn_threshold_days = churn_threshold_days
+        self.cleaner = cleaning.DataCleaner(
+            input_path,
+            iqr_threshold=iqr_threshold,
+            outlier_method="sketch",
+            sketch_error=sketch_error,
+            sketch_seed=sketch_seed,
+            storage_format=storage_format
+        )
+        self.timings = {}
+
+    def _bounds(self, sketch):
+        return self.cleaner._iqr_bounds(sketch.quantile(0.25), sketch.quantile(0.75))
+
+    def run_pipeline(self):
+        print(f"Starting parallel pipeline with {self.workers} workers...")
+        os.makedirs("data/processed", exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix="partitions-", dir="data/processed")
+        stats = self.cleaner.cleaning_stats
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                # Map: parse + row filters + shuffle into partitions
+                start = time.perf_counter()
+                columns, ranges = csv_byte_ranges(self.input_path, self.range_bytes)
+                mapped = list(pool.map(
+                    _map_range,
+                    *zip(*[
+                        (self.input_path, columns, s, e, self.partitions, tmp_dir, self.sketch_k, self.sketch_seed)
+                        for s, e in ranges
+                    ])
+                ))
+
+                rows_removed = dict.fromkeys([step for step, _ in cleaning.ROW_FILTERS], 0)
+                missing_before = {}
+                quantity_sketch = KLLSketch(k=self.sketch_k, seed=self.sketch_seed)
+                for rows, missing, removed, sketch in mapped:
+                    stats["original_rows"] += rows
+                    cleaning._add_counts(missing_before, missing)
+                    for step, count in removed.items():
+                        rows_removed[step] += count
+                    quantity_sketch.merge(sketch)
+                self.timings["map"] = time.perf_counter() - start
+
+                # Global IQR bounds, Quantity first, then UnitPrice on the
+                # rows within the Quantity bounds (same order as remove_outliers)
+                start = time.perf_counter()
+                bounds = {"Quantity": self._bounds(quantity_sketch)}
+                price_sketch = KLLSketch(k=self.sketch_k, seed=self.sketch_seed)
+                for sketch in pool.map(
+                    _sketch_prices,
+                    [tmp_dir] * self.partitions,
+                    range(self.partitions),
+                    [bounds["Quantity"]] * self.partitions,
+                    [self.sketch_k] * self.partitions,
+                    [self.sketch_seed] * self.partitions
+                ):
+                    price_sketch.merge(sketch)
+                bounds["UnitPrice"] = self._bounds(price_sketch)
+                self.timings["bounds"] = time.perf_counter() - start
+
+                # Reduce: outliers, duplicates, derived columns, aggregates
+                start = time.perf_counter()
+                reduced = [
+                    r for r in pool.map(
+                        _reduce_partition,
+                        [tmp_dir] * self.partitions,
+                        range(self.partitions),
+                        [bounds] * self.partitions
+                    )
+                    if r is not None
+                ]
+                self.timings["reduce"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            output_path = with_format("data/processed/cleaned_transactions", self.storage_format)
+            missing_after = {}
+            with FrameWriter(output_path) as writer:
+                for r in reduced:
+                    writer.write(pd.read_parquet(r["cleaned_path"]))
+                    cleaning._add_counts(missing_after, r["missing_after"])
+            self.timings["write"] = time.perf_counter() - start
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.cleaner.outlier_sketches = {"Quantity": quantity_sketch, "UnitPrice": price_sketch}
+        stats["missing_values_before"] = missing_before
+        stats["missing_values_after"] = missing_after
+        stats["steps_applied"] = [
+            {"step": step, "rows_removed": count} for step, count in rows_removed.items()
+        ]
+        self.cleaner._record_outliers(sum(r["outliers_removed"] for r in reduced), bounds)
+        stats["steps_applied"] += [
+            {
+                "step": "remove_duplicates",
+                "rows_removed": sum(r["duplicates_removed"] for r in reduced)
+            },
+            {
+                "step": "add_derived_columns",
+                "columns_added": ["TotalPrice", "Year", "Month", "DayOfWeek", "Hour"]
+            },
+            {"step": "convert_data_types"}
+        ]
+        stats["output_path"] = output_path
+        stats["mode"] = "parallel"
+        stats["workers"] = self.workers
+        stats["partitions"] = self.partitions
+        self.cleaner._save_statistics(writer.rows_written)
+
+        # Customers never span partitions, so aggregates simply concatenate;
+        # the reference date is global
+        aggregates = pd.concat([r["aggregates"] for r in reduced]).sort_index()
+        engineer = features.FeatureEngineer(output_path, storage_format=self.storage_format)
+        engineer.reference_date = aggregates["LastPurchase"].max()
+        engineer.customer_df = features.customer_features(aggregates, engineer.reference_date)
+        (
+            engineer.define_churn(self.churn_threshold_days)
+            .finalize_features()
+            .save_outputs()
+        )
+
+        logging.info(f"Parallel pipeline timings: {json.dumps(self.timings)}")
+        print("Parallel pipeline completed successfully!")
+        return engineer.customer_df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run cleaning and feature engineering in parallel")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "feather"])
+    args = parser.parse_args()
+
+    pipeline = ParallelPipeline(workers=args.workers, storage_format=args.format)
+    customer_features = pipeline.run_pipeline()
+
+    print("\nFinal feature dataset shape:", customer_features.shape)
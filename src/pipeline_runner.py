@@ -0,0 +1,365 @@
+import ast
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import time
+
+from artifact_format import file_sha256
+from feature_matrix import FEATURE_MATRIX_DIR
+from model_artifact import MODEL_ARTIFACT_DIR, artifact_files
+from storage import with_format
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bump to invalidate every cached stage after a change to the cache layout
+CACHE_VERSION = 1
+
+
+class FileHashIndex:
+    """
+    Memoized content hashes keyed by (path, size, mtime), so unchanged
+    multi-GB inputs are not re-read on every run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def hash(self, path):
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.entries.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(path)
+        }
+        return self.entries[key]["sha256"]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f)
+
+
+class StageCache:
+    """
+    Content-addressed store of stage outputs.
+
+    objects/<sha256>       output file contents, stored once per content
+    entries/<fingerprint>  output path -> object hash for one stage run
+
+    Entries are touched on every hit; when objects exceed max_bytes the
+    least recently used entries are dropped along with objects no
+    remaining entry references.
+    """
+
+    def __init__(self, cache_dir=".cache/stages", max_bytes=5 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.entries_dir = os.path.join(cache_dir, "entries")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.entries_dir, exist_ok=True)
+        self.hashes = FileHashIndex(os.path.join(cache_dir, "file_hashes.json"))
+
+    def _entry_path(self, fingerprint):
+        return os.path.join(self.entries_dir, fingerprint + ".json")
+
+    def lookup(self, fingerprint):
+        path = self._entry_path(fingerprint)
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as f:
+            outputs = json.load(f)
+        if not all(os.path.exists(os.path.join(self.objects_dir, h)) for h in outputs.values()):
+            return None
+
+        os.utime(path)
+        return outputs
+
+    def restore(self, outputs):
+        """Put cached outputs in place, skipping files that already match."""
+        for output_path, object_hash in outputs.items():
+            if os.path.exists(output_path) and self.hashes.hash(output_path) == object_hash:
+                continue
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            shutil.copyfile(os.path.join(self.objects_dir, object_hash), output_path)
+
+    def store(self, fingerprint, output_paths):
+        outputs = {}
+        for output_path in output_paths:
+            object_hash = self.hashes.hash(output_path)
+            object_path = os.path.join(self.objects_dir, object_hash)
+            if not os.path.exists(object_path):
+                shutil.copyfile(output_path, object_path)
+            outputs[output_path] = object_hash
+
+        with open(self._entry_path(fingerprint), "w") as f:
+            json.dump(outputs, f, indent=4)
+
+        self.evict()
+        return outputs
+
+    def evict(self):
+        entries = sorted(
+            (os.path.join(self.entries_dir, name) for name in os.listdir(self.entries_dir)),
+            key=os.path.getmtime
+        )
+        sizes = {
+            name: os.path.getsize(os.path.join(self.objects_dir, name))
+            for name in os.listdir(self.objects_dir)
+        }
+
+        # Keep the most recent entry even if it alone exceeds the budget
+        while len(entries) > 1 and sum(sizes.values()) > self.max_bytes:
+            os.remove(entries.pop(0))
+
+            referenced = set()
+            for entry in entries:
+                with open(entry) as f:
+                    referenced.update(json.load(f).values())
+            for name in list(sizes):
+                if name not in referenced:
+                    os.remove(os.path.join(self.objects_dir, name))
+                    del sizes[name]
+
+
+class Stage:
+    def __init__(self, name, run, inputs, outputs, code, params=None):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.code = [os.path.join(SRC_DIR, filename) for filename in code]
+        self.params = params or {}
+
+
+def _module(name):
+    return importlib.import_module(name)
+
+
+def _imported_names(path):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module
+        elif (
+            # importlib.import_module("02_data_cleaning")
+            isinstance(node, ast.Call)
+            and getattr(node.func, "attr", None) == "import_module"
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+        ):
+            yield node.args[0].value
+
+
+def module_code(filename):
+    """
+    The stage script and every local module it imports, directly or
+    transitively (including imports inside functions), as sorted paths.
+    """
+    found = set()
+    pending = [os.path.join(SRC_DIR, filename)]
+
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+
+        for name in _imported_names(path):
+            candidate = os.path.join(SRC_DIR, name.split(".")[0] + ".py")
+            if os.path.exists(candidate):
+                pending.append(candidate)
+
+    return sorted(found)
+
+
+def build_stages(
+    raw_path="data/raw/online_retail.csv",
+    storage_format="csv",
+    iqr_threshold=1.5,
+    outlier_method="exact",
+    churn_threshold_days=90,
+    n_iter=10,
+    cv=5
+):
+    cleaned_path = with_format("data/processed/cleaned_transactions", storage_format)
+    features_path = with_format("data/processed/customer_features", storage_format)
+    matrix_files = [
+        os.path.join(FEATURE_MATRIX_DIR, name)
+        for name in ["features.npy", "customer_ids.npy", "labels.npy", "schema.json"]
+    ]
+
+    def acquire():
+        acquisition = _module("01_data_acquisition")
+        acquisition.download_dataset()
+        acquisition.generate_streaming_profile(raw_path)
+
+    def clean():
+        _module("02_data_cleaning").DataCleaner(
+            raw_path,
+            iqr_threshold=iqr_threshold,
+            outlier_method=outlier_method,
+            storage_format=storage_format
+        ).run_pipeline()
+
+    def engineer():
+        _module("03_feature_engineering").FeatureEngineer(
+            cleaned_path,
+            storage_format=storage_format,
+            churn_threshold_days=churn_threshold_days
+        ).run_pipeline()
+
+    def train():
+        _module("04_model_training").ModelTrainer(
+            features_path, n_iter=n_iter, cv=cv
+        ).run_pipeline()
+
+    cleaning_outputs = [cleaned_path, "data/processed/cleaning_statistics.json"]
+    if outlier_method != "exact":
+        cleaning_outputs.append("data/processed/outlier_sketches.json")
+
+    return [
+        Stage(
+            "acquisition", acquire,
+            inputs=[raw_path],
+            outputs=["data/raw/data_profile.txt", "data/raw/data_profile.json"],
+            code=module_code("01_data_acquisition.py")
+        ),
+        Stage(
+            "cleaning", clean,
+            inputs=[raw_path],
+            outputs=cleaning_outputs,
+            code=module_code("02_data_cleaning.py"),
+            params={
+                "iqr_threshold": iqr_threshold,
+                "outlier_method": outlier_method,
+                "storage_format": storage_format
+            }
+        ),
+        Stage(
+            "features", engineer,
+            inputs=[cleaned_path],
+            outputs=[features_path, "data/processed/feature_metadata.json", *matrix_files],
+            code=module_code("03_feature_engineering.py"),
+            params={
+                "churn_threshold_days": churn_threshold_days,
+                "storage_format": storage_format
+            }
+        ),
+        Stage(
+            "training", train,
+            inputs=[features_path, *matrix_files],
+            outputs=[
+                "models/logistic_regression.pkl",
+                "models/random_forest.pkl",
+                "models/scaler.pkl",
+                "models/model_metrics.json",
+                *artifact_files(MODEL_ARTIFACT_DIR)
+            ],
+            code=module_code("04_model_training.py"),
+            params={"n_iter": n_iter, "cv": cv}
+        )
+    ]
+
+
+class PipelineRunner:
+    """
+    Runs the pipeline stages in order, skipping any stage whose fingerprint
+    (input contents, parameters and code) matches a cached run.
+    """
+
+    def __init__(self, stages, cache=None, force=()):
+        self.stages = stages
+        self.cache = cache or StageCache()
+        self.force = set(force)
+        self.report = []
+
+    def fingerprint(self, stage):
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "version": CACHE_VERSION,
+            "stage": stage.name,
+            "params": stage.params,
+            "inputs": [(path, self.cache.hashes.hash(path)) for path in stage.inputs],
+            "code": [
+                (os.path.basename(path), self.cache.hashes.hash(path))
+                for path in stage.code
+            ]
+        }, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def run(self):
+        print("Starting cached pipeline run...")
+
+        for stage in self.stages:
+            start = time.perf_counter()
+            fingerprint = self.fingerprint(stage)
+            outputs = None if stage.name in self.force else self.cache.lookup(fingerprint)
+
+            if outputs is not None:
+                self.cache.restore(outputs)
+                status = "cached"
+            else:
+                stage.run()
+                self.cache.store(fingerprint, stage.outputs)
+                status = "ran"
+
+            self.cache.hashes.save()
+            elapsed = time.perf_counter() - start
+            self.report.append({
+                "stage": stage.name,
+                "status": status,
+                "fingerprint": fingerprint[:16],
+                "seconds": round(elapsed, 3)
+            })
+
+        print("\nPIPELINE RUN SUMMARY")
+        print("=" * 50)
+        for entry in self.report:
+            print(f"{entry['stage']:<14}{entry['status']:<8}{entry['fingerprint']:<18}{entry['seconds']:>8.2f}s")
+        print("=" * 50)
+
+        return self.report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the churn pipeline with stage caching")
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "feather"])
+    parser.add_argument("--iqr-threshold", type=float, default=1.5)
+    parser.add_argument("--outlier-method", default="exact", choices=["exact", "sketch"])
+    parser.add_argument("--churn-threshold-days", type=int, default=90)
+    parser.add_argument("--n-iter", type=int, default=10)
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--force", nargs="*", default=[], help="stages to re-run regardless of cache")
+    parser.add_argument("--max-cache-gb", type=float, default=5.0)
+    args = parser.parse_args()
+
+    stages = build_stages(
+        storage_format=args.format,
+        iqr_threshold=args.iqr_threshold,
+        outlier_method=args.outlier_method,
+        churn_threshold_days=args.churn_threshold_days,
+        n_iter=args.n_iter,
+        cv=args.cv
+    )
+    cache = StageCache(max_bytes=int(args.max_cache_gb * 1024 ** 3))
+    PipelineRunner(stages, cache, force=args.force).run()
@@ -0,0 +1,169 @@
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Unix only; Windows has no getrusage
+    resource = None
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_bytes():
+    """Highest resident set size of the process so far, or None without getrusage."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+def current_rss_bytes():
+    """Resident set size now, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_over(baseline):
+    """Process peak RSS above baseline bytes, or None if either is unknown."""
+    peak = peak_rss_bytes()
+    if peak is None or baseline is None:
+        return None
+    return peak - baseline
+
+
+def format_mb(n, spec=".1f"):
+    return "n/a" if n is None else format(n / 1024 ** 2, spec)
+
+
+def frame_memory_bytes(df, deep=False):
+    if not isinstance(df, pd.DataFrame):
+        return 0
+    return int(df.memory_usage(deep=deep).sum())
+
+
+def _mb(n):
+    return None if n is None else round(n / 1024 ** 2, 2)
+
+
+class StepProfiler:
+    """
+    Times each chained step of a pipeline object.
+
+    wrap(owner) returns a proxy whose method calls are measured and which
+    returns itself wherever the method returned owner, so an existing
+    method chain can be profiled unchanged:
+
+        profiler.wrap(cleaner).load_data().remove_outliers()
+
+    frame is a callable returning the DataFrame the steps operate on; its
+    row count and memory usage are recorded before and after every step
+    alongside wall time and process RSS. process_peak_rss_mb is the
+    high-water mark of the whole process so far, not of the step. Memory is the shallow
+    memory_usage by default; deep=True also measures string contents,
+    which walks every object and is costly on large text columns.
+    """
+
+    def __init__(self, frame, deep=False):
+        self.frame = frame
+        self.deep = deep
+        self.steps = []
+        self._origin = time.perf_counter()
+        self._measured = (None, 0)
+
+    def _memory(self, df):
+        # Steps that return the frame untouched are not measured twice
+        if df is not None and df is self._measured[0]:
+            return self._measured[1]
+        memory = frame_memory_bytes(df, self.deep)
+        self._measured = (df, memory)
+        return memory
+
+    def _call(self, name, method, *args, **kwargs):
+        df = self.frame()
+        rows_before = len(df) if df is not None else 0
+        memory_before = self._memory(df)
+        rss_before = current_rss_bytes()
+
+        start = time.perf_counter()
+        result = method(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        df = self.frame()
+        rows_after = len(df) if df is not None else 0
+        rows = max(rows_before, rows_after)
+
+        self.steps.append({
+            "step": name,
+            "start_seconds": round(start - self._origin, 6),
+            "elapsed_seconds": round(elapsed, 6),
+            "rows_before": rows_before,
+            "rows_after": rows_after,
+            "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+            "frame_memory_before_mb": _mb(memory_before),
+            "frame_memory_after_mb": _mb(self._memory(df)),
+            "rss_before_mb": _mb(rss_before),
+            "rss_after_mb": _mb(current_rss_bytes()),
+            "process_peak_rss_mb": _mb(peak_rss_bytes())
+        })
+        return result
+
+    def wrap(self, owner):
+        return _ProfiledChain(self, owner)
+
+    def summary(self):
+        return {
+            "total_seconds": round(sum(s["elapsed_seconds"] for s in self.steps), 6),
+            "process_peak_rss_mb": _mb(peak_rss_bytes()),
+            "steps": self.steps
+        }
+
+    def write_chrome_trace(self, path, process_name="pipeline"):
+        """
+        Write the steps as Chrome trace events, viewable in chrome://tracing,
+        Perfetto or speedscope.
+        """
+        events = [{
+            "name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+            "args": {"name": process_name}
+        }]
+        for step in self.steps:
+            events.append({
+                "name": step["step"],
+                "cat": process_name,
+                "ph": "X",
+                "ts": round(step["start_seconds"] * 1e6),
+                "dur": round(step["elapsed_seconds"] * 1e6),
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {
+                    k: v for k, v in step.items()
+                    if k not in ("step", "start_seconds", "elapsed_seconds")
+                }
+            })
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class _ProfiledChain:
+    def __init__(self, profiler, owner):
+        self._profiler = profiler
+        self._owner = owner
+
+    def __getattr__(self, name):
+        method = getattr(self._owner, name)
+
+        def profiled(*args, **kwargs):
+            result = self._profiler._call(name, method, *args, **kwargs)
+            return self if result is self._owner else result
+
+        return profiled
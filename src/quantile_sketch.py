@@ -0,0 +1,139 @@
+import json
+import numpy as np
+
+# Default seed of the compaction offsets: the same data always gives the
+# same sketch, so outlier bounds and cleaned outputs are reproducible
+SKETCH_SEED = 0
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin-Lang-Liberty).
+
+    Values are kept in a stack of compactors; level h holds items of weight
+    2**h. When a level outgrows its capacity it is sorted and every other
+    item (random offset, drawn from seed) is promoted to the next level. Sketches built on
+    separate chunks or workers merge into one with the same error bound.
+    """
+
+    def __init__(self, k=200, seed=SKETCH_SEED):
+        self.k = int(k)
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def k_for_error(epsilon):
+        """Smallest k whose normalized rank error is at most epsilon."""
+        return max(8, int(np.ceil((2.296 / epsilon) ** (1 / 0.9723))))
+
+    @classmethod
+    def from_error(cls, epsilon, seed=SKETCH_SEED):
+        return cls(k=cls.k_for_error(epsilon), seed=seed)
+
+    @property
+    def error_bound(self):
+        """Approximate normalized rank error (99% confidence)."""
+        return 2.296 / self.k ** 0.9723
+
+    @property
+    def is_exact(self):
+        return len(self.levels) == 1
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        while True:
+            for level, items in enumerate(self.levels):
+                if len(items) > self._capacity(level):
+                    break
+            else:
+                return
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(items)
+            keep = items[:len(items) % 2]
+            items = items[len(keep):]
+
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        if self.n == 0:
+            raise ValueError("Cannot compute a quantile of an empty sketch")
+
+        # Nothing compacted yet: identical to pandas' linear interpolation
+        if self.is_exact:
+            return float(np.quantile(self.levels[0], q))
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+
+        idx = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[order][min(idx, len(items) - 1)])
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": int(self.n),
+            "levels": [level_items.tolist() for level_items in self.levels]
+        }
+
+    @classmethod
+    def from_dict(cls, data, seed=SKETCH_SEED):
+        sketch = cls(k=data["k"], seed=seed)
+        sketch.n = data["n"]
+        sketch.levels = [np.asarray(level_items, dtype=np.float64) for level_items in data["levels"]]
+        return sketch
+
+
+def save_sketches(sketches, path, **extra):
+    """Persist a {name: KLLSketch} mapping (plus extra metadata) as JSON."""
+    payload = {name: sketch.to_dict() for name, sketch in sketches.items()}
+    with open(path, "w") as f:
+        json.dump({"sketches": payload, **extra}, f)
+
+
+def load_sketches(path):
+    """Sketches saved by save_sketches, compacting further with their saved seed."""
+    with open(path) as f:
+        payload = json.load(f)
+    seed = payload.get("seed", SKETCH_SEED)
+    return {
+        name: KLLSketch.from_dict(data, seed=seed)
+        for name, data in payload["sketches"].items()
+    }
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_COLUMNS = [
+    "SnapshotDate", "CustomerID", "Recency", "Frequency", "Monetary",
+    "AvgOrderValue", "ActiveMonths", "Churn", "LogMonetary"
+]
+
+
+class SnapshotBuilder:
+    """
+    Point-in-time customer features and churn labels for many cutoffs.
+
+    For a cutoff c, features use only transactions before c (Recency is
+    measured from c) and Churn is 1 when the customer makes no purchase in
+    [c, c + horizon_days). Customers with no purchase before c are left out.
+
+    Transactions are sorted once by (CustomerID, InvoiceDate) and turned
+    into running per-customer totals. A snapshot then needs one binary
+    search per customer: the last transaction before c gives Frequency,
+    Monetary and ActiveMonths as of c, and the next one decides the label.
+    """
+
+    def __init__(self, transactions):
+        codes, self.customer_ids = pd.factorize(transactions["CustomerID"], sort=True)
+        dates = transactions["InvoiceDate"].to_numpy(dtype="datetime64[ns]")
+        order = np.lexsort((dates, codes))
+
+        codes = codes[order]
+        self.dates = dates[order]
+        invoices = transactions["InvoiceNo"].to_numpy()[order]
+        prices = transactions["TotalPrice"].to_numpy(dtype=np.float64)[order]
+        n = len(codes)
+
+        bounds = np.searchsorted(codes, np.arange(len(self.customer_ids) + 1))
+        self.starts, self.ends = bounds[:-1], bounds[1:]
+
+        # Search key ordering rows by customer, then by date rank
+        self.unique_dates = np.unique(self.dates)
+        self.stride = len(self.unique_dates) + 1
+        self.keys = codes.astype(np.int64) * self.stride + np.searchsorted(self.unique_dates, self.dates)
+
+        # Running totals within each customer, as of each of its rows
+        first_invoice = ~pd.DataFrame({"c": codes, "i": invoices}).duplicated().to_numpy()
+        month = self.dates.astype("datetime64[M]").astype(np.int64)
+        new_month = np.ones(n, dtype=bool)
+        new_month[1:] = (month[1:] != month[:-1]) | (codes[1:] != codes[:-1])
+
+        self.invoice_count = self._running_count(first_invoice, codes)
+        self.month_count = self._running_count(new_month, codes)
+        self.spend = pd.Series(prices).groupby(codes, sort=False).cumsum().to_numpy()
+
+    def _running_count(self, flags, codes):
+        counts = np.cumsum(flags, dtype=np.int64)
+        before = np.concatenate([[0], counts])[self.starts]
+        return counts - before[codes]
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self.unique_dates[-1]) if len(self.unique_dates) else None
+
+    def cutoffs(self, horizon_days, freq="MS"):
+        """
+        Midnight-aligned freq period starts (month starts by default) after
+        the first transaction, up to the last with a full label window.
+        """
+        if not len(self.unique_dates):
+            return []
+        first = pd.Timestamp(self.unique_dates[0])
+        end = self.last_date - pd.Timedelta(days=horizon_days)
+        # A cutoff at or before the first transaction has no history
+        return [c for c in pd.date_range(first.normalize(), end, freq=freq) if c > first]
+
+    def snapshot(self, cutoff, horizon_days):
+        cutoff = pd.Timestamp(cutoff)
+        if self.last_date is not None and cutoff + pd.Timedelta(days=horizon_days) > self.last_date:
+            raise ValueError(
+                f"Label window of cutoff {cutoff.date()} ends after the last "
+                f"transaction ({self.last_date})"
+            )
+
+        c = np.datetime64(cutoff, "ns")
+        date_rank = np.searchsorted(self.unique_dates, c, side="left")
+        # First row of each customer on or after the cutoff
+        nxt = np.searchsorted(self.keys, np.arange(len(self.starts)) * self.stride + date_rank)
+
+        customers = np.flatnonzero(nxt > self.starts)
+        nxt = nxt[customers]
+        last = nxt - 1
+
+        has_next = nxt < self.ends[customers]
+        next_dates = self.dates[np.minimum(nxt, len(self.dates) - 1)]
+        returned = has_next & (next_dates < c + np.timedelta64(horizon_days, "D"))
+
+        frequency = self.invoice_count[last]
+        monetary = self.spend[last]
+        return pd.DataFrame({
+            "SnapshotDate": np.full(len(customers), c),
+            "CustomerID": self.customer_ids[customers],
+            "Recency": (c - self.dates[last]) // np.timedelta64(1, "D"),
+            "Frequency": frequency,
+            "Monetary": monetary,
+            "AvgOrderValue": monetary / frequency,
+            "ActiveMonths": self.month_count[last],
+            "Churn": (~returned).astype(int),
+            "LogMonetary": np.log1p(monetary)
+        })[SNAPSHOT_COLUMNS]
+
+    def build(self, cutoffs, horizon_days):
+        """All snapshots stacked, one row per (cutoff, customer)."""
+        snapshots = [self.snapshot(cutoff, horizon_days) for cutoff in cutoffs]
+        if not snapshots:
+            return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+        return pd.concat(snapshots, ignore_index=True)
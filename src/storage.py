@@ -0,0 +1,162 @@
+import os
+import pandas as pd
+
+# File extension -> storage format for pipeline artifacts
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather"}
+
+# Text columns of the raw CSV are read as strings so every chunk gets the same schema
+RAW_DTYPES = {
+    "InvoiceNo": str,
+    "StockCode": str,
+    "Description": str,
+    "Country": str
+}
+
+
+def storage_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported storage format for {path}")
+    return FORMATS[ext]
+
+
+def with_format(path, fmt):
+    """Swap the extension of path for the one used by fmt."""
+    return os.path.splitext(path)[0] + "." + fmt
+
+
+def csv_byte_ranges(path, range_bytes):
+    """Split a CSV into newline-aligned (start, end) byte ranges after the header."""
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = len(header)
+        ranges = []
+
+        while start < size:
+            f.seek(min(start + range_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    columns = header.decode("latin1").strip().split(",")
+    return columns, ranges
+
+
+def save_frame(df, path, compression="zstd", row_group_size=100_000):
+    """
+    Write a DataFrame as CSV, Parquet or Feather depending on the extension.
+    Columnar formats keep pandas dtypes (including categories), and Parquet
+    stores per-row-group min/max statistics.
+    """
+    fmt = storage_format(path)
+
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(
+            path,
+            engine="pyarrow",
+            index=False,
+            compression=compression,
+            row_group_size=row_group_size
+        )
+    else:
+        df.reset_index(drop=True).to_feather(path, compression=compression)
+
+
+def load_frame(path, columns=None, parse_dates=None):
+    """
+    Load a DataFrame saved by save_frame, reading only the requested
+    columns. parse_dates only applies to CSV; columnar formats store
+    timestamps natively.
+    """
+    fmt = storage_format(path)
+
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns, parse_dates=parse_dates)
+    if fmt == "parquet":
+        return pd.read_parquet(path, engine="pyarrow", columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+class FrameWriter:
+    """
+    Append DataFrame chunks to a single CSV, Parquet or Feather file.
+
+    The first chunk with rows fixes the schema; later chunks are cast to
+    it. Empty chunks before it are skipped, since their object columns
+    carry no type. Each Parquet chunk becomes its own row group.
+    """
+
+    def __init__(self, path, compression="zstd"):
+        self.path = path
+        self.format = storage_format(path)
+        self.compression = compression
+        self.rows_written = 0
+        self._schema = None
+        self._writer = None
+        self._sink = None
+        self._empty = None
+
+    def write(self, chunk):
+        if self.format == "csv":
+            first = self.rows_written == 0
+            chunk.to_csv(self.path, mode="w" if first else "a", header=first, index=False)
+        else:
+            import pyarrow as pa
+
+            if self._writer is None and not len(chunk):
+                # Written on close if no chunk with rows ever arrives
+                self._empty = chunk
+                return self
+
+            if self._writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._schema = table.schema
+                self._open(pa)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+
+            self._writer.write_table(table)
+
+        self.rows_written += len(chunk)
+        return self
+
+    def _open(self, pa):
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(
+                self.path, self._schema, compression=self.compression
+            )
+        else:
+            self._sink = pa.OSFile(self.path, "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink,
+                self._schema,
+                options=pa.ipc.IpcWriteOptions(compression=self.compression)
+            )
+
+    def close(self):
+        if self._writer is None and self._empty is not None:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(self._empty, preserve_index=False)
+            self._schema = table.schema
+            self._open(pa)
+            self._writer.write_table(table)
+            self._empty = None
+
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,193 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Share of invoices per country, roughly as in the real dataset
+COUNTRIES = {
+    "United Kingdom": 0.89, "Germany": 0.02, "France": 0.02, "EIRE": 0.015,
+    "Spain": 0.01, "Netherlands": 0.01, "Belgium": 0.008, "Switzerland": 0.007,
+    "Portugal": 0.006, "Australia": 0.005, "Norway": 0.004, "Italy": 0.005
+}
+
+DESCRIPTION_WORDS = [
+    "WHITE", "RED", "BLUE", "PINK", "VINTAGE", "HEART", "LANTERN", "MUG",
+    "BAG", "CAKE", "STAND", "CANDLE", "HOLDER", "SET", "OF", "3", "6", "RETRO",
+    "SPOT", "JUMBO", "LUNCH", "BOX", "CHRISTMAS", "GLASS", "STAR", "T-LIGHT"
+]
+
+START_DATE = pd.Timestamp("2010-12-01 08:00")
+END_DATE = pd.Timestamp("2011-12-09 20:00")
+
+
+def parse_rows(value):
+    """Row count from "1M", "10M", "250k" or a plain integer."""
+    value = str(value).strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}.get(value[-1])
+    return int(float(value[:-1]) * scale) if scale else int(value)
+
+
+class SyntheticRetailGenerator:
+    """
+    Chunked generator of raw Online Retail transactions.
+
+    Rows are grouped into invoices that carry one customer, country and
+    timestamp, with invoice numbers and dates increasing through the file.
+    Customer activity and product popularity are Zipf-skewed. Descriptions
+    and base prices are fixed per StockCode. The usual dirty data is mixed
+    in at about the real dataset's rates: cancelled "C" invoices with
+    negative quantities, missing CustomerIDs and Descriptions, zero prices,
+    extreme quantity/price outliers and exact duplicate rows.
+    """
+
+    def __init__(
+        self,
+        rows,
+        customers=None,
+        products=4_000,
+        seed=42,
+        cancel_rate=0.017,
+        missing_customer_rate=0.25,
+        missing_description_rate=0.003,
+        zero_price_rate=0.005,
+        outlier_rate=0.002,
+        duplicate_rate=0.01
+    ):
+        self.rows = rows
+        self.customers = customers or max(100, rows // 120)
+        self.products = products
+        self.seed = seed
+        self.cancel_rate = cancel_rate
+        self.missing_customer_rate = missing_customer_rate
+        self.missing_description_rate = missing_description_rate
+        self.zero_price_rate = zero_price_rate
+        self.outlier_rate = outlier_rate
+        self.duplicate_rate = duplicate_rate
+
+        catalog_rng = np.random.default_rng(seed)
+        self.stock_codes = (
+            np.arange(10_000, 10_000 + products).astype(str)
+            + np.where(catalog_rng.random(products) < 0.3, "A", "")
+        ).astype(object)
+        words = np.array(DESCRIPTION_WORDS, dtype=object)
+        self.descriptions = np.array([
+            " ".join(catalog_rng.choice(words, catalog_rng.integers(2, 5), replace=False))
+            for _ in range(products)
+        ], dtype=object)
+        self.base_prices = np.round(catalog_rng.lognormal(0.8, 0.9, products), 2)
+
+        self.country_names = np.array(list(COUNTRIES), dtype=object)
+        weights = np.array(list(COUNTRIES.values()))
+        self.country_weights = weights / weights.sum()
+
+        self._product_weights = _zipf_weights(products, 1.1)
+        self._customer_weights = _zipf_weights(self.customers, 0.7)
+
+    def chunks(self, chunk_rows=1_000_000):
+        rng = np.random.default_rng(self.seed + 1)
+        span = (END_DATE - START_DATE).value
+        next_invoice = 536_365
+        produced = 0
+
+        while produced < self.rows:
+            n = min(chunk_rows, self.rows - produced)
+            chunk, next_invoice = self._chunk(
+                rng, n, next_invoice,
+                START_DATE.value + span * produced // self.rows,
+                START_DATE.value + span * (produced + n) // self.rows
+            )
+            produced += n
+            yield chunk
+
+    def _chunk(self, rng, n, first_invoice, start_ns, end_ns):
+        # Invoice lines: geometric basket sizes, cut off at n rows
+        basket = rng.geometric(1 / 18, n)
+        invoice_of_row = np.repeat(np.arange(n), basket)[:n]
+        invoices = invoice_of_row[-1] + 1
+
+        invoice_numbers = first_invoice + np.arange(invoices)
+        cancelled = rng.random(invoices) < self.cancel_rate
+        customer = 12_346 + rng.choice(self.customers, invoices, p=self._customer_weights)
+        country = rng.choice(self.country_names, invoices, p=self.country_weights)
+        # Invoice times are increasing within the chunk's slice of the date range
+        times = np.sort(rng.integers(start_ns, max(end_ns, start_ns + 1), invoices))
+        times = times - times % 60_000_000_000
+
+        product = rng.choice(self.products, n, p=self._product_weights)
+        quantity = rng.geometric(0.15, n)
+        price = np.round(self.base_prices[product] * rng.choice([1.0, 0.85, 1.25], n, p=[0.8, 0.1, 0.1]), 2)
+
+        row_cancelled = cancelled[invoice_of_row]
+        quantity = np.where(row_cancelled, -quantity, quantity)
+
+        outliers = rng.random(n) < self.outlier_rate
+        quantity = np.where(outliers, quantity * rng.integers(50, 500, n), quantity)
+        price = np.where(rng.random(n) < self.outlier_rate, price * rng.integers(50, 500, n), price)
+        price = np.where(rng.random(n) < self.zero_price_rate, 0.0, price)
+
+        customer_ids = customer[invoice_of_row].astype(np.float64)
+        # Missing customers come in whole invoices, as in the source data
+        customer_ids[(rng.random(invoices) < self.missing_customer_rate)[invoice_of_row]] = np.nan
+
+        descriptions = self.descriptions[product].copy()
+        descriptions[rng.random(n) < self.missing_description_rate] = None
+
+        df = pd.DataFrame({
+            "InvoiceNo": np.where(
+                row_cancelled,
+                np.char.add("C", invoice_numbers[invoice_of_row].astype(str)),
+                invoice_numbers[invoice_of_row].astype(str)
+            ),
+            "StockCode": self.stock_codes[product],
+            "Description": descriptions,
+            "Quantity": quantity,
+            # Formatted once per invoice; strftime dominates generation time
+            "InvoiceDate": np.asarray(
+                pd.to_datetime(times).strftime("%m/%d/%Y %H:%M"), dtype=object
+            )[invoice_of_row],
+            "UnitPrice": price,
+            "CustomerID": customer_ids,
+            "Country": country[invoice_of_row]
+        })
+
+        duplicates = rng.random(n) < self.duplicate_rate
+        if duplicates.any():
+            # Duplicate rows sit right after their original; trim back to n
+            df = pd.concat([df, df[duplicates]]).sort_index(kind="stable").iloc[:n]
+
+        return df.reset_index(drop=True), first_invoice + invoices
+
+    def write_csv(self, path, chunk_rows=1_000_000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        for i, chunk in enumerate(self.chunks(chunk_rows)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False, encoding="latin1")
+        return path
+
+
+def _zipf_weights(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic Online Retail dataset")
+    parser.add_argument("--rows", default="1M", help="row count, e.g. 1M, 10M, 100M")
+    parser.add_argument("--output", default="data/raw/online_retail.csv")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    start = time.perf_counter()
+    SyntheticRetailGenerator(rows, seed=args.seed).write_csv(args.output, args.chunk_rows)
+
+    print("\nSYNTHETIC DATA GENERATED")
+    print("=" * 50)
+    print(f"Rows: {rows:,}")
+    print(f"Path: {args.output}")
+    print(f"Size: {os.path.getsize(args.output) / 1024 ** 2:.1f} MB")
+    print(f"Time: {time.perf_counter() - start:.1f}s")
+    print("=" * 50)
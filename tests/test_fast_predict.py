@@ -0,0 +1,26 @@
+import os
+import threading
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from fast_predict import FlatForest
+
+
+def _forest_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("flat-forest")]
+
+
+def test_forests_share_one_thread_pool():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (200, 4))
+    y = (X[:, 0] + rng.normal(0, 0.2, len(X)) > 0.5).astype(int)
+    forest = RandomForestClassifier(n_estimators=8, random_state=0).fit(X, y)
+    expected = forest.predict_proba(X)[:, 1]
+
+    # Reloading the model must not leave a pool behind per forest
+    for _ in range(20):
+        flat = FlatForest(forest, block_rows=64, n_threads=4)
+        np.testing.assert_allclose(flat.predict_proba(X), expected)
+
+    assert len(_forest_threads()) <= (os.cpu_count() or 1)
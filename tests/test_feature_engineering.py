@@ -0,0 +1,43 @@
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+
+@pytest.fixture
+def transactions():
+    rows = [
+        # CustomerID, InvoiceNo, InvoiceDate, TotalPrice
+        (12346, "536365", "2010-12-01 08:26", 15.30),
+        (12346, "536365", "2010-12-01 08:26", 22.00),
+        (12346, "536370", "2011-01-18 10:01", 7.50),
+        (12346, "541431", "2011-03-02 14:12", 120.00),
+        (12347, "537626", "2010-12-07 14:57", 40.00),
+        (12347, "537626", "2010-12-07 14:57", 2.55),
+        (12347, "542237", "2010-12-28 09:00", 18.20),
+        (12348, "539318", "2011-06-16 19:09", 3.75),
+        (12349, "581483", "2011-12-09 09:15", 80.60),
+        (12349, "581483", "2011-12-09 09:15", 0.85),
+    ]
+    df = pd.DataFrame(rows, columns=["CustomerID", "InvoiceNo", "InvoiceDate", "TotalPrice"])
+    df["InvoiceDate"] = pd.to_datetime(df["InvoiceDate"])
+    return df
+
+
+def _build(stage, transactions, vectorized):
+    engineer = stage("03_feature_engineering").FeatureEngineer("unused.csv")
+    engineer.df = transactions
+    engineer.create_reference_date()
+    if vectorized:
+        engineer.create_customer_features()
+    else:
+        engineer.create_rfm_features().create_additional_features()
+    return engineer.define_churn().finalize_features().customer_df
+
+
+def test_vectorized_features_match_original(stage, transactions):
+    original = _build(stage, transactions, vectorized=False)
+    vectorized = _build(stage, transactions, vectorized=True)
+
+    pdt.assert_frame_equal(vectorized, original, check_dtype=False, rtol=1e-9)
+    assert original["Frequency"].tolist() == [3, 2, 1, 1]
+    assert original["ActiveMonths"].tolist() == [3, 1, 1, 1]
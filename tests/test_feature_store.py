@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from feature_store import CustomerFeatureStore
+
+
+def _transactions(seed, rows=1000):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2010-12-01") + pd.to_timedelta(rng.integers(0, 365 * 24, rows), unit="h")
+    customers = rng.integers(12000, 12300, rows)
+    return pd.DataFrame({
+        "CustomerID": customers,
+        # Invoices belong to one customer and month, as in the raw data
+        "InvoiceNo": [f"{seed}{c}{d.month:02d}" for c, d in zip(customers, dates)],
+        "InvoiceDate": dates,
+        "TotalPrice": rng.uniform(1, 100, rows).round(2)
+    })
+
+
+def _features(store_dir):
+    return CustomerFeatureStore(str(store_dir)).load().features().sort_values("CustomerID", ignore_index=True)
+
+
+def test_replayed_batch_changes_nothing(tmp_path):
+    first, second = _transactions(1), _transactions(2)
+    CustomerFeatureStore(str(tmp_path)).load().update(first).update(second).save()
+    expected = _features(tmp_path)
+
+    # Replay in a later session, and again within one session before saving
+    CustomerFeatureStore(str(tmp_path)).load().update(first).save()
+    CustomerFeatureStore(str(tmp_path)).load().update(second).update(second).save()
+
+    pdt.assert_frame_equal(_features(tmp_path), expected)
+
+
+def test_interrupted_save_leaves_committed_state(tmp_path):
+    first, second = _transactions(1), _transactions(2)
+    CustomerFeatureStore(str(tmp_path / "reference")).load().update(first).update(second).save()
+
+    store = CustomerFeatureStore(str(tmp_path / "store")).load().update(first).save()
+    # A save that died after writing its log part but before store.json
+    CustomerFeatureStore(str(tmp_path / "scratch")).load().update(second)._pending[0] \
+        .to_parquet(store._part_path(store.parts), index=False)
+
+    CustomerFeatureStore(str(tmp_path / "store")).load().update(second).save()
+
+    pdt.assert_frame_equal(_features(tmp_path / "store"), _features(tmp_path / "reference"))
+
+
+def test_invoice_split_across_batches(tmp_path):
+    rows = pd.concat([_transactions(1), _transactions(2)], ignore_index=True)
+    CustomerFeatureStore(str(tmp_path / "reference")).load().update(rows).save()
+
+    # Every invoice has its lines spread over three batches, one per session
+    batches = [rows.iloc[i::3] for i in range(3)]
+    for batch in batches:
+        CustomerFeatureStore(str(tmp_path / "store")).load().update(batch).save()
+    CustomerFeatureStore(str(tmp_path / "store")).load().update(batches[1]).save()
+
+    pdt.assert_frame_equal(_features(tmp_path / "store"), _features(tmp_path / "reference"))
+
+
+def test_lines_equal_on_transaction_columns_both_count(tmp_path):
+    line = _transactions(1, rows=1)
+    # Two products on one invoice with the same total
+    first = line.assign(StockCode="85123A")
+    second = line.assign(StockCode="71053")
+
+    CustomerFeatureStore(str(tmp_path)).load().update(first).save()
+    CustomerFeatureStore(str(tmp_path)).load().update(second).update(first).save()
+
+    features = _features(tmp_path)
+    assert features["Frequency"].tolist() == [1]
+    assert features["Monetary"].tolist() == [2 * line["TotalPrice"].iloc[0]]
@@ -0,0 +1,77 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+import artifact_format
+from model_artifact import SOURCE_FILES, export_model_artifact
+from predict import ChurnScorer, load_model_artifact
+
+FEATURES = ["Recency", "Frequency", "Monetary"]
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 300, (300, len(FEATURES))), columns=FEATURES)
+    y = (X["Recency"] > 150).astype(int)
+
+    scaler = StandardScaler().fit(X)
+    models = {
+        "scaler": scaler,
+        "logistic_regression": LogisticRegression().fit(scaler.transform(X), y),
+        "random_forest": RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    }
+    for name, filename in SOURCE_FILES.items():
+        joblib.dump(models[name], tmp_path / filename)
+
+    export_model_artifact(str(tmp_path))
+    return tmp_path
+
+
+def _rewrite_keeping_stat(path, data):
+    stat = os.stat(path)
+    with open(path, "r+b") as f:
+        f.write(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def test_default_load_checks_stat_without_hashing(models_dir, monkeypatch):
+    def no_hashing(path):
+        raise AssertionError(f"hashed {path}")
+
+    monkeypatch.setattr(artifact_format, "file_sha256", no_hashing)
+    assert load_model_artifact(models_dir) is not None
+
+
+def test_full_verify_catches_same_size_change(models_dir):
+    path = models_dir / "artifact" / "forest_value.npy"
+    data = bytearray(path.read_bytes())
+    data[-4:] = np.float32(0.5).tobytes()
+    _rewrite_keeping_stat(path, bytes(data))
+
+    assert load_model_artifact(models_dir) is not None
+    with pytest.warns(UserWarning, match="corrupt"):
+        assert load_model_artifact(models_dir, verify="full") is None
+
+
+def test_retrained_pickle_disables_artifact(models_dir):
+    with open(models_dir / "random_forest.pkl", "ab") as f:
+        f.write(b"\0")
+
+    with pytest.warns(UserWarning, match="other model pickles"):
+        assert load_model_artifact(models_dir) is None
+
+
+def test_artifact_forest_matches_sklearn(models_dir):
+    scorer = ChurnScorer(models_dir)
+    assert scorer.artifact is not None
+
+    X = np.random.default_rng(1).uniform(0, 300, (64, len(FEATURES)))
+    expected = scorer.models["random_forest"].predict_proba(pd.DataFrame(X, columns=FEATURES))[:, 1]
+    np.testing.assert_allclose(scorer.flat_forest.predict_proba(X), expected)
@@ -0,0 +1,49 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def engineered(stage, workdir):
+    """Feature table, matrix and metadata as FeatureEngineer leaves them."""
+    rng = np.random.default_rng(0)
+    customer_df = pd.DataFrame({
+        "CustomerID": np.arange(12000, 12040),
+        "Recency": rng.integers(1, 300, 40),
+        "Frequency": rng.integers(1, 20, 40),
+        "Churn": np.tile([0, 1], 20)
+    })
+    engineer = stage("03_feature_engineering").FeatureEngineer("unused.csv")
+    engineer.customer_df = customer_df
+    engineer.reference_date = pd.Timestamp("2011-12-09")
+    engineer.save_outputs()
+    return customer_df
+
+
+def _trainer(stage, **kwargs):
+    return stage("04_model_training").ModelTrainer(**kwargs)
+
+
+def test_default_features_use_matching_matrix(stage, engineered):
+    assert _trainer(stage).feature_matrix_dir == "data/processed/feature_matrix"
+
+
+def test_other_features_path_ignores_default_matrix(stage, engineered):
+    other = engineered.assign(Recency=engineered["Recency"] + 1)
+    other.to_csv("other_features.csv", index=False)
+
+    trainer = _trainer(stage, features_path="other_features.csv")
+    assert trainer.feature_matrix_dir is None
+    assert trainer.load_data().X["Recency"].tolist() == other["Recency"].tolist()
+
+
+def test_rewritten_feature_table_ignores_stale_matrix(stage, engineered):
+    with open("data/processed/feature_metadata.json") as f:
+        features_path = json.load(f)["features_path"]
+    engineered.head(20).to_csv(features_path, index=False)
+
+    assert os.path.exists("data/processed/feature_matrix/schema.json")
+    assert _trainer(stage).feature_matrix_dir is None
@@ -0,0 +1,30 @@
+import pandas as pd
+
+import profiling
+from profiling import StepProfiler, format_mb, peak_rss_over
+
+
+class Frames:
+    def __init__(self):
+        self.df = pd.DataFrame({"x": range(10)})
+
+    def head(self):
+        self.df = self.df.head(3)
+        return self
+
+
+def test_profiles_without_resource_module(monkeypatch):
+    # As on Windows, where the resource module does not exist
+    monkeypatch.setattr(profiling, "resource", None)
+    assert profiling.peak_rss_bytes() is None
+    assert peak_rss_over(0) is None
+    assert format_mb(None) == "n/a"
+
+    frames = Frames()
+    profiler = StepProfiler(lambda: frames.df)
+    profiler.wrap(frames).head()
+
+    step, = profiler.steps
+    assert (step["rows_before"], step["rows_after"]) == (10, 3)
+    assert step["process_peak_rss_mb"] is None
+    assert profiler.summary()["process_peak_rss_mb"] is None
@@ -0,0 +1,95 @@
+import http.client
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from scoring_service import MicroBatcher, ScoringHTTPServer, ScoringService, make_handler
+
+FEATURES = ["Recency", "Frequency"]
+
+
+class StubScorer:
+    """Scores the row sum; rows with a negative value fail."""
+
+    feature_names = FEATURES
+
+    def score_array(self, X, model):
+        if (X < 0).any():
+            raise ValueError("negative feature")
+        return X.sum(axis=1)
+
+    def predict_proba(self, customers, model):
+        raise RuntimeError("model file is corrupt")
+
+
+@pytest.fixture
+def service():
+    service = ScoringService.__new__(ScoringService)
+    service.scorer = StubScorer()
+    return service
+
+
+@pytest.mark.parametrize("features", [
+    {"Recency": float("nan"), "Frequency": 1},
+    {"Recency": float("inf"), "Frequency": 1},
+    {"Recency": "ten", "Frequency": 1},
+    {"Recency": None, "Frequency": 1},
+    {"Frequency": 1},
+    [1, 2],
+    "Recency"
+])
+def test_row_rejects_invalid_features(service, features):
+    with pytest.raises(ValueError):
+        service._row(features)
+
+
+def test_row_in_feature_order(service):
+    row = service._row({"Frequency": 2, "Recency": 10, "CustomerID": 12346})
+    assert row.tolist() == [[10.0, 2.0]]
+
+
+def test_failing_row_does_not_fail_its_batch():
+    # A long wait puts all three requests in one batch
+    batcher = MicroBatcher(StubScorer(), "random_forest", max_batch_size=3, max_wait_ms=1000)
+    futures = [batcher.submit(np.array([row], dtype=np.float64)) for row in ([1, 2], [-1, 0], [3, 4])]
+
+    assert futures[0].result(timeout=5) == 3.0
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == 7.0
+
+
+@pytest.fixture
+def server(service):
+    server = ScoringHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, path, body):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        connection.request("POST", path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("path", ["/predict", "/predict/batch"])
+@pytest.mark.parametrize("body", [[1, 2], "features", 3])
+def test_non_object_body_is_bad_request(server, path, body):
+    status, response = _post(server, path, body)
+    assert status == 400
+    assert "JSON object" in response["error"]
+
+
+def test_unexpected_error_is_server_error(server):
+    status, response = _post(server, "/predict/batch", {"customers": [{"Recency": 1, "Frequency": 2}]})
+    assert status == 500
+    assert response == {"error": "Internal server error"}
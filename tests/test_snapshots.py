@@ -0,0 +1,30 @@
+import pandas as pd
+
+from snapshots import SnapshotBuilder
+
+
+def _transactions(dates):
+    return pd.DataFrame({
+        "CustomerID": [12346 + i % 3 for i in range(len(dates))],
+        "InvoiceNo": [str(536365 + i) for i in range(len(dates))],
+        "InvoiceDate": pd.to_datetime(dates),
+        "TotalPrice": 10.0
+    })
+
+
+def test_default_cutoffs_are_month_starts_after_first_transaction():
+    builder = SnapshotBuilder(_transactions([
+        "2010-12-01 08:26", "2011-01-15 12:00", "2011-03-10 09:30", "2011-06-20 17:45"
+    ]))
+
+    cutoffs = builder.cutoffs(horizon_days=90)
+
+    assert cutoffs == list(pd.to_datetime(["2011-01-01", "2011-02-01", "2011-03-01"]))
+    for cutoff in cutoffs:
+        assert len(builder.snapshot(cutoff, 90)) > 0
+
+
+def test_first_transaction_at_month_start_is_not_a_cutoff():
+    builder = SnapshotBuilder(_transactions(["2011-01-01", "2011-02-10", "2011-06-01"]))
+
+    assert builder.cutoffs(horizon_days=30)[0] == pd.Timestamp("2011-02-01")
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from storage import FrameWriter, load_frame
+
+RAW_COLUMNS = [
+    "InvoiceNo", "StockCode", "Description", "Quantity",
+    "InvoiceDate", "UnitPrice", "CustomerID", "Country"
+]
+
+
+def _chunk(invoices):
+    return pd.DataFrame({
+        "InvoiceNo": pd.Series(invoices, dtype=object),
+        "Quantity": pd.Series(range(len(invoices)), dtype="int64")
+    })
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_frame_writer_skips_empty_first_chunk(tmp_path, fmt):
+    path = str(tmp_path / f"out.{fmt}")
+    with FrameWriter(path) as writer:
+        writer.write(_chunk([]))
+        writer.write(_chunk(["536365", "536366"]))
+        writer.write(_chunk(["536367"]))
+
+    df = load_frame(path)
+    assert writer.rows_written == 3
+    assert df["InvoiceNo"].astype(str).tolist() == ["536365", "536366", "536367"]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_frame_writer_only_empty_chunks(tmp_path, fmt):
+    path = str(tmp_path / f"out.{fmt}")
+    with FrameWriter(path) as writer:
+        writer.write(_chunk([]))
+
+    df = load_frame(path)
+    assert list(df.columns) == ["InvoiceNo", "Quantity"]
+    assert len(df) == 0
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_streaming_pipeline_first_chunk_filtered_out(stage, workdir, fmt):
+    rows = []
+    # The whole first chunk lacks a CustomerID, so it is empty after filtering
+    for i in range(4):
+        rows.append([f"5365{i:02d}", "85123A", "LANTERN", 2, "2010-12-01 08:26", 2.55, "", "United Kingdom"])
+    for i in range(8):
+        rows.append([f"5366{i:02d}", "71053", "METAL LANTERN", 2, "2010-12-02 09:00", 3.39, 17850 + i, "France"])
+    raw_path = workdir / "raw.csv"
+    pd.DataFrame(rows, columns=RAW_COLUMNS).to_csv(raw_path, index=False)
+
+    cleaning = stage("02_data_cleaning")
+    cleaner = cleaning.DataCleaner(str(raw_path), chunksize=4, outlier_method="sketch", storage_format=fmt)
+    output_path = cleaner.run_streaming_pipeline()
+
+    df = load_frame(output_path)
+    assert len(df) == 8
+    assert sorted(df["CustomerID"].tolist()) == list(range(17850, 17858))